@@ -3,6 +3,7 @@ Appwrite Cloud Storage Utility
 Global utility for uploading files to Appwrite cloud storage
 """
 import requests
+from core.http import get_client
 import logging
 from django.conf import settings
 from typing import Optional, Dict, Any
@@ -82,7 +83,7 @@ class AppwriteStorage:
             }
             
             # Make the upload request
-            response = requests.post(
+            response = get_client('appwrite').post(
                 upload_url,
                 headers=headers,
                 data=data,
@@ -150,7 +151,7 @@ class AppwriteStorage:
             delete_url = f"{self.endpoint}/storage/buckets/{self.bucket_id}/files/{file_id}"
             headers = self._get_headers()
             
-            response = requests.delete(
+            response = get_client('appwrite').delete(
                 delete_url,
                 headers=headers,
                 timeout=10
@@ -5,6 +5,7 @@ import os
 import sys
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_ready
 
 # Set default Django settings
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Xbooking.settings')
@@ -60,8 +61,42 @@ app.conf.beat_schedule = {
         'task': 'booking.tasks.clean_old_reservations',
         'schedule': crontab(hour='0', minute='0'),  # Daily at midnight
     },
+    # Process ingested payment webhooks that were not drained right away
+    'process-payment-webhooks': {
+        'task': 'payment.tasks.process_payment_webhooks',
+        'schedule': crontab(minute='*'),  # Every minute
+    },
+    # Verify gateway payments/deposits that are still pending (missed webhooks)
+    'reconcile-pending-payments': {
+        'task': 'payment.tasks.reconcile_pending_payments',
+        'schedule': crontab(minute='*/5'),  # Every 5 minutes
+    },
+    # Pay approved withdrawals out in bulk transfers
+    'run-payouts': {
+        'task': 'bank.tasks.run_payouts',
+        'schedule': crontab(minute='*/5'),  # Every 5 minutes
+    },
+    # Complete or fail withdrawals whose transfers have settled
+    'reconcile-payouts': {
+        'task': 'bank.tasks.reconcile_payouts',
+        'schedule': crontab(minute='*/2'),  # Every 2 minutes
+    },
 }
 
+@worker_process_init.connect
+def reset_http_clients(**kwargs):
+    """Prefork children must not share the parent's pooled sockets or breaker state"""
+    from core.http import reset_clients
+    reset_clients()
+
+
+@worker_ready.connect
+def start_reservation_hold_listener(**kwargs):
+    """Release cart holds as their Redis keys expire; one listener per worker, in the main process"""
+    from booking.services.holds import ReservationHoldService
+    ReservationHoldService.start_expiry_listener()
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
@@ -2,9 +2,9 @@ import io
 import time
 import hashlib
 import logging
-import requests
 from typing import Optional, Dict, Any
 from django.conf import settings
+from core.http import get_client
 
 logger = logging.getLogger(__name__)
 
@@ -68,7 +68,7 @@ def upload_file_to_cloudinary(
             'file': (filename, io.BytesIO(file_data)),
         }
 
-        resp = requests.post(endpoint, data=data, files=files, timeout=30)
+        resp = get_client('cloudinary').post(endpoint, data=data, files=files, timeout=30)
         if resp.status_code in (200, 201):
             result = resp.json()
             return {
@@ -2,9 +2,9 @@
 Mailjet REST API Utility for sending emails
 Replaces SMTP email sending with Mailjet REST API
 """
-import requests
 import logging
 from django.conf import settings
+from core.http import get_client
 from typing import List, Dict, Optional
 
 logger = logging.getLogger(__name__)
@@ -106,7 +106,7 @@ class MailjetEmailService:
             }
             
             # Make API request
-            response = requests.post(
+            response = get_client('mailjet').post(
                 cls.MAILJET_API_URL,
                 auth=(api_key, secret_key),
                 json=payload,
@@ -204,7 +204,7 @@ class MailjetEmailService:
             }
             
             # Make API request
-            response = requests.post(
+            response = get_client('mailjet').post(
                 cls.MAILJET_API_URL,
                 auth=(api_key, secret_key),
                 json=payload,
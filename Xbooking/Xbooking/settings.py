@@ -57,6 +57,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryBudgetMiddleware',  # Per-request SQL query budgets / N+1 detection
     "corsheaders.middleware.CorsMiddleware",
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -283,6 +284,59 @@ REDIS_HOST = config('REDIS_HOST', default='localhost')
 REDIS_PORT = config('REDIS_PORT', default=6379, cast=int)
 REDIS_DB = config('REDIS_DB', default=1, cast=int)
 
+# Reservation holds: Redis TTL keys + keyspace-expiry notifications release
+# cart holds within seconds (falls back to the periodic sweep without Redis)
+RESERVATION_HOLDS_ENABLED = config('RESERVATION_HOLDS_ENABLED', default=True, cast=bool)
+# Celery workers always run the keyspace-expiry listener; this also runs it in other
+# processes (e.g. web) that set it. Redis must have notify-keyspace-events including
+# "Ex" (`redis-server --notify-keyspace-events Ex` or the same line in redis.conf)
+RESERVATION_HOLD_LISTENER_ENABLED = config('RESERVATION_HOLD_LISTENER_ENABLED', default=False, cast=bool)
+
+# Payment webhooks: verify the signature, store the payload and answer 200 at once,
+# then verify with the gateway and complete payments from a Celery queue
+PAYMENT_WEBHOOK_ASYNC = config('PAYMENT_WEBHOOK_ASYNC', default=False, cast=bool)
+# Gateway verification calls run in parallel per webhook batch
+PAYMENT_WEBHOOK_VERIFY_CONCURRENCY = config('PAYMENT_WEBHOOK_VERIFY_CONCURRENCY', default=4, cast=int)
+# Settled gateway verification results cached per reference (in-flight ones never are)
+PAYMENT_VERIFY_CACHE_SECONDS = config('PAYMENT_VERIFY_CACHE_SECONDS', default=60, cast=int)
+# Reconciliation job: verify payments/deposits pending longer than this, N gateway calls at a time
+PAYMENT_RECONCILE_AFTER_MINUTES = config('PAYMENT_RECONCILE_AFTER_MINUTES', default=15, cast=int)
+PAYMENT_RECONCILE_CONCURRENCY = config('PAYMENT_RECONCILE_CONCURRENCY', default=8, cast=int)
+
+# Batched payouts (bank.services.payouts): approved withdrawals per run, transfers per bulk
+# request (Paystack accepts up to 100), bulk requests in flight, and how long to wait
+# before verifying submitted transfers. PAYOUT_GATEWAY=stub pays out locally.
+PAYOUT_GATEWAY = config('PAYOUT_GATEWAY', default='paystack')
+PAYOUT_RUN_LIMIT = config('PAYOUT_RUN_LIMIT', default=1000, cast=int)
+PAYOUT_BATCH_SIZE = config('PAYOUT_BATCH_SIZE', default=100, cast=int)
+PAYOUT_CONCURRENCY = config('PAYOUT_CONCURRENCY', default=4, cast=int)
+PAYOUT_RECONCILE_AFTER_MINUTES = config('PAYOUT_RECONCILE_AFTER_MINUTES', default=2, cast=int)
+
+# Hot-path spans (core.instrumentation): histograms served at /metrics/, optional per-span log lines
+INSTRUMENTATION_ENABLED = config('INSTRUMENTATION_ENABLED', default=True, cast=bool)
+INSTRUMENTATION_LOG_SPANS = config('INSTRUMENTATION_LOG_SPANS', default=False, cast=bool)
+# Bearer token required by /metrics/ (without one the endpoint is only served in DEBUG)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Outbound HTTP (core.http): pooled keep-alive sessions per provider host
+HTTP_CLIENT_POOL_MAXSIZE = config('HTTP_CLIENT_POOL_MAXSIZE', default=20, cast=int)
+HTTP_CLIENT_RETRIES = config('HTTP_CLIENT_RETRIES', default=2, cast=int)
+HTTP_CLIENT_BACKOFF = config('HTTP_CLIENT_BACKOFF', default=0.2, cast=float)
+# Consecutive failures that open a provider's circuit, and seconds before a trial call
+HTTP_CLIENT_BREAKER_THRESHOLD = config('HTTP_CLIENT_BREAKER_THRESHOLD', default=5, cast=int)
+HTTP_CLIENT_BREAKER_RESET = config('HTTP_CLIENT_BREAKER_RESET', default=30, cast=int)
+# {provider: base URL} to send a provider's calls elsewhere (e.g. a local stub server)
+HTTP_CLIENT_BASE_URLS = {}
+
+# Per-request SQL query budgets (core.middleware.QueryBudgetMiddleware); views override with @query_budget
+QUERY_BUDGET_DEFAULT = config('QUERY_BUDGET_DEFAULT', default=50, cast=int)
+# Repeats of one query shape within a request reported as a possible N+1
+QUERY_BUDGET_DUPLICATE_THRESHOLD = config('QUERY_BUDGET_DUPLICATE_THRESHOLD', default=5, cast=int)
+# 'log' or 'raise' (QueryBudgetExceeded) when a request goes over budget
+QUERY_BUDGET_ACTION = config('QUERY_BUDGET_ACTION', default='log')
+# X-Query-Count / X-Query-Duplicates / X-Query-Budget response headers
+QUERY_BUDGET_HEADERS = config('QUERY_BUDGET_HEADERS', default=DEBUG, cast=bool)
+
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
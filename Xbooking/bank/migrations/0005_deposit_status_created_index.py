@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0004_withdrawalrequest_payment_provider'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deposit',
+            index=models.Index(fields=['status', 'created_at'], name='bank_deposi_status_4405f5_idx'),
+        ),
+    ]
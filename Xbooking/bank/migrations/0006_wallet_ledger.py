@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def post_opening_balances(apps, schema_editor):
+    """Seed the ledger so every existing balance equals the sum of its entries"""
+    Wallet = apps.get_model('bank', 'Wallet')
+    WorkspaceWallet = apps.get_model('bank', 'WorkspaceWallet')
+    LedgerEntry = apps.get_model('bank', 'LedgerEntry')
+
+    entries = []
+    for field, account, model in (
+        ('wallet', 'wallet', Wallet),
+        ('workspace_wallet', 'workspace_wallet', WorkspaceWallet),
+    ):
+        for wallet_id, balance in model.objects.exclude(balance=0).values_list('id', 'balance').iterator():
+            entries.append(LedgerEntry(account=account, amount=balance, balance_after=balance, **{field: wallet_id}))
+            entries.append(LedgerEntry(account='opening', amount=-balance, **{field: wallet_id}))
+    LedgerEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0005_deposit_status_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('account', models.CharField(help_text='wallet, workspace_wallet or a contra account such as gateway', max_length=30)),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Signed: positive credits the account', max_digits=12)),
+                ('balance_after', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('transaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='bank.transaction')),
+                ('wallet', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='bank.wallet')),
+                ('workspace_wallet', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='bank.workspacewallet')),
+            ],
+            options={
+                'db_table': 'bank_ledger_entry',
+                'indexes': [models.Index(fields=['wallet', 'id'], name='bank_ledger_wallet__0a85d0_idx'), models.Index(fields=['workspace_wallet', 'id'], name='bank_ledger_workspa_870708_idx'), models.Index(fields=['account', 'created_at'], name='bank_ledger_account_14cdcd_idx')],
+            },
+        ),
+        migrations.RunPython(post_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0006_wallet_ledger'),
+        ('booking', '0007_seat_claims'),
+        ('payment', '0004_payment_status_created_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['wallet', '-created_at', '-id'], name='bank_transa_wallet__ae096c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['workspace_wallet', '-created_at', '-id'], name='bank_transa_workspa_3ff698_idx'),
+        ),
+    ]
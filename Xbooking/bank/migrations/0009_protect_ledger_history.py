@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0008_payout_batching'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ledgerentry',
+            name='transaction',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entries', to='bank.transaction'),
+        ),
+        migrations.AlterField(
+            model_name='ledgerentry',
+            name='wallet',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entries', to='bank.wallet'),
+        ),
+        migrations.AlterField(
+            model_name='ledgerentry',
+            name='workspace_wallet',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entries', to='bank.workspacewallet'),
+        ),
+    ]
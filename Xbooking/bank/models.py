@@ -161,12 +161,69 @@ class Transaction(UUIDModelMixin, TimestampedModelMixin, models.Model):
             models.Index(fields=['reference']),
             models.Index(fields=['category', 'status']),
             models.Index(fields=['-created_at']),
+            # Keyset pagination of a wallet's history
+            models.Index(fields=['wallet', '-created_at', '-id']),
+            models.Index(fields=['workspace_wallet', '-created_at', '-id']),
         ]
     
     def __str__(self):
         return f"{self.transaction_type.upper()} - {self.reference} - {self.currency} {self.amount}"
 
 
+class LedgerEntryQuerySet(models.QuerySet):
+    """Ledger entries are only ever inserted"""
+
+    def update(self, **kwargs):
+        raise ValueError("Ledger entries are append-only")
+
+    def delete(self):
+        raise ValueError("Ledger entries are append-only")
+
+
+class LedgerEntry(models.Model):
+    """
+    One leg of a double-entry posting.
+
+    Every balance change posts two entries that sum to zero: one on the wallet
+    (with the wallet balance after it) and one on the contra account the money
+    came from or went to (gateway, payouts, refunds...). A wallet's balance
+    is the materialized sum of its entries.
+    """
+
+    WALLET_ACCOUNT = 'wallet'
+    WORKSPACE_WALLET_ACCOUNT = 'workspace_wallet'
+
+    id = models.BigAutoField(primary_key=True)
+    transaction = models.ForeignKey(Transaction, on_delete=models.PROTECT, related_name='ledger_entries', null=True, blank=True)
+    account = models.CharField(max_length=30, help_text="wallet, workspace_wallet or a contra account such as gateway")
+    wallet = models.ForeignKey(Wallet, on_delete=models.PROTECT, related_name='ledger_entries', null=True, blank=True)
+    workspace_wallet = models.ForeignKey(WorkspaceWallet, on_delete=models.PROTECT, related_name='ledger_entries', null=True, blank=True)
+    amount = models.DecimalField(max_digits=12, decimal_places=2, help_text="Signed: positive credits the account")
+    balance_after = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = LedgerEntryQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'bank_ledger_entry'
+        indexes = [
+            models.Index(fields=['wallet', 'id']),
+            models.Index(fields=['workspace_wallet', 'id']),
+            models.Index(fields=['account', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.account} {self.amount:+}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Ledger entries are append-only")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Ledger entries are append-only")
+
+
 class BankAccount(UUIDModelMixin, TimestampedModelMixin, models.Model):
     """Bank account details for withdrawals"""
     
@@ -197,6 +254,10 @@ class BankAccount(UUIDModelMixin, TimestampedModelMixin, models.Model):
     # Status
     is_active = models.BooleanField(default=True)
     
+    # Payout recipients already created with gateways, by provider:
+    # {'paystack': {'recipient_code': 'RCP_...', 'account': '<bank_code>:<account_number>'}}
+    transfer_recipients = models.JSONField(default=dict, blank=True)
+    
     class Meta:
         db_table = 'bank_account'
         indexes = [
@@ -261,6 +322,7 @@ class WithdrawalRequest(UUIDModelMixin, TimestampedModelMixin, models.Model):
             models.Index(fields=['workspace_wallet', 'status']),
             models.Index(fields=['status', '-created_at']),
             models.Index(fields=['reference']),
+            models.Index(fields=['status', 'approved_at']),
         ]
     
     def __str__(self):
@@ -320,6 +382,7 @@ class Deposit(UUIDModelMixin, TimestampedModelMixin, models.Model):
             models.Index(fields=['wallet', 'status']),
             models.Index(fields=['reference']),
             models.Index(fields=['-created_at']),
+            models.Index(fields=['status', 'created_at']),
         ]
     
     def __str__(self):
@@ -4,12 +4,14 @@ Bank Service Layer - Handles all wallet and banking operations
 from decimal import Decimal
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import F
 from core.services import EventBus, Event
 from core.cache import CacheService
 from bank.models import (
     Wallet, WorkspaceWallet, Transaction, BankAccount,
     WithdrawalRequest, Deposit
 )
+from bank.services.ledger import LedgerService
 import uuid
 
 
@@ -75,25 +77,8 @@ class BankService:
         if amount <= 0:
             raise ValueError("Amount must be greater than zero")
         
-        balance_before = wallet.balance
-        wallet.balance += amount
-        wallet.save(update_fields=['balance', 'updated_at'])
-        
-        # Create transaction record
-        transaction_obj = Transaction.objects.create(
-            reference=f"TXN-{uuid.uuid4().hex[:12].upper()}",
-            transaction_type='credit',
-            category=category,
-            amount=amount,
-            currency=wallet.currency,
-            wallet=wallet,
-            balance_before=balance_before,
-            balance_after=wallet.balance,
-            status='completed',
-            description=description,
-            processed_at=timezone.now(),
-            **kwargs
-        )
+        # Post to the ledger (atomic balance update + transaction record)
+        transaction_obj = LedgerService.post(wallet, amount, category, description, **kwargs)
         
         # Publish event
         event = Event(
@@ -125,31 +110,8 @@ class BankService:
         if amount <= 0:
             raise ValueError("Amount must be greater than zero")
         
-        if not wallet.can_debit(amount):
-            raise ValueError("Insufficient balance or wallet is locked")
-        
-        balance_before = wallet.balance
-        wallet.balance -= amount
-        wallet.save(update_fields=['balance', 'updated_at'])
-        
-        # Create transaction record
-        # Use provided reference or generate one
-        reference = kwargs.pop('reference', f"TXN-{uuid.uuid4().hex[:12].upper()}")
-        
-        transaction_obj = Transaction.objects.create(
-            reference=reference,
-            transaction_type='debit',
-            category=category,
-            amount=amount,
-            currency=wallet.currency,
-            wallet=wallet,
-            balance_before=balance_before,
-            balance_after=wallet.balance,
-            status='completed',
-            description=description,
-            processed_at=timezone.now(),
-            **kwargs
-        )
+        # Post to the ledger; the balance check happens in the same UPDATE
+        transaction_obj = LedgerService.post(wallet, -amount, category, description, **kwargs)
         
         # Publish event
         event = Event(
@@ -181,25 +143,9 @@ class BankService:
         if amount <= 0:
             raise ValueError("Amount must be greater than zero")
         
-        balance_before = workspace_wallet.balance
-        workspace_wallet.balance += amount
-        workspace_wallet.total_earnings += amount
-        workspace_wallet.save(update_fields=['balance', 'total_earnings', 'updated_at'])
-        
-        # Create transaction record
-        transaction_obj = Transaction.objects.create(
-            reference=f"TXN-{uuid.uuid4().hex[:12].upper()}",
-            transaction_type='credit',
-            category=category,
-            amount=amount,
-            currency=workspace_wallet.currency,
-            workspace_wallet=workspace_wallet,
-            balance_before=balance_before,
-            balance_after=workspace_wallet.balance,
-            status='completed',
-            description=description,
-            processed_at=timezone.now(),
-            **kwargs
+        # Post to the ledger (atomic balance and lifetime earnings update)
+        transaction_obj = LedgerService.post(
+            workspace_wallet, amount, category, description, totals=['total_earnings'], **kwargs
         )
         
         # Publish event
@@ -233,28 +179,8 @@ class BankService:
         if amount <= 0:
             raise ValueError("Amount must be greater than zero")
         
-        if not workspace_wallet.can_withdraw(amount):
-            raise ValueError("Insufficient balance")
-        
-        balance_before = workspace_wallet.balance
-        workspace_wallet.balance -= amount
-        workspace_wallet.save(update_fields=['balance', 'updated_at'])
-        
-        # Create transaction record
-        transaction_obj = Transaction.objects.create(
-            reference=f"TXN-{uuid.uuid4().hex[:12].upper()}",
-            transaction_type='debit',
-            category=category,
-            amount=amount,
-            currency=workspace_wallet.currency,
-            workspace_wallet=workspace_wallet,
-            balance_before=balance_before,
-            balance_after=workspace_wallet.balance,
-            status='completed',
-            description=description,
-            processed_at=timezone.now(),
-            **kwargs
-        )
+        # Post to the ledger; the balance check happens in the same UPDATE
+        transaction_obj = LedgerService.post(workspace_wallet, -amount, category, description, **kwargs)
         
         # Publish event
         event = Event(
@@ -522,8 +448,10 @@ class BankService:
         )
         
         # Update withdrawal
-        withdrawal.workspace_wallet.total_withdrawn += withdrawal.amount
-        withdrawal.workspace_wallet.save(update_fields=['total_withdrawn'])
+        WorkspaceWallet.objects.filter(pk=withdrawal.workspace_wallet.pk).update(
+            total_withdrawn=F('total_withdrawn') + withdrawal.amount
+        )
+        withdrawal.workspace_wallet.refresh_from_db(fields=['total_withdrawn'])
         
         # Publish event
         event = Event(
@@ -621,6 +549,88 @@ class BankService:
         
         return workspace_wallet, transaction_obj
     
+    @staticmethod
+    @transaction.atomic
+    def hold_booking_payments(bookings, payment):
+        """Create the pending check-in holds for all bookings of a paid order at once
+
+        Same rows as process_booking_payment, inserted with one bulk_create.
+        Bookings that already have a held payment (callback and webhook both
+        completing the order) are skipped, so earnings are never held twice.
+
+        Args:
+            bookings: Booking instances, loaded with select_related('workspace', 'space')
+            payment: Payment that paid for them
+
+        Returns:
+            list: Created Transaction instances
+        """
+        already_held = set(
+            Transaction.objects.filter(
+                booking_id__in=[booking.id for booking in bookings],
+                category='booking_payment',
+                workspace_wallet__isnull=False
+            ).values_list('booking_id', flat=True)
+        )
+        bookings = [booking for booking in bookings if booking.id not in already_held]
+        if not bookings:
+            return []
+
+        workspaces = {booking.workspace_id: booking.workspace for booking in bookings}
+        wallets = {wallet.workspace_id: wallet for wallet in WorkspaceWallet.objects.filter(workspace_id__in=list(workspaces))}
+        for workspace_id, workspace in workspaces.items():
+            if workspace_id not in wallets:
+                wallets[workspace_id], _ = BankService.create_workspace_wallet(workspace)
+
+        order = getattr(payment, 'order', None)
+        transactions = Transaction.objects.bulk_create([
+            Transaction(
+                reference=f"TXN-{uuid.uuid4().hex[:12].upper()}",
+                transaction_type='credit',
+                category='booking_payment',
+                amount=booking.total_price,
+                currency=wallets[booking.workspace_id].currency,
+                workspace_wallet=wallets[booking.workspace_id],
+                booking=booking,
+                order=order,
+                balance_before=wallets[booking.workspace_id].balance,
+                balance_after=wallets[booking.workspace_id].balance,  # No change yet
+                status='pending',  # Key: pending until check-in
+                description=f"Pending payment for booking at {booking.space.name} (Released on check-in)",
+                metadata={
+                    'booking_id': str(booking.id),
+                    'payment_id': str(payment.id) if payment else None,
+                    'held_until': 'check_in'
+                }
+            )
+            for booking in bookings
+        ])
+
+        event = Event(
+            event_type='BOOKING_PAYMENTS_HELD',
+            data={
+                'payment_id': str(payment.id) if payment else None,
+                'order_id': str(order.id) if order else None,
+                'holds': [
+                    {
+                        'transaction_id': str(transaction_obj.id),
+                        'wallet_id': str(transaction_obj.workspace_wallet_id),
+                        'workspace_id': str(booking.workspace_id),
+                        'booking_id': str(booking.id),
+                        'amount': str(booking.total_price),
+                    }
+                    for booking, transaction_obj in zip(bookings, transactions)
+                ],
+                'status': 'pending',
+                'message': 'Payment held until check-in',
+                'timestamp': timezone.now().isoformat()
+            },
+            source_module='bank'
+        )
+        EventBus.publish(event)
+
+        return transactions
+    
     @staticmethod
     @transaction.atomic
     def process_booking_refund(booking, refund_amount, description=None):
@@ -637,6 +647,9 @@ class BankService:
         user_wallet, _ = BankService.create_wallet(user)
         workspace_wallet = booking.workspace.wallet
         
+        # Lock both wallets in canonical order before moving money between them
+        LedgerService.lock(user_wallet, workspace_wallet)
+        
         # Check if there's a pending transaction for this booking
         pending_transaction = Transaction.objects.filter(
             booking=booking,
@@ -734,8 +747,8 @@ class BankService:
         if not workspace_wallet:
             workspace_wallet, _ = BankService.create_workspace_wallet(booking.workspace)
         
-        # Find pending transaction for this booking
-        pending_transaction = Transaction.objects.filter(
+        # Find pending transaction for this booking (locked so it is released once)
+        pending_transaction = Transaction.objects.select_for_update().filter(
             booking=booking,
             category='booking_payment',
             status='pending'
@@ -748,19 +761,16 @@ class BankService:
             logger.warning(f"No pending transaction found for booking {booking.id}")
             return None
         
-        # Update workspace wallet balance
-        balance_before = workspace_wallet.balance
-        workspace_wallet.balance += pending_transaction.amount
-        workspace_wallet.total_earnings += pending_transaction.amount
-        workspace_wallet.save(update_fields=['balance', 'total_earnings', 'updated_at'])
-        
-        # Update transaction status from pending to completed
-        pending_transaction.status = 'completed'
-        pending_transaction.balance_after = workspace_wallet.balance
-        pending_transaction.processed_at = timezone.now()
-        pending_transaction.category = 'booking_earning'  # Change from booking_payment to booking_earning
-        pending_transaction.description = f"Payment released for booking at {booking.space.name} (User checked in)"
-        pending_transaction.save()
+        # Credit the workspace wallet and complete the pending transaction
+        # (category changes from booking_payment to booking_earning)
+        LedgerService.post(
+            workspace_wallet,
+            pending_transaction.amount,
+            'booking_earning',
+            f"Payment released for booking at {booking.space.name} (User checked in)",
+            transaction_obj=pending_transaction,
+            totals=['total_earnings']
+        )
         
         # Publish event
         event = Event(
@@ -0,0 +1,197 @@
+"""
+Wallet Ledger
+Append-only double-entry postings with atomically materialized balances.
+"""
+import logging
+import uuid
+from decimal import Decimal
+from typing import Iterable, List
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from bank.models import Wallet, WorkspaceWallet, Transaction, LedgerEntry
+
+logger = logging.getLogger(__name__)
+
+
+class LedgerService:
+    """
+    The only writer of wallet balances.
+
+    A posting is one conditional UPDATE ... SET balance = balance + delta (the
+    database applies it under the row lock, so concurrent postings never lose
+    an update and a debit can never take a balance below zero), followed by
+    two ledger entries that sum to zero: the wallet leg, stamped with the
+    balance it produced, and the contra leg on the account the money came
+    from or went to. Wallet.balance is the materialized sum of the wallet
+    legs; verify() checks it against the entries.
+
+    Operations touching several wallets must lock() them first, which takes
+    the row locks in one canonical order so two of them cannot deadlock.
+    """
+
+    CONTRA_ACCOUNTS = {
+        'deposit': 'gateway',
+        'withdrawal': 'payouts',
+        'refund': 'refunds',
+        'cancellation_refund': 'refunds',
+        'booking_payment': 'bookings',
+        'booking_earning': 'bookings',
+        'transfer': 'transfers',
+        'fee': 'fees',
+    }
+    DEFAULT_CONTRA_ACCOUNT = 'clearing'
+
+    @staticmethod
+    def account_for(wallet) -> str:
+        """Ledger account (and entry foreign key) of a wallet"""
+        if isinstance(wallet, WorkspaceWallet):
+            return LedgerEntry.WORKSPACE_WALLET_ACCOUNT
+        return LedgerEntry.WALLET_ACCOUNT
+
+    @staticmethod
+    def lock(*wallets) -> List:
+        """
+        Row-lock wallets in canonical order (user wallets, then workspace
+        wallets, each by primary key) and refresh their in-memory balances.
+        Must run inside a transaction.
+        """
+        ordered = sorted(
+            {(type(wallet), wallet.pk): wallet for wallet in wallets if wallet is not None}.values(),
+            key=lambda wallet: (LedgerService.account_for(wallet), str(wallet.pk))
+        )
+        for wallet in ordered:
+            wallet.balance = type(wallet).objects.select_for_update().values_list('balance', flat=True).get(pk=wallet.pk)
+        return ordered
+
+    @staticmethod
+    @transaction.atomic
+    def post(wallet, delta: Decimal, category: str, description: str, transaction_obj=None,
+             totals: Iterable[str] = (), **kwargs) -> Transaction:
+        """
+        Apply a signed delta to a wallet and record it.
+
+        Args:
+            wallet: Wallet or WorkspaceWallet
+            delta: Positive to credit, negative to debit
+            category: Transaction category, which also picks the contra account
+            description: Transaction description
+            transaction_obj: Existing (pending) transaction to complete instead of creating one
+            totals: Lifetime counters to grow by the absolute amount (e.g. total_earnings)
+            **kwargs: Extra fields for a new transaction (booking, metadata, reference...)
+
+        Raises:
+            ValueError: A debit would overdraw, or the wallet is inactive or locked
+        """
+        delta = Decimal(delta)
+        amount = abs(delta)
+        model = type(wallet)
+        account = LedgerService.account_for(wallet)
+        totals = list(totals)
+
+        rows = model.objects.filter(pk=wallet.pk)
+        if delta < 0:
+            rows = rows.filter(balance__gte=amount, is_active=True)
+            if model is Wallet:
+                rows = rows.filter(is_locked=False)
+
+        updates = {'balance': F('balance') + delta, 'updated_at': timezone.now()}
+        for name in totals:
+            updates[name] = F(name) + amount
+        if not rows.update(**updates):
+            if model is Wallet:
+                raise ValueError("Insufficient balance or wallet is locked")
+            raise ValueError("Insufficient balance")
+
+        # The UPDATE holds the row lock until commit, so this is our balance
+        balance_after, *total_values = model.objects.values_list('balance', *totals).get(pk=wallet.pk)
+        balance_before = balance_after - delta
+        wallet.balance = balance_after
+        for name, value in zip(totals, total_values):
+            setattr(wallet, name, value)
+
+        now = timezone.now()
+        if transaction_obj is None:
+            transaction_obj = Transaction.objects.create(
+                reference=kwargs.pop('reference', None) or f"TXN-{uuid.uuid4().hex[:12].upper()}",
+                transaction_type='credit' if delta > 0 else 'debit',
+                category=category,
+                amount=amount,
+                currency=wallet.currency,
+                balance_before=balance_before,
+                balance_after=balance_after,
+                status='completed',
+                description=description,
+                processed_at=now,
+                **{account: wallet},
+                **kwargs
+            )
+        else:
+            transaction_obj.category = category
+            transaction_obj.description = description
+            transaction_obj.balance_before = balance_before
+            transaction_obj.balance_after = balance_after
+            transaction_obj.status = 'completed'
+            transaction_obj.processed_at = now
+            transaction_obj.save()
+
+        LedgerEntry.objects.bulk_create([
+            LedgerEntry(
+                transaction=transaction_obj,
+                account=account,
+                amount=delta,
+                balance_after=balance_after,
+                **{account: wallet}
+            ),
+            LedgerEntry(
+                transaction=transaction_obj,
+                account=LedgerService.CONTRA_ACCOUNTS.get(category, LedgerService.DEFAULT_CONTRA_ACCOUNT),
+                amount=-delta,
+                **{account: wallet}
+            ),
+        ])
+
+        return transaction_obj
+
+    @staticmethod
+    def verify(wallet) -> List[str]:
+        """
+        Check a wallet against its ledger.
+
+        Returns:
+            Descriptions of every broken invariant (empty when consistent)
+        """
+        account = LedgerService.account_for(wallet)
+        balance = type(wallet).objects.values_list('balance', flat=True).get(pk=wallet.pk)
+        entries = LedgerEntry.objects.filter(**{account: wallet})
+        problems = []
+
+        ledger_balance = entries.filter(account=account).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        if ledger_balance != balance:
+            problems.append(f"balance {balance} != ledger balance {ledger_balance}")
+        if balance < 0:
+            problems.append(f"negative balance {balance}")
+
+        net = entries.aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        if net != 0:
+            problems.append(f"entries do not balance: net {net}")
+
+        unbalanced = (
+            entries.filter(transaction__isnull=False)
+            .values('transaction')
+            .annotate(net=Sum('amount'))
+            .exclude(net=0)
+        )
+        for row in unbalanced:
+            problems.append(f"transaction {row['transaction']} legs net {row['net']}")
+
+        last = entries.filter(account=account).order_by('-id').first()
+        if last is not None and last.balance_after != balance:
+            problems.append(f"last entry balance {last.balance_after} != balance {balance}")
+
+        return problems
+
+
+__all__ = ['LedgerService']
@@ -0,0 +1,299 @@
+"""
+Payout Batching
+Pay approved withdrawals out through the gateway's bulk transfer API.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from bank.models import BankAccount, WithdrawalRequest
+from bank.services.ledger import LedgerService
+from core.instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+
+SUCCESS_STATUSES = ('success',)
+FAILED_STATUSES = ('failed', 'reversed', 'rejected', 'abandoned', 'blocked')
+# Validation refusals: the gateway queued nothing, so the batch can be resubmitted
+REFUSED_STATUS_CODES = (400, 422)
+
+
+class PayoutService:
+    """
+    Batched payouts for approved withdrawals.
+
+    A run claims up to PAYOUT_RUN_LIMIT approved withdrawals (pending ->
+    processing, skipping rows another run holds) and reserves their funds
+    with a ledger debit before anything is sent, resolves each bank
+    account's transfer recipient (created once per account and provider, then
+    reused from BankAccount.transfer_recipients), and submits the transfers
+    in chunks of PAYOUT_BATCH_SIZE, PAYOUT_CONCURRENCY chunks at a time. The
+    withdrawal reference is the transfer reference, so a resubmission is
+    refused by the gateway instead of paying twice.
+
+    Transfers settle later: reconcile() verifies processing withdrawals and
+    completes them or fails them (crediting the reserved funds back), each in
+    its own transaction.
+    Gateway calls run in worker threads; the ORM is only used on the caller's.
+    """
+
+    @staticmethod
+    def get_gateway():
+        """Gateway named by PAYOUT_GATEWAY: 'paystack' or 'stub' (local)"""
+        from payment.gateways import PaystackGateway, StubTransferGateway
+
+        if getattr(settings, 'PAYOUT_GATEWAY', 'paystack') == 'stub':
+            return StubTransferGateway()
+        return PaystackGateway()
+
+    @staticmethod
+    def concurrency(tasks: int) -> int:
+        return max(1, min(tasks, getattr(settings, 'PAYOUT_CONCURRENCY', 4)))
+
+    @staticmethod
+    def approve(withdrawal, approved_by):
+        """Queue a pending withdrawal for the next payout run"""
+        if withdrawal.status != 'pending':
+            raise ValueError(f"Cannot approve {withdrawal.status} withdrawal")
+        withdrawal.approved_at = timezone.now()
+        withdrawal.approved_by = approved_by
+        withdrawal.save(update_fields=['approved_at', 'approved_by', 'updated_at'])
+        return withdrawal
+
+    @staticmethod
+    @transaction.atomic
+    def claim(provider: str, limit: int) -> List[WithdrawalRequest]:
+        """
+        Move approved withdrawals to processing so exactly one run pays them.
+
+        Each one's funds are reserved first; a withdrawal the wallet can no
+        longer cover is failed here instead of being sent.
+        """
+        from bank.services_withdrawal import WithdrawalService
+
+        now = timezone.now()
+        ids = list(
+            WithdrawalRequest.objects.select_for_update(skip_locked=True).filter(
+                status='pending',
+                approved_at__isnull=False,
+                payment_provider=provider
+            ).order_by('approved_at').values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+
+        withdrawals = list(
+            WithdrawalRequest.objects.filter(id__in=ids).select_related(
+                'bank_account', 'wallet', 'workspace_wallet', 'requested_by'
+            ).order_by('approved_at')
+        )
+        LedgerService.lock(*(withdrawal.wallet or withdrawal.workspace_wallet for withdrawal in withdrawals))
+
+        claimed = []
+        for withdrawal in withdrawals:
+            try:
+                with transaction.atomic():
+                    WithdrawalService.reserve_withdrawal(withdrawal)
+            except ValueError as e:
+                WithdrawalService.fail_withdrawal(withdrawal, str(e))
+                continue
+            withdrawal.status, withdrawal.processed_at = 'processing', now
+            claimed.append(withdrawal)
+
+        WithdrawalRequest.objects.filter(id__in=[withdrawal.id for withdrawal in claimed]).update(
+            status='processing', processed_at=now, updated_at=now
+        )
+        return claimed
+
+    @staticmethod
+    def release(withdrawal_ids: Iterable) -> None:
+        """Hand claimed withdrawals back to the next run (nothing was sent; funds stay reserved)"""
+        WithdrawalRequest.objects.filter(id__in=list(withdrawal_ids), status='processing').update(
+            status='pending', processed_at=None, updated_at=timezone.now()
+        )
+
+    @staticmethod
+    def recipient_signature(bank_account: BankAccount) -> str:
+        return f"{bank_account.bank_code}:{bank_account.account_number}"
+
+    @classmethod
+    def recipients(cls, bank_accounts: Iterable[BankAccount], gateway) -> Dict:
+        """Recipient code per bank account id, creating only the ones not cached yet"""
+        codes, missing = {}, []
+        for account in {account.pk: account for account in bank_accounts}.values():
+            cached = account.transfer_recipients.get(gateway.provider) or {}
+            if cached.get('account') == cls.recipient_signature(account) and cached.get('recipient_code'):
+                codes[account.pk] = cached['recipient_code']
+            else:
+                missing.append(account)
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=cls.concurrency(len(missing))) as pool:
+                results = list(pool.map(
+                    lambda account: gateway.create_transfer_recipient(
+                        type_account='nuban',
+                        account_number=account.account_number,
+                        bank_code=account.bank_code,
+                        name=account.account_name
+                    ),
+                    missing
+                ))
+            for account, result in zip(missing, results):
+                if not result.get('success'):
+                    logger.error(f"Failed to create transfer recipient for bank account {account.pk}: {result.get('error')}")
+                    continue
+                account.transfer_recipients = {
+                    **account.transfer_recipients,
+                    gateway.provider: {
+                        'recipient_code': result['recipient_code'],
+                        'account': cls.recipient_signature(account),
+                    }
+                }
+                account.save(update_fields=['transfer_recipients', 'updated_at'])
+                codes[account.pk] = result['recipient_code']
+        return codes
+
+    @classmethod
+    def submit(cls, withdrawals: List[WithdrawalRequest], codes: Dict, gateway) -> List:
+        """Send the transfers in chunks; returns (chunk, gateway response) pairs"""
+        size = getattr(settings, 'PAYOUT_BATCH_SIZE', 100)
+        chunks = [withdrawals[i:i + size] for i in range(0, len(withdrawals), size)]
+
+        def send(chunk):
+            return chunk, gateway.initiate_bulk_transfer([
+                {
+                    'amount': withdrawal.net_amount,
+                    'reference': withdrawal.reference,
+                    'reason': f"Withdrawal: {withdrawal.reference}",
+                    'recipient': codes[withdrawal.bank_account_id],
+                }
+                for withdrawal in chunk
+            ])
+
+        with ThreadPoolExecutor(max_workers=cls.concurrency(len(chunks))) as pool:
+            return list(pool.map(send, chunks))
+
+    @classmethod
+    def run(cls, gateway=None, limit: int = None) -> Dict[str, int]:
+        """Claim, submit and record one payout run"""
+        from bank.services_withdrawal import WithdrawalService
+
+        gateway = gateway or cls.get_gateway()
+        limit = limit or getattr(settings, 'PAYOUT_RUN_LIMIT', 1000)
+        counts = {'claimed': 0, 'submitted': 0, 'rejected': 0, 'retried': 0}
+
+        with span('bank.payout_run'):
+            withdrawals = cls.claim(gateway.provider, limit)
+            counts['claimed'] = len(withdrawals)
+            if not withdrawals:
+                return counts
+
+            codes = cls.recipients([withdrawal.bank_account for withdrawal in withdrawals], gateway)
+            retry = [withdrawal.id for withdrawal in withdrawals if withdrawal.bank_account_id not in codes]
+            ready = [withdrawal for withdrawal in withdrawals if withdrawal.bank_account_id in codes]
+
+            now = timezone.now()
+            for chunk, response in cls.submit(ready, codes, gateway):
+                if not response.get('success'):
+                    if response.get('status_code') in REFUSED_STATUS_CODES:
+                        # Refused as invalid: nothing was queued, try again next run
+                        retry.extend(withdrawal.id for withdrawal in chunk)
+                    # Otherwise (5xx, timeouts) some may have been queued; reconcile() looks the
+                    # references up and releases the ones the gateway never received
+                    logger.error(f"Bulk transfer of {len(chunk)} withdrawals failed: {response.get('error')}")
+                    continue
+
+                results = {item['reference']: item for item in response['transfers']}
+                accepted = []
+                for withdrawal in chunk:
+                    result = results.get(withdrawal.reference)
+                    if result is None:
+                        continue
+                    if result.get('status') in FAILED_STATUSES:
+                        WithdrawalService.fail_withdrawal(withdrawal, f"Transfer {result['status']}")
+                        counts['rejected'] += 1
+                        continue
+                    withdrawal.gateway_reference = result.get('transfer_code') or withdrawal.reference
+                    withdrawal.gateway_response = result
+                    withdrawal.updated_at = now
+                    accepted.append(withdrawal)
+                WithdrawalRequest.objects.bulk_update(accepted, ['gateway_reference', 'gateway_response', 'updated_at'])
+                counts['submitted'] += len(accepted)
+
+            if retry:
+                cls.release(retry)
+                counts['retried'] = len(retry)
+
+        logger.info(f"Payout run: {counts}")
+        return counts
+
+    @staticmethod
+    @transaction.atomic
+    def settle(withdrawal_id, verification: Dict) -> str:
+        from bank.services_withdrawal import WithdrawalService
+
+        withdrawal = WithdrawalRequest.objects.select_for_update(of=('self',)).select_related(
+            'wallet', 'workspace_wallet', 'bank_account'
+        ).filter(id=withdrawal_id, status='processing').first()
+        if withdrawal is None:
+            return 'unchanged'
+
+        if not verification.get('success'):
+            if verification.get('status_code') == 404:
+                # The gateway never received it
+                PayoutService.release([withdrawal.id])
+                return 'retried'
+            return 'unchanged'
+
+        status = verification.get('status')
+        if status in SUCCESS_STATUSES:
+            WithdrawalService.complete_withdrawal(withdrawal)
+            return 'completed'
+        if status in FAILED_STATUSES:
+            WithdrawalService.fail_withdrawal(withdrawal, f"Transfer {status}")
+            return 'failed'
+        return 'unchanged'
+
+    @classmethod
+    def reconcile(cls, gateway=None, older_than_minutes: int = None, limit: int = 500) -> Dict[str, int]:
+        """Verify submitted transfers and complete or fail their withdrawals"""
+        gateway = gateway or cls.get_gateway()
+        if older_than_minutes is None:
+            older_than_minutes = getattr(settings, 'PAYOUT_RECONCILE_AFTER_MINUTES', 2)
+
+        counts = {'checked': 0, 'completed': 0, 'failed': 0, 'retried': 0, 'unchanged': 0}
+        with span('bank.payout_reconcile'):
+            pending = list(
+                WithdrawalRequest.objects.filter(
+                    status='processing',
+                    approved_at__isnull=False,
+                    payment_provider=gateway.provider,
+                    processed_at__lte=timezone.now() - timedelta(minutes=older_than_minutes)
+                ).order_by('processed_at').values_list('id', 'reference')[:limit]
+            )
+            counts['checked'] = len(pending)
+            if not pending:
+                return counts
+
+            with ThreadPoolExecutor(max_workers=cls.concurrency(len(pending))) as pool:
+                verifications = list(pool.map(lambda row: gateway.verify_transfer(row[1]), pending))
+
+            for (withdrawal_id, reference), verification in zip(pending, verifications):
+                try:
+                    outcome = cls.settle(withdrawal_id, verification)
+                except Exception as e:
+                    logger.error(f"Reconciling payout {reference} failed: {str(e)}")
+                    outcome = 'unchanged'
+                counts[outcome] += 1
+
+        logger.info(f"Payout reconciliation: {counts}")
+        return counts
+
+
+__all__ = ['PayoutService']
@@ -242,7 +242,8 @@ class WithdrawalService:
             net_amount=net_amount,
             currency=owner_wallet.currency,
             status='pending',
-            reference=reference
+            reference=reference,
+            payment_provider=payment_provider
         )
         
         # Create pending transaction
@@ -296,6 +297,9 @@ class WithdrawalService:
         try:
             bank = withdrawal.bank_account
             
+            # Take the money out of the wallet before any is sent
+            WithdrawalService.reserve_withdrawal(withdrawal)
+            
             # Process via appropriate gateway
             if isinstance(gateway_handler, PaystackGateway):
                 # Create recipient first
@@ -345,13 +349,6 @@ class WithdrawalService:
             withdrawal.processed_at = timezone.now()
             withdrawal.save()
             
-            # Update transaction
-            transaction = withdrawal.transactions.first()
-            if transaction:
-                transaction.status = 'processing'
-                transaction.processed_at = timezone.now()
-                transaction.save()
-            
             logger.info(f"Processing withdrawal {withdrawal.reference} via gateway")
             
             return withdrawal
@@ -366,6 +363,7 @@ class WithdrawalService:
             raise ValidationError(f"Withdrawal processing failed: {str(e)}")
     
     @staticmethod
+    @transaction.atomic
     def complete_withdrawal(withdrawal):
         """
         Mark withdrawal as completed after successful transfer
@@ -375,9 +373,10 @@ class WithdrawalService:
             
         Returns:
             WithdrawalRequest instance
+            
+        Raises:
+            ValueError: If the funds were not reserved and the wallet can no longer cover the amount
         """
-        from bank.models import Transaction
-        
         now = timezone.now()
         
         # Update withdrawal
@@ -385,23 +384,8 @@ class WithdrawalService:
         withdrawal.completed_at = now
         withdrawal.save()
         
-        # Update transaction
-        transaction = withdrawal.transactions.first()
-        if transaction:
-            transaction.status = 'completed'
-            transaction.processed_at = now
-            transaction.save()
-        
-        # Debit wallet (supports both user and workspace wallets)
-        wallet = withdrawal.wallet or withdrawal.workspace_wallet
-        wallet.balance -= withdrawal.amount
-        
-        # Update total_withdrawn for workspace wallets
-        if hasattr(wallet, 'total_withdrawn'):
-            wallet.total_withdrawn += withdrawal.amount
-            wallet.save(update_fields=['balance', 'total_withdrawn'])
-        else:
-            wallet.save(update_fields=['balance'])
+        # Debit the wallet unless the funds were reserved when the transfer was sent
+        WithdrawalService.reserve_withdrawal(withdrawal)
         
         logger.info(f"Completed withdrawal {withdrawal.reference} for {withdrawal.amount}")
         
@@ -411,15 +395,67 @@ class WithdrawalService:
         return withdrawal
     
     @staticmethod
+    @transaction.atomic
+    def reserve_withdrawal(withdrawal):
+        """
+        Debit the withdrawal amount through the ledger before money is sent
+        
+        Completes the transaction created with the request (or records one),
+        so the funds cannot be spent while the transfer is in flight.
+        fail_withdrawal credits them back. Reserving twice is a no-op.
+        
+        Args:
+            withdrawal: WithdrawalRequest instance
+            
+        Returns:
+            The completed debit Transaction
+            
+        Raises:
+            ValueError: If the wallet can no longer cover the amount
+        """
+        from bank.models import WorkspaceWallet
+        from bank.services.ledger import LedgerService
+        
+        reserved = WithdrawalService._reserved_debit(withdrawal)
+        if reserved is not None:
+            return reserved
+        
+        # Supports both user and workspace wallets
+        wallet = withdrawal.wallet or withdrawal.workspace_wallet
+        pending = withdrawal.transactions.select_for_update().filter(status__in=['pending', 'processing']).first()
+        return LedgerService.post(
+            wallet,
+            -withdrawal.amount,
+            'withdrawal',
+            pending.description if pending else f"Withdrawal {withdrawal.reference}",
+            transaction_obj=pending,
+            # Update total_withdrawn for workspace wallets
+            totals=['total_withdrawn'] if isinstance(wallet, WorkspaceWallet) else [],
+            withdrawal_request=withdrawal
+        )
+    
+    @staticmethod
+    def _reserved_debit(withdrawal):
+        """The withdrawal's completed ledger debit, if its funds are reserved"""
+        return withdrawal.transactions.filter(
+            transaction_type='debit',
+            category='withdrawal',
+            status='completed'
+        ).first()
+    
+    @staticmethod
+    @transaction.atomic
     def fail_withdrawal(withdrawal, failure_reason):
         """
-        Mark withdrawal as failed
+        Mark withdrawal as failed, crediting reserved funds back
         
         Args:
             withdrawal: WithdrawalRequest instance
             failure_reason: Reason for failure
         """
-        from bank.models import Transaction
+        from django.db.models import F
+        from bank.models import WorkspaceWallet
+        from bank.services.ledger import LedgerService
         
         now = timezone.now()
         
@@ -429,9 +465,26 @@ class WithdrawalService:
         withdrawal.gateway_response = {'error': failure_reason}
         withdrawal.save()
         
+        # Return reserved funds to the wallet
+        reserved = WithdrawalService._reserved_debit(withdrawal)
+        if reserved is not None:
+            wallet = withdrawal.wallet or withdrawal.workspace_wallet
+            LedgerService.post(
+                wallet,
+                withdrawal.amount,
+                'withdrawal',
+                f"Withdrawal {withdrawal.reference} reversed: {failure_reason}",
+                withdrawal_request=withdrawal
+            )
+            if isinstance(wallet, WorkspaceWallet):
+                WorkspaceWallet.objects.filter(pk=wallet.pk).update(
+                    total_withdrawn=F('total_withdrawn') - withdrawal.amount
+                )
+            reserved.status = 'reversed'
+            reserved.save(update_fields=['status', 'updated_at'])
+        
         # Update transaction
-        transaction = withdrawal.transactions.first()
-        if transaction:
+        for transaction in withdrawal.transactions.filter(status__in=['pending', 'processing']):
             transaction.status = 'failed'
             transaction.failed_at = now
             transaction.failure_reason = failure_reason
@@ -0,0 +1,29 @@
+"""
+Celery tasks for batched withdrawal payouts
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='bank.tasks.run_payouts')
+def run_payouts(limit=None):
+    """
+    Claim approved withdrawals and submit them as bulk transfers.
+    Runs every 5 minutes.
+    """
+    from bank.services.payouts import PayoutService
+    
+    return PayoutService.run(limit=limit)
+
+
+@shared_task(name='bank.tasks.reconcile_payouts')
+def reconcile_payouts(older_than_minutes=None, limit=500):
+    """
+    Verify submitted transfers and complete (debit the wallet) or fail their
+    withdrawals. Runs every 2 minutes.
+    """
+    from bank.services.payouts import PayoutService
+    
+    return PayoutService.reconcile(older_than_minutes=older_than_minutes, limit=limit)
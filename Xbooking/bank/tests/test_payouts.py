@@ -0,0 +1,249 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from bank.models import BankAccount, WithdrawalRequest
+from bank.services import BankService
+from bank.services.ledger import LedgerService
+from bank.services.payouts import PayoutService
+from bank.services_withdrawal import WithdrawalService
+from core.services import EventBus
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace
+from payment.gateways import StubTransferGateway
+
+
+class RefusingGateway(StubTransferGateway):
+    """Answers every bulk request with `status_code`, queueing nothing"""
+
+    def __init__(self, status_code=400, **kwargs):
+        super().__init__(**kwargs)
+        self.status_code = status_code
+
+    def initiate_bulk_transfer(self, transfers, source='balance'):
+        self.batches.append([transfer['reference'] for transfer in transfers])
+        return {'success': False, 'error': 'Refused', 'status_code': self.status_code}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, PAYOUT_BATCH_SIZE=5, PAYOUT_CONCURRENCY=2)
+class TestPayoutService(TestCase):
+    def setUp(self):
+        for target in (
+            patch.object(EventBus, 'publish'),
+            patch.object(WithdrawalService, '_notify_withdrawal_request'),
+            patch.object(WithdrawalService, '_notify_withdrawal_completed'),
+            patch.object(WithdrawalService, '_notify_withdrawal_failed'),
+        ):
+            target.start()
+            self.addCleanup(target.stop)
+
+        self.admin = create_user("admin@example.com", full_name="Admin")
+        self.workspace = create_workspace(self.admin, name="Payout Workspace")
+        self.wallet, _ = BankService.create_workspace_wallet(self.workspace)
+        BankService.credit_workspace_wallet(self.wallet, Decimal('100000.00'), 'booking_earning', 'Earnings')
+        self.accounts = [
+            BankAccount.objects.create(
+                workspace=self.workspace, account_number=f"01234567{i:02d}", account_name="Payout Workspace",
+                bank_name="Bank", bank_code="058", is_verified=True
+            )
+            for i in range(3)
+        ]
+
+    def request(self, count, approve=True):
+        withdrawals = []
+        for i in range(count):
+            withdrawal = WithdrawalService.request_withdrawal(
+                self.wallet, self.accounts[i % len(self.accounts)], Decimal('1000.00'), self.admin
+            )
+            if approve:
+                PayoutService.approve(withdrawal, self.admin)
+            withdrawals.append(withdrawal)
+        return withdrawals
+
+    def statuses(self):
+        return dict(WithdrawalRequest.objects.values_list('reference', 'status'))
+
+    def test_run_submits_approved_withdrawals_in_chunks_with_cached_recipients(self):
+        approved = self.request(12)
+        unapproved = self.request(1, approve=False)[0]
+        gateway = StubTransferGateway()
+
+        counts = PayoutService.run(gateway=gateway)
+
+        self.assertEqual(counts, {'claimed': 12, 'submitted': 12, 'rejected': 0, 'retried': 0})
+        self.assertEqual(sorted(len(batch) for batch in gateway.batches), [2, 5, 5])
+        self.assertEqual(len(gateway.recipients), 3)
+        self.assertEqual(self.statuses()[unapproved.reference], 'pending')
+        for withdrawal in approved:
+            withdrawal.refresh_from_db()
+            self.assertEqual(withdrawal.status, 'processing')
+            self.assertEqual(withdrawal.gateway_reference, f"TRF_{withdrawal.reference}")
+            self.assertEqual(withdrawal.transactions.get().status, 'completed')
+
+        # Funds are reserved when claimed, before anything is sent
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('88000.00'))
+
+        # Recipients are reused by later runs; nothing is claimed twice
+        self.request(4)
+        counts = PayoutService.run(gateway=gateway)
+        self.assertEqual(counts['claimed'], 4)
+        self.assertEqual(len(gateway.recipients), 3)
+        self.assertEqual(PayoutService.run(gateway=gateway)['claimed'], 0)
+
+    def test_changed_account_details_get_a_new_recipient(self):
+        self.request(1)
+        gateway = StubTransferGateway()
+        PayoutService.run(gateway=gateway)
+
+        account = self.accounts[0]
+        account.refresh_from_db()
+        account.account_number = '0999999999'
+        account.save()
+        self.assertEqual(PayoutService.recipients([account], gateway), {account.pk: 'RCP_058_0999999999'})
+        self.assertEqual(gateway.recipients, ['0123456700', '0999999999'])
+
+    def test_reconcile_completes_and_fails_settled_transfers(self):
+        withdrawals = self.request(4)
+        gateway = StubTransferGateway(fail=[withdrawals[0].reference])
+        PayoutService.run(gateway=gateway)
+
+        counts = PayoutService.reconcile(gateway=gateway, older_than_minutes=0)
+
+        self.assertEqual(counts, {'checked': 4, 'completed': 3, 'failed': 1, 'retried': 0, 'unchanged': 0})
+        statuses = self.statuses()
+        self.assertEqual(statuses[withdrawals[0].reference], 'failed')
+        self.assertEqual([statuses[w.reference] for w in withdrawals[1:]], ['completed'] * 3)
+
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('97000.00'))
+        self.assertEqual(self.wallet.total_withdrawn, Decimal('3000.00'))
+        self.assertEqual(LedgerService.verify(self.wallet), [])
+        self.assertEqual(PayoutService.reconcile(gateway=gateway, older_than_minutes=0)['checked'], 0)
+
+    def test_pending_transfers_are_left_for_the_next_reconciliation(self):
+        self.request(2)
+        gateway = StubTransferGateway(settle_as='pending')
+        PayoutService.run(gateway=gateway)
+
+        counts = PayoutService.reconcile(gateway=gateway, older_than_minutes=0)
+
+        self.assertEqual(counts['unchanged'], 2)
+        self.assertEqual(set(self.statuses().values()), {'processing'})
+
+    def test_rejected_transfers_fail_at_submission(self):
+        withdrawals = self.request(2)
+        gateway = StubTransferGateway(reject=[withdrawals[1].reference])
+
+        counts = PayoutService.run(gateway=gateway)
+
+        self.assertEqual((counts['submitted'], counts['rejected']), (1, 1))
+        self.assertEqual(self.statuses()[withdrawals[1].reference], 'failed')
+
+    def test_refused_batches_and_unknown_transfers_go_back_to_pending(self):
+        withdrawals = self.request(6)
+        counts = PayoutService.run(gateway=RefusingGateway())
+
+        self.assertEqual(counts['retried'], 6)
+        self.assertEqual(set(self.statuses().values()), {'pending'})
+        # Still queued, so the funds stay reserved (once)
+        self.assertEqual({w.transactions.get().status for w in withdrawals}, {'completed'})
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('94000.00'))
+
+        # Claimed, then the bulk request was lost: the gateway has no such transfer
+        PayoutService.claim('paystack', 10)
+        counts = PayoutService.reconcile(gateway=StubTransferGateway(), older_than_minutes=0)
+        self.assertEqual(counts['retried'], 6)
+        self.assertEqual(set(self.statuses().values()), {'pending'})
+        self.assertEqual(LedgerService.verify(self.wallet), [])
+
+    def test_server_errors_stay_processing_until_reconciled(self):
+        withdrawals = self.request(3)
+        gateway = RefusingGateway(status_code=502)
+
+        counts = PayoutService.run(gateway=gateway)
+
+        # The gateway may have queued them: not resubmitted by the next run
+        self.assertEqual((counts['claimed'], counts['retried']), (3, 0))
+        self.assertEqual(set(self.statuses().values()), {'processing'})
+        self.assertEqual(PayoutService.run(gateway=gateway)['claimed'], 0)
+        self.assertEqual(len(gateway.batches), 1)
+
+        # Queued after all: reconciliation settles it; never received: released
+        gateway.queued[withdrawals[0].reference] = Decimal('980.00')
+        counts = PayoutService.reconcile(gateway=gateway, older_than_minutes=0)
+        self.assertEqual((counts['completed'], counts['retried']), (1, 2))
+        self.assertEqual(self.statuses()[withdrawals[0].reference], 'completed')
+
+    def test_claim_fails_withdrawals_the_wallet_no_longer_covers(self):
+        withdrawals = self.request(2)
+        BankService.debit_workspace_wallet(self.wallet, Decimal('98500.00'), 'fee', 'Spent meanwhile')
+        gateway = StubTransferGateway()
+
+        counts = PayoutService.run(gateway=gateway)
+
+        self.assertEqual(counts['claimed'], 1)
+        self.assertEqual(gateway.batches, [[withdrawals[0].reference]])
+        self.assertEqual(self.statuses()[withdrawals[1].reference], 'failed')
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('500.00'))
+        self.assertEqual(LedgerService.verify(self.wallet), [])
+
+    def test_failed_transfers_credit_the_reserved_funds_back_once(self):
+        withdrawal = self.request(1)[0]
+        gateway = StubTransferGateway(fail=[withdrawal.reference])
+        PayoutService.run(gateway=gateway)
+        PayoutService.reconcile(gateway=gateway, older_than_minutes=0)
+
+        withdrawal.refresh_from_db()
+        WithdrawalService.fail_withdrawal(withdrawal, 'Failed again')
+
+        self.wallet.refresh_from_db()
+        self.assertEqual((self.wallet.balance, self.wallet.total_withdrawn), (Decimal('100000.00'), Decimal('0.00')))
+        self.assertEqual(
+            sorted(withdrawal.transactions.values_list('transaction_type', 'status')),
+            [('credit', 'completed'), ('debit', 'reversed')]
+        )
+        self.assertEqual(LedgerService.verify(self.wallet), [])
+
+    def test_only_pending_withdrawals_can_be_approved(self):
+        withdrawal = self.request(1, approve=False)[0]
+        withdrawal.status = 'cancelled'
+        withdrawal.save()
+
+        with self.assertRaises(ValueError):
+            PayoutService.approve(withdrawal, self.admin)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestUserWithdrawalEndpoint(TestCase):
+    def setUp(self):
+        for target in (
+            patch.object(EventBus, 'publish'),
+            patch.object(WithdrawalService, '_notify_withdrawal_request'),
+        ):
+            target.start()
+            self.addCleanup(target.stop)
+
+        self.user = create_user("payee@example.com", full_name="Payee")
+        self.wallet, _ = BankService.create_wallet(self.user)
+        BankService.credit_wallet(self.wallet, Decimal('5000.00'), 'deposit', 'Top up')
+        self.account = BankAccount.objects.create(
+            user=self.user, account_number="0123456789", account_name="Payee",
+            bank_name="Bank", bank_code="058", is_verified=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_paystack_withdrawals_are_queued_for_the_payout_run(self):
+        response = self.client.post('/api/v1/bank/v1/user-withdrawals/', {
+            'bank_account': str(self.account.pk), 'amount': '2000.00', 'payment_provider': 'paystack'
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], 'pending')
+        withdrawal = WithdrawalRequest.objects.get()
+        self.assertIsNotNone(withdrawal.approved_at)
+        self.assertEqual(PayoutService.claim('paystack', 10), [withdrawal])
@@ -0,0 +1,227 @@
+import random
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.db import connection
+from django.db.models import ProtectedError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from bank.models import BankAccount, LedgerEntry, Transaction, Wallet
+from bank.services import BankService
+from bank.services.ledger import LedgerService
+from bank.services_withdrawal import WithdrawalService
+from booking.models import Booking
+from core.services import EventBus
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestWalletLedger(TestCase):
+    def setUp(self):
+        publish = patch.object(EventBus, 'publish')
+        publish.start()
+        self.addCleanup(publish.stop)
+
+        self.user = create_user("holder@example.com", full_name="Holder")
+        self.wallet, _ = BankService.create_wallet(self.user)
+        self.workspace = create_workspace(self.user, name="Ledger Workspace")
+        self.workspace_wallet, _ = BankService.create_workspace_wallet(self.workspace)
+
+    def test_every_posting_is_two_balanced_legs(self):
+        credit = BankService.credit_wallet(self.wallet, Decimal('100.00'), 'deposit', 'Top up')
+        debit = BankService.debit_wallet(self.wallet, Decimal('30.00'), 'booking_payment', 'Pay', reference='PAY-REF-1')
+
+        self.assertEqual(self.wallet.balance, Decimal('70.00'))
+        self.assertEqual((debit.reference, debit.balance_before, debit.balance_after),
+                         ('PAY-REF-1', Decimal('100.00'), Decimal('70.00')))
+        self.assertEqual(
+            list(credit.ledger_entries.order_by('id').values_list('account', 'amount', 'balance_after')),
+            [('wallet', Decimal('100.00'), Decimal('100.00')), ('gateway', Decimal('-100.00'), None)]
+        )
+        self.assertEqual(
+            list(debit.ledger_entries.order_by('id').values_list('account', 'amount')),
+            [('wallet', Decimal('-30.00')), ('bookings', Decimal('30.00'))]
+        )
+        self.assertEqual(LedgerService.verify(self.wallet), [])
+
+    def test_overdraft_and_locked_wallet_are_rejected_without_side_effects(self):
+        BankService.credit_wallet(self.wallet, Decimal('10.00'), 'deposit', 'Top up')
+
+        with self.assertRaisesMessage(ValueError, "Insufficient balance or wallet is locked"):
+            BankService.debit_wallet(self.wallet, Decimal('10.01'), 'fee', 'Fee')
+
+        Wallet.objects.filter(pk=self.wallet.pk).update(is_locked=True)
+        with self.assertRaisesMessage(ValueError, "Insufficient balance or wallet is locked"):
+            BankService.debit_wallet(self.wallet, Decimal('1.00'), 'fee', 'Fee')
+
+        with self.assertRaisesMessage(ValueError, "Insufficient balance"):
+            BankService.debit_workspace_wallet(self.workspace_wallet, Decimal('1.00'), 'refund', 'Refund')
+
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('10.00'))
+        self.assertEqual(Transaction.objects.count(), 1)
+        self.assertEqual(LedgerEntry.objects.count(), 2)
+
+    def test_entries_are_append_only(self):
+        transaction_obj = BankService.credit_wallet(self.wallet, Decimal('5.00'), 'deposit', 'Top up')
+        entry = transaction_obj.ledger_entries.first()
+
+        with self.assertRaises(ValueError):
+            entry.save()
+        with self.assertRaises(ValueError):
+            entry.delete()
+        with self.assertRaises(ValueError):
+            LedgerEntry.objects.filter(pk=entry.pk).update(amount=Decimal('500.00'))
+        with self.assertRaises(ValueError):
+            LedgerEntry.objects.all().delete()
+
+        # Deleting what the entries point at cannot erase them either
+        with self.assertRaises(ProtectedError):
+            transaction_obj.delete()
+        with self.assertRaises(ProtectedError):
+            self.wallet.delete()
+        self.assertEqual(LedgerEntry.objects.count(), 2)
+
+    def test_stale_instance_cannot_lose_an_update(self):
+        BankService.credit_wallet(self.wallet, Decimal('50.00'), 'deposit', 'Top up')
+        stale = Wallet.objects.get(pk=self.wallet.pk)
+
+        BankService.credit_wallet(self.wallet, Decimal('25.00'), 'deposit', 'Top up')
+        BankService.debit_wallet(stale, Decimal('60.00'), 'fee', 'Fee')
+
+        self.assertEqual(stale.balance, Decimal('15.00'))
+        self.assertEqual(LedgerService.verify(self.wallet), [])
+
+    def test_release_posts_the_pending_earning_through_the_ledger(self):
+        branch = create_branch(self.workspace)
+        space = create_space(branch, name="Desk")
+        check_in = timezone.now() + timedelta(days=1)
+        booking = Booking.objects.create(
+            workspace=self.workspace, space=space, user=self.user, booking_type='hourly',
+            booking_date=check_in.date(), start_time=check_in.time(), end_time=(check_in + timedelta(hours=2)).time(),
+            check_in=check_in, check_out=check_in + timedelta(hours=2),
+            base_price=Decimal('40.00'), total_price=Decimal('40.00')
+        )
+        pending = Transaction.objects.create(
+            reference='TXN-PENDING', transaction_type='credit', category='booking_payment',
+            amount=Decimal('40.00'), workspace_wallet=self.workspace_wallet, booking=booking,
+            balance_before=Decimal('0.00'), balance_after=Decimal('0.00'), status='pending', description='Held'
+        )
+
+        BankService.release_pending_payment(booking)
+
+        pending.refresh_from_db()
+        self.workspace_wallet.refresh_from_db()
+        self.assertEqual((pending.status, pending.category, pending.balance_after),
+                         ('completed', 'booking_earning', Decimal('40.00')))
+        self.assertEqual(self.workspace_wallet.total_earnings, Decimal('40.00'))
+        self.assertEqual(LedgerService.verify(self.workspace_wallet), [])
+
+        # Released once: nothing pending remains
+        self.assertIsNone(BankService.release_pending_payment(booking))
+
+    def test_lock_orders_wallets_canonically(self):
+        locked = LedgerService.lock(self.workspace_wallet, None, self.wallet, self.wallet)
+        self.assertEqual(locked, [self.wallet, self.workspace_wallet])
+
+    def test_completed_withdrawal_debits_once_through_the_ledger(self):
+        BankService.credit_workspace_wallet(self.workspace_wallet, Decimal('5000.00'), 'booking_earning', 'Earnings')
+        bank_account = BankAccount.objects.create(
+            workspace=self.workspace, account_number='0123456789', account_name='Ledger Workspace',
+            bank_name='Bank', bank_code='058', is_verified=True
+        )
+        with patch.object(WithdrawalService, '_notify_withdrawal_request'), \
+                patch.object(WithdrawalService, '_notify_withdrawal_completed'):
+            withdrawal = WithdrawalService.request_withdrawal(
+                self.workspace_wallet, bank_account, Decimal('2000.00'), self.user
+            )
+            # As after process_withdrawal hands it to the gateway
+            withdrawal.transactions.update(status='processing')
+            WithdrawalService.complete_withdrawal(withdrawal)
+
+        self.workspace_wallet.refresh_from_db()
+        self.assertEqual(self.workspace_wallet.balance, Decimal('3000.00'))
+        self.assertEqual(self.workspace_wallet.total_withdrawn, Decimal('2000.00'))
+        transaction_obj = withdrawal.transactions.get()
+        self.assertEqual((transaction_obj.status, transaction_obj.balance_after), ('completed', Decimal('3000.00')))
+        self.assertEqual(LedgerService.verify(self.workspace_wallet), [])
+
+    def test_interleaved_credits_and_debits_keep_the_invariants(self):
+        rng = random.Random(47)
+        expected = Decimal('0.00')
+        for _ in range(200):
+            amount = Decimal(rng.randint(1, 2000)) / 100
+            if rng.random() < 0.5:
+                BankService.credit_wallet(self.wallet, amount, 'deposit', 'Top up')
+                expected += amount
+            else:
+                try:
+                    BankService.debit_wallet(self.wallet, amount, 'fee', 'Fee')
+                    expected -= amount
+                except ValueError:
+                    self.assertLess(expected, amount)
+
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, expected)
+        self.assertEqual(LedgerService.verify(self.wallet), [])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Row-level locking requires PostgreSQL')
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestWalletLedgerConcurrency(TransactionTestCase):
+    """Hammer one wallet from many connections at once"""
+
+    THREADS = 8
+    OPERATIONS = 40
+
+    def setUp(self):
+        publish = patch.object(EventBus, 'publish')
+        publish.start()
+        self.addCleanup(publish.stop)
+
+        self.user = create_user("busy@example.com", full_name="Busy")
+        self.wallet, _ = BankService.create_wallet(self.user)
+        BankService.credit_wallet(self.wallet, Decimal('100.00'), 'deposit', 'Opening')
+
+    def test_concurrent_credits_and_debits(self):
+        applied = []
+        errors = []
+        barrier = threading.Barrier(self.THREADS)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            wallet = Wallet.objects.get(pk=self.wallet.pk)
+            barrier.wait()
+            try:
+                for _ in range(self.OPERATIONS):
+                    amount = Decimal(rng.randint(100, 1500)) / 100
+                    try:
+                        if rng.random() < 0.5:
+                            BankService.credit_wallet(wallet, amount, 'deposit', 'Top up')
+                            applied.append(amount)
+                        else:
+                            BankService.debit_wallet(wallet, amount, 'fee', 'Fee')
+                            applied.append(-amount)
+                    except ValueError:
+                        pass
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('100.00') + sum(applied, Decimal('0.00')))
+        self.assertGreaterEqual(self.wallet.balance, 0)
+        self.assertEqual(LedgerEntry.objects.filter(wallet=self.wallet).count(), 2 * (len(applied) + 1))
+        self.assertEqual(LedgerService.verify(self.wallet), [])
@@ -15,8 +15,9 @@ from bank.serializers.v1.withdrawal import (
     WithdrawalRequestSerializer,
     RequestWithdrawalSerializer
 )
+from bank.services.payouts import PayoutService
 from bank.services_withdrawal import WithdrawalService
-from payment.gateways import PaystackGateway, FlutterwaveGateway
+from payment.gateways import FlutterwaveGateway
 
 
 class UserWithdrawalViewSet(CachedModelViewSet):
@@ -71,29 +72,23 @@ class UserWithdrawalViewSet(CachedModelViewSet):
                 owner_wallet=wallet,
                 bank_account=bank_account,
                 amount=amount,
-                user=request.user
+                user=request.user,
+                payment_provider=payment_provider
             )
             
-            # Get gateway handler
             if payment_provider == 'paystack':
-                gateway = PaystackGateway()
-            elif payment_provider == 'flutterwave':
-                gateway = FlutterwaveGateway()
+                # Paid out by the next batched payout run
+                PayoutService.approve(withdrawal, request.user)
+                message = 'Withdrawal request queued for payout'
             else:
-                return ErrorResponse(
-                    message='Invalid payment provider',
-                    status_code=400
-                )
-            
-            # Process withdrawal immediately
-            WithdrawalService.process_withdrawal(withdrawal, gateway)
-            
-            # Complete withdrawal (in production, wait for webhook)
-            WithdrawalService.complete_withdrawal(withdrawal)
+                # Flutterwave has no batch payout path yet: pay it out immediately
+                WithdrawalService.process_withdrawal(withdrawal, FlutterwaveGateway())
+                WithdrawalService.complete_withdrawal(withdrawal)
+                message = 'Withdrawal request processed successfully'
             
             serializer = WithdrawalRequestSerializer(withdrawal)
             return SuccessResponse(
-                message='Withdrawal request processed successfully',
+                message=message,
                 data=serializer.data,
                 status_code=201
             )
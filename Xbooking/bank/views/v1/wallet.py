@@ -11,7 +11,7 @@ logger = logging.getLogger(__name__)
 
 from core.views import CachedModelViewSet
 from core.responses import SuccessResponse, ErrorResponse
-from core.pagination import StandardResultsSetPagination
+from core.pagination import StandardResultsSetPagination, CursorResultsSetPagination
 from bank.models import Wallet, WorkspaceWallet, Transaction, Deposit
 from bank.serializers.v1 import (
     WalletSerializer,
@@ -32,7 +32,7 @@ class WalletViewSet(CachedModelViewSet):
     """ViewSet for managing user wallets"""
     serializer_class = WalletSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = CursorResultsSetPagination
     cache_timeout = 300
     http_method_names = ['get', 'post']
     
@@ -161,7 +161,7 @@ class WorkspaceWalletViewSet(CachedModelViewSet):
     """ViewSet for managing workspace wallets (admin only)"""
     serializer_class = WorkspaceWalletSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = CursorResultsSetPagination
     cache_timeout = 300
     http_method_names = ['get']
     
@@ -244,7 +244,7 @@ class TransactionViewSet(CachedModelViewSet):
     """ViewSet for viewing transactions"""
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = CursorResultsSetPagination
     cache_timeout = 600
     http_method_names = ['get']
     
@@ -17,6 +17,7 @@ from bank.serializers.v1 import (
     ProcessWithdrawalSerializer
 )
 from bank.services import BankService
+from bank.services.payouts import PayoutService
 from workspace.permissions import check_workspace_member
 
 
@@ -149,16 +150,13 @@ class WithdrawalRequestViewSet(CachedModelViewSet):
                 withdrawal.save(update_fields=['admin_notes'])
         
         try:
-            # Process withdrawal
-            BankService.process_withdrawal(withdrawal)
-            
-            # TODO: Integrate with payment gateway for actual bank transfer
-            # For now, mark as completed
-            BankService.complete_withdrawal(withdrawal)
+            # Queue for the next batched payout run, which reserves the funds and
+            # sends the transfer; it completes once the gateway settles it
+            PayoutService.approve(withdrawal, request.user)
             
             serializer = WithdrawalRequestSerializer(withdrawal)
             return SuccessResponse(
-                message='Withdrawal processed successfully',
+                message='Withdrawal approved for payout',
                 data=serializer.data
             )
         except ValueError as e:
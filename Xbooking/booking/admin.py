@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.db.models import Sum
 from datetime import timedelta
-from booking.models import Booking, Cart, CartItem, BookingReview, Reservation, Checkout
+from booking.models import Booking, Cart, CartItem, BookingReview, Reservation, Checkout, WaitlistEntry
 
 
 class CartItemInline(admin.TabularInline):
@@ -240,6 +240,7 @@ class CartAdmin(admin.ModelAdmin):
     def clear_carts(self, request, queryset):
         for cart in queryset:
             cart.items.all().delete()
+            cart.reset_totals()
         self.message_user(request, f'Cleared items from {queryset.count()} cart(s).')
     clear_carts.short_description = 'Clear selected carts'
     
@@ -409,6 +410,31 @@ class ReservationAdmin(admin.ModelAdmin):
         return qs.select_related('space', 'user')
 
 
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ['entry_id_display', 'space_display', 'user_display', 'status', 'priority', 'start', 'end', 'offered_at', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['space__name', 'user__email']
+    readonly_fields = ['id', 'reservation', 'offered_at', 'created_at', 'updated_at']
+    ordering = ['-created_at']
+
+    def entry_id_display(self, obj):
+        return str(obj.id)[:8]
+    entry_id_display.short_description = 'Entry ID'
+
+    def space_display(self, obj):
+        return obj.space.name
+    space_display.short_description = 'Space'
+
+    def user_display(self, obj):
+        return obj.user.email
+    user_display.short_description = 'User'
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        return qs.select_related('space', 'user')
+
+
 @admin.register(Checkout)
 class CheckoutAdmin(admin.ModelAdmin):
     list_display = ['checkout_id_display', 'user_display', 'bookings_count', 'updated_at']
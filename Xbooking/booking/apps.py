@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from django.conf import settings
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class BookingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'booking'
+
+    def ready(self):
+        """
+        Start the reservation hold expiry listener in processes that opt in
+        (RESERVATION_HOLD_LISTENER_ENABLED); Celery workers start their own on
+        worker_ready and the periodic sweep covers the rest
+        """
+        if not getattr(settings, 'RESERVATION_HOLD_LISTENER_ENABLED', False):
+            return
+
+        try:
+            from booking.services.holds import ReservationHoldService
+            ReservationHoldService.start_expiry_listener()
+        except Exception as e:
+            logger.error(f"Failed to start reservation hold listener: {str(e)}")
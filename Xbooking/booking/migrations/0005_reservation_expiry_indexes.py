@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_alter_booking_number_of_guests'),
+        ('workspace', '0002_add_reserved_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['status', 'expires_at'], name='booking_res_status_4058bc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['space', 'status', 'start', 'end'], name='booking_res_space_i_4c3bbe_idx'),
+        ),
+    ]
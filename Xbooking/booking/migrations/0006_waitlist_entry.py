@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:15
+
+import django.core.validators
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_reservation_expiry_indexes'),
+        ('workspace', '0003_spacecalendarslot_reservation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('start', models.DateTimeField(help_text='Requested start datetime')),
+                ('end', models.DateTimeField(help_text='Requested end datetime')),
+                ('booking_type', models.CharField(choices=[('hourly', 'Hourly'), ('daily', 'Daily')], default='hourly', max_length=20)),
+                ('number_of_guests', models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)])),
+                ('priority', models.IntegerField(default=0, help_text='Higher priority entries are offered first')),
+                ('status', models.CharField(choices=[('waiting', 'Waiting'), ('offered', 'Offered'), ('fulfilled', 'Fulfilled'), ('expired', 'Expired'), ('cancelled', 'Cancelled')], default='waiting', max_length=20)),
+                ('offered_at', models.DateTimeField(blank=True, null=True)),
+                ('reservation', models.ForeignKey(blank=True, help_text='Hold created when the range was offered', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='waitlist_entries', to='booking.reservation')),
+                ('space', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='workspace.space')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'booking_waitlist_entry',
+                'ordering': ['-priority', 'created_at'],
+                'indexes': [models.Index(fields=['space', 'status', 'start'], name='booking_wai_space_i_2a5fb9_idx'), models.Index(fields=['reservation', 'status'], name='booking_wai_reserva_e57952_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'waiting')), fields=('space', 'user', 'start', 'end'), name='unique_waiting_entry')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:26
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0006_waitlist_entry'),
+        ('workspace', '0004_slot_occupancy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='seats',
+            field=models.PositiveIntegerField(default=1, help_text='Seats held (shared spaces only)'),
+        ),
+        migrations.CreateModel(
+            name='SeatClaim',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('seats', models.PositiveIntegerField(default=1)),
+                ('booking', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='seat_claims', to='booking.booking')),
+                ('reservation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_claims', to='booking.reservation')),
+                ('slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_claims', to='workspace.spacecalendarslot')),
+            ],
+            options={
+                'db_table': 'booking_seat_claim',
+                'indexes': [models.Index(fields=['reservation', 'booking'], name='booking_sea_reserva_42315d_idx')],
+                'unique_together': {('slot', 'reservation')},
+            },
+        ),
+    ]
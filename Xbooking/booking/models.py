@@ -13,6 +13,7 @@ from django.utils import timezone
 from datetime import time
 
 from core.mixins import UUIDModelMixin, TimestampedModelMixin, CachedModelMixin, ActiveModelMixin
+from core.cache import CacheService
 
 def generate_verification_code():
     """Generate a unique verification code for guests"""
@@ -101,6 +102,15 @@ class Booking(UUIDModelMixin, TimestampedModelMixin, CachedModelMixin, models.Mo
     def __str__(self):
         return f"Booking {self.id} - {self.space.name} by {self.user.email}"
     
+    @classmethod
+    def invalidate_caches(cls, booking_ids, user_id):
+        """
+        Invalidate several of one user's bookings at once: their instance keys
+        in one call and the user's cached booking responses by one pattern
+        """
+        CacheService.delete_many([cls.get_cache_key(booking_id) for booking_id in booking_ids])
+        CacheService.delete_pattern(f'booking:*{user_id}*')
+    
     @property
     def days_used(self):
         """Calculate days used for monthly bookings"""
@@ -145,6 +155,7 @@ class Reservation(UUIDModelMixin, TimestampedModelMixin, models.Model):
     end = models.DateTimeField(help_text='Reservation end datetime')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     expires_at = models.DateTimeField(help_text='When this reservation expires')
+    seats = models.PositiveIntegerField(default=1, help_text='Seats held (shared spaces only)')
     
     def is_expired(self):
         """Check if reservation has expired"""
@@ -160,6 +171,11 @@ class Reservation(UUIDModelMixin, TimestampedModelMixin, models.Model):
     class Meta:
         db_table = 'booking_reservation'
         ordering = ['-created_at']
+        indexes = [
+            # Background reaper scans by expiry; request path checks one space/range
+            models.Index(fields=['status', 'expires_at']),
+            models.Index(fields=['space', 'status', 'start', 'end']),
+        ]
 
     def __str__(self):
         return f"Reservation {self.id} - {self.space.name} ({self.start} - {self.end})"
@@ -185,15 +201,98 @@ class Cart(UUIDModelMixin, TimestampedModelMixin, CachedModelMixin, models.Model
     def __str__(self):
         return f"Cart {self.id} - {self.user.email}"
     
+    @staticmethod
+    def snapshot_cache_key(user_id):
+        """Cache key for the serialized cart returned by GET /cart"""
+        return f"cart:snapshot:{user_id}"
+    
+    @classmethod
+    def invalidate_snapshot(cls, user_id):
+        CacheService.delete(cls.snapshot_cache_key(user_id))
+    
+    def _write_totals(self, **values):
+        # Queryset update: skips the full-row save and model-wide cache pattern purge
+        values['updated_at'] = timezone.now()
+        Cart.objects.filter(pk=self.pk).update(**values)
+        Cart.invalidate_snapshot(self.user_id)
+    
     def calculate_totals(self):
-        """Recalculate cart totals"""
-        items = self.items.all()
-        self.subtotal = sum(item.price for item in items)
-        self.discount_total = sum(item.discount_amount for item in items)
-        self.tax_total = sum(item.tax_amount for item in items)
+        """Recalculate cart totals from its items with a single aggregate query"""
+        totals = self.items.aggregate(
+            subtotal=models.Sum('price'),
+            discount_total=models.Sum('discount_amount'),
+            tax_total=models.Sum('tax_amount'),
+            item_count=models.Count('id')
+        )
+        self.subtotal = totals['subtotal'] or Decimal('0')
+        self.discount_total = totals['discount_total'] or Decimal('0')
+        self.tax_total = totals['tax_total'] or Decimal('0')
         self.total = self.subtotal - self.discount_total + self.tax_total
-        self.item_count = items.count()
-        self.save()
+        self.item_count = totals['item_count']
+        self._write_totals(
+            subtotal=self.subtotal,
+            discount_total=self.discount_total,
+            tax_total=self.tax_total,
+            total=self.total,
+            item_count=self.item_count
+        )
+    
+    def apply_item_delta(self, item, sign=1):
+        """
+        Add (sign=1) or subtract (sign=-1) one item's amounts from the totals
+        
+        Uses F() expressions so concurrent add/remove requests on the same
+        cart cannot lose each other's updates.
+        """
+        price = item.price * sign
+        discount = item.discount_amount * sign
+        tax = item.tax_amount * sign
+        self._write_totals(
+            subtotal=models.F('subtotal') + price,
+            discount_total=models.F('discount_total') + discount,
+            tax_total=models.F('tax_total') + tax,
+            total=models.F('total') + (price - discount + tax),
+            item_count=models.F('item_count') + sign
+        )
+        self.subtotal += price
+        self.discount_total += discount
+        self.tax_total += tax
+        self.total += price - discount + tax
+        self.item_count += sign
+    
+    def reset_totals(self):
+        """Zero the totals after all items were removed"""
+        self.subtotal = self.discount_total = self.tax_total = self.total = Decimal('0')
+        self.item_count = 0
+        self._write_totals(
+            subtotal=Decimal('0'),
+            discount_total=Decimal('0'),
+            tax_total=Decimal('0'),
+            total=Decimal('0'),
+            item_count=0
+        )
+    
+    @classmethod
+    def refresh_totals(cls, cart_ids):
+        """Recompute totals for several carts in one UPDATE (e.g. after reservations expired)"""
+        from django.db.models import Count, DecimalField, IntegerField, OuterRef, Subquery, Sum
+        from django.db.models.functions import Coalesce
+        
+        def item_aggregate(aggregate, output_field, default):
+            per_cart = CartItem.objects.filter(cart=OuterRef('pk')).values('cart').annotate(value=aggregate).values('value')
+            return Coalesce(Subquery(per_cart, output_field=output_field), default, output_field=output_field)
+        
+        money = DecimalField(max_digits=10, decimal_places=2)
+        cls.objects.filter(id__in=cart_ids).update(
+            subtotal=item_aggregate(Sum('price'), money, Decimal('0')),
+            discount_total=item_aggregate(Sum('discount_amount'), money, Decimal('0')),
+            tax_total=item_aggregate(Sum('tax_amount'), money, Decimal('0')),
+            total=item_aggregate(
+                Sum(models.F('price') - models.F('discount_amount') + models.F('tax_amount')), money, Decimal('0')
+            ),
+            item_count=item_aggregate(Count('id'), IntegerField(), 0),
+            updated_at=timezone.now()
+        )
 
 
 class CartItem(UUIDModelMixin, TimestampedModelMixin, models.Model):
@@ -236,6 +335,84 @@ class CartItem(UUIDModelMixin, TimestampedModelMixin, models.Model):
         return f"CartItem - {self.space.name} on {self.booking_date}"
 
 
+class SeatClaim(UUIDModelMixin, TimestampedModelMixin, models.Model):
+    """Seats a reservation (and, after checkout, its booking) holds on one slot of a shared space.
+
+    The claims back `SpaceCalendarSlot.occupied`, so releasing a reservation
+    or booking knows exactly which counters to decrement and by how much.
+    """
+    slot = models.ForeignKey('workspace.SpaceCalendarSlot', on_delete=models.CASCADE, related_name='seat_claims')
+    reservation = models.ForeignKey(Reservation, on_delete=models.CASCADE, related_name='seat_claims')
+    booking = models.ForeignKey(Booking, on_delete=models.SET_NULL, null=True, blank=True, related_name='seat_claims')
+    seats = models.PositiveIntegerField(default=1)
+    
+    class Meta:
+        db_table = 'booking_seat_claim'
+        unique_together = ('slot', 'reservation')
+        indexes = [
+            models.Index(fields=['reservation', 'booking']),
+        ]
+    
+    def __str__(self):
+        return f"SeatClaim {self.id} - {self.seats} seat(s)"
+
+
+class WaitlistEntry(UUIDModelMixin, TimestampedModelMixin, models.Model):
+    """A user waiting for a taken time range on a space.
+
+    When the range frees up, the next entry in priority order is offered a
+    short reservation that is added to the user's cart.
+    """
+    STATUS_CHOICES = [
+        ('waiting', 'Waiting'),
+        ('offered', 'Offered'),
+        ('fulfilled', 'Fulfilled'),
+        ('expired', 'Expired'),
+        ('cancelled', 'Cancelled'),
+    ]
+    BOOKING_TYPE_CHOICES = [
+        ('hourly', 'Hourly'),
+        ('daily', 'Daily'),
+    ]
+    
+    space = models.ForeignKey(Space, on_delete=models.CASCADE, related_name='waitlist_entries')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='waitlist_entries')
+    start = models.DateTimeField(help_text='Requested start datetime')
+    end = models.DateTimeField(help_text='Requested end datetime')
+    booking_type = models.CharField(max_length=20, choices=BOOKING_TYPE_CHOICES, default='hourly')
+    number_of_guests = models.IntegerField(validators=[MinValueValidator(0)], default=0)
+    priority = models.IntegerField(default=0, help_text='Higher priority entries are offered first')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='waiting')
+    reservation = models.ForeignKey(
+        Reservation,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='waitlist_entries',
+        help_text='Hold created when the range was offered'
+    )
+    offered_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        db_table = 'booking_waitlist_entry'
+        ordering = ['-priority', 'created_at']
+        indexes = [
+            # Hand-off seeks the waiting entries of one space by start time
+            models.Index(fields=['space', 'status', 'start']),
+            models.Index(fields=['reservation', 'status']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['space', 'user', 'start', 'end'],
+                condition=models.Q(status='waiting'),
+                name='unique_waiting_entry'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"WaitlistEntry {self.id} - {self.space.name} ({self.start} - {self.end})"
+
+
 class BookingReview(UUIDModelMixin, TimestampedModelMixin, CachedModelMixin, models.Model):
     """Model for booking reviews and ratings"""
     booking = models.OneToOneField(Booking, on_delete=models.CASCADE, related_name='review')
@@ -13,7 +13,10 @@ from .cart import (
     AddToCartSerializer,
     RemoveFromCartSerializer,
     CheckoutSerializer,
+    RecurringCartSerializer,
 )
+from .quote import QuoteItemSerializer, QuoteRequestSerializer
+from .waitlist import WaitlistEntrySerializer, JoinWaitlistSerializer
 from .review import BookingReviewSerializer, CreateReviewSerializer
 from .guest import (
     GuestSerializer,
@@ -34,6 +37,11 @@ __all__ = [
     'AddToCartSerializer',
     'RemoveFromCartSerializer',
     'CheckoutSerializer',
+    'RecurringCartSerializer',
+    'QuoteItemSerializer',
+    'QuoteRequestSerializer',
+    'WaitlistEntrySerializer',
+    'JoinWaitlistSerializer',
     'BookingReviewSerializer',
     'CreateReviewSerializer',
     'GuestSerializer',
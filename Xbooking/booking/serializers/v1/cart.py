@@ -5,6 +5,7 @@ from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
 from decimal import Decimal
 from datetime import datetime
+import re
 
 from booking.models import Cart, CartItem
 from workspace.serializers.v1 import SpaceMinimalSerializer
@@ -66,7 +67,7 @@ class CartSerializer(serializers.ModelSerializer):
     @extend_schema_field(serializers.IntegerField())
     def get_item_count(self, obj):
         """Get count of items in cart"""
-        return obj.items.count()
+        return obj.item_count
 
 
 class AddToCartSerializer(serializers.Serializer):
@@ -81,6 +82,11 @@ class AddToCartSerializer(serializers.Serializer):
         default='daily'
     )
     number_of_guests = serializers.IntegerField(min_value=0, default=0)
+    seats = serializers.IntegerField(
+        min_value=1,
+        default=1,
+        help_text='Seats to book on coworking, desk and lounge spaces'
+    )
     special_requests = serializers.CharField(
         required=False,
         allow_blank=True,
@@ -131,3 +137,62 @@ class CheckoutSerializer(serializers.Serializer):
         required=False,
         help_text='Specific cart items to checkout (optional, defaults to all)'
     )
+
+
+class RecurringCartSerializer(serializers.Serializer):
+    """Serializer for adding every occurrence of a recurrence rule to the cart"""
+    MAX_OCCURRENCES = 100
+    
+    space_id = serializers.UUIDField(required=True)
+    start_date = serializers.DateField(required=True, help_text='Date of the first occurrence')
+    start_time = serializers.TimeField(required=True)
+    end_time = serializers.TimeField(required=True)
+    rrule = serializers.CharField(
+        max_length=500,
+        help_text='RFC 5545 recurrence rule, e.g. FREQ=WEEKLY;BYDAY=TU;COUNT=12'
+    )
+    booking_type = serializers.ChoiceField(
+        choices=['hourly', 'daily'],
+        default='hourly'
+    )
+    number_of_guests = serializers.IntegerField(min_value=0, default=0)
+    special_requests = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        max_length=500
+    )
+    allow_partial = serializers.BooleanField(
+        default=True,
+        help_text='Add the free occurrences even if some conflict (otherwise add nothing)'
+    )
+    
+    def validate(self, data):
+        """Expand the rule into occurrence dates, at most MAX_OCCURRENCES"""
+        from itertools import islice
+        from dateutil.rrule import rrulestr
+        
+        if data['start_time'] >= data['end_time']:
+            raise serializers.ValidationError('End time must be after start time')
+        
+        if re.search(r'FREQ\s*=\s*(HOURLY|MINUTELY|SECONDLY)', data['rrule'], re.IGNORECASE):
+            raise serializers.ValidationError({'rrule': 'Rules more frequent than DAILY are not supported'})
+        
+        try:
+            rule = rrulestr(data['rrule'], dtstart=datetime.combine(data['start_date'], data['start_time']))
+        except (ValueError, TypeError) as e:
+            raise serializers.ValidationError({'rrule': f'Invalid recurrence rule: {e}'})
+        
+        # The rule is iterated lazily, so an unbounded rule costs only MAX_OCCURRENCES + 1 steps
+        occurrences = [dt.date() for dt in islice(rule, self.MAX_OCCURRENCES + 1)]
+        if len(occurrences) > self.MAX_OCCURRENCES:
+            raise serializers.ValidationError(
+                {'rrule': f'Rule expands to more than {self.MAX_OCCURRENCES} occurrences; add COUNT or UNTIL'}
+            )
+        if not occurrences:
+            raise serializers.ValidationError({'rrule': 'Rule has no occurrences'})
+        # One booking per date: sub-daily rules (FREQ=HOURLY, BYHOUR=9,14...) repeat dates
+        if len(set(occurrences)) != len(occurrences):
+            raise serializers.ValidationError({'rrule': 'Rule must not repeat within a day'})
+        
+        data['occurrence_dates'] = occurrences
+        return data
@@ -0,0 +1,38 @@
+"""
+Quote Serializers V1
+"""
+from rest_framework import serializers
+from datetime import datetime
+
+
+class QuoteItemSerializer(serializers.Serializer):
+    """One candidate booking to price and check"""
+    space_id = serializers.UUIDField(required=True)
+    booking_date = serializers.DateField(required=True)
+    start_time = serializers.TimeField(required=True)
+    end_time = serializers.TimeField(required=True)
+    booking_type = serializers.ChoiceField(
+        choices=['hourly', 'daily', 'monthly'],
+        default='hourly'
+    )
+    
+    def validate(self, data):
+        """Validate the time range"""
+        check_in = datetime.combine(data['booking_date'], data['start_time'])
+        check_out = datetime.combine(data['booking_date'], data['end_time'])
+        
+        if check_in >= check_out:
+            raise serializers.ValidationError('End time must be after start time')
+        
+        return data
+
+
+class QuoteRequestSerializer(serializers.Serializer):
+    """Serializer for batch quote requests"""
+    items = QuoteItemSerializer(many=True, allow_empty=False)
+    
+    def validate_items(self, value):
+        """Cap batch size so one request stays a handful of bounded queries"""
+        if len(value) > 100:
+            raise serializers.ValidationError('At most 100 items can be quoted per request')
+        return value
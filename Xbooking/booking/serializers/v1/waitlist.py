@@ -0,0 +1,51 @@
+"""
+Waitlist Serializers V1
+"""
+from rest_framework import serializers
+from datetime import datetime
+
+from booking.models import WaitlistEntry
+from workspace.serializers.v1 import SpaceMinimalSerializer
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    """Serializer for waitlist entries"""
+    space_details = SpaceMinimalSerializer(source='space', read_only=True)
+    reservation_expires_at = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            'id', 'space', 'space_details', 'start', 'end', 'booking_type',
+            'number_of_guests', 'status', 'reservation', 'reservation_expires_at',
+            'offered_at', 'created_at'
+        ]
+        read_only_fields = fields
+    
+    def get_reservation_expires_at(self, obj):
+        if obj.status == 'offered' and obj.reservation:
+            return obj.reservation.expires_at
+        return None
+
+
+class JoinWaitlistSerializer(serializers.Serializer):
+    """Serializer for joining the waitlist of a taken time range"""
+    space_id = serializers.UUIDField(required=True)
+    booking_date = serializers.DateField(required=True)
+    start_time = serializers.TimeField(required=True)
+    end_time = serializers.TimeField(required=True)
+    booking_type = serializers.ChoiceField(
+        choices=['hourly', 'daily'],
+        default='hourly'
+    )
+    number_of_guests = serializers.IntegerField(min_value=0, default=0)
+    
+    def validate(self, data):
+        """Validate the time range"""
+        check_in = datetime.combine(data['booking_date'], data['start_time'])
+        check_out = datetime.combine(data['booking_date'], data['end_time'])
+        
+        if check_in >= check_out:
+            raise serializers.ValidationError('End time must be after start time')
+        
+        return data
@@ -2,14 +2,21 @@
 Booking Service Layer
 """
 import logging
+import uuid
 from decimal import Decimal
 from datetime import timedelta
 from django.utils import timezone
 from django.db import transaction
 from core.services import EventBus, Event, EventTypes
 from core.cache import CacheService
+from core.instrumentation import timed
 from booking.models import Booking, Cart, CartItem, Checkout, Guest, Reservation
 from workspace.models import Space
+from workspace.services import AvailabilityService
+from booking.services.holds import ReservationHoldService
+from booking.services.quotes import QuoteService
+from booking.services.waitlist import WaitlistService
+from booking.services.occupancy import OccupancyService
 
 logger = logging.getLogger(__name__)
 
@@ -88,6 +95,7 @@ class BookingService:
         return booking
     
     @staticmethod
+    @timed('booking.cancel_booking')
     @transaction.atomic
     def cancel_booking(booking, cancelled_by=None, reason=None, reason_description=""):
         """
@@ -181,6 +189,7 @@ class BookingService:
             booking.status = 'cancelled'
             booking.cancelled_at = now
             booking.save(update_fields=['status', 'cancelled_at', 'updated_at'])
+            BookingService.release_booking_slots(booking)
             
             # Process refund if eligible
             if refund_amount > Decimal('0'):
@@ -303,6 +312,7 @@ class BookingService:
         booking.status = 'cancelled'
         booking.cancelled_at = now
         booking.save(update_fields=['status', 'cancelled_at', 'updated_at'])
+        BookingService.release_booking_slots(booking)
         
         # Process refund if applicable
         if refund_amount > Decimal('0'):
@@ -550,18 +560,44 @@ class BookingService:
         return booking
     
     @staticmethod
+    def release_booking_slots(booking):
+        """
+        Free the calendar slots of a cancelled booking and hand them to the waitlist
+        
+        Args:
+            booking: Cancelled Booking instance
+        """
+        from workspace.models import SpaceCalendarSlot
+        
+        released = SpaceCalendarSlot.objects.filter(
+            booking=booking,
+            status='booked'
+        ).update(status='available', booking=None, reservation=None)
+        released += OccupancyService.release_booking(booking)
+        
+        if released:
+            AvailabilityService.invalidate_range(booking.space_id, booking.check_in.date(), booking.check_out.date())
+            WaitlistService.slots_released([(booking.space_id, booking.check_in, booking.check_out)])
+    
+    @staticmethod
+    @timed('booking.create_reservation')
     @transaction.atomic
-    def create_reservation(space, user, start_datetime, end_datetime, expiry_minutes=15, slots=None):
+    def create_reservation(space, user, start_datetime, end_datetime, expiry_minutes=15, slots=None, seats=1):
         """
         Create a temporary reservation for a space slot
         
+        Shared spaces (coworking, desk, lounge) are reserved by the seat: the
+        reservation takes `seats` on each slot's occupancy counter instead of
+        excluding every overlapping booking or reservation.
+        
         Args:
             space: Space instance
             user: User instance
             start_datetime: Reservation start datetime
             end_datetime: Reservation end datetime
             expiry_minutes: Minutes until reservation expires (default: 15)
-            slots: List of SpaceCalendarSlot objects to mark as reserved (optional)
+            slots: List of SpaceCalendarSlot objects to claim; all must still be available (optional)
+            seats: Seats to hold (shared spaces only)
             
         Returns:
             Reservation instance
@@ -570,27 +606,34 @@ class BookingService:
             ValueError: If space is already reserved for the time slot
         """
         now = timezone.now()
+        expires_at = now + timedelta(minutes=expiry_minutes)
         
-        # First, clean up ALL expired reservations globally and reset their slots
-        from workspace.models import SpaceCalendarSlot
-        expired_reservations = Reservation.objects.filter(
-            status='active',
-            expires_at__lt=now
+        if space.is_shared:
+            return BookingService._create_seat_reservation(
+                space, user, start_datetime, end_datetime, expires_at, slots or [], seats
+            )
+        if seats != 1:
+            raise ValueError("Seats can only be booked on shared spaces")
+        
+        # Check for overlapping confirmed bookings
+        overlapping_bookings = Booking.objects.filter(
+            space=space,
+            status__in=['confirmed', 'active'],
+            check_in__lt=end_datetime,
+            check_out__gt=start_datetime
+        ).exists()
+        
+        if overlapping_bookings:
+            raise ValueError("Space is already booked for this time slot")
+        
+        # Fast path: atomically claim a TTL hold in Redis (None when Redis is unavailable)
+        reservation_id = uuid.uuid4()
+        held = ReservationHoldService.claim(
+            space.id, reservation_id, start_datetime, end_datetime, expires_at, now
         )
-        expired_count = expired_reservations.count()
         
-        if expired_count > 0:
-            # Reset slots from expired reservations back to available
-            SpaceCalendarSlot.objects.filter(
-                status='reserved'
-            ).exclude(
-                # Keep slots that have active non-expired reservations
-                calendar__space__reservations__status='active',
-                calendar__space__reservations__expires_at__gte=now
-            ).update(status='available')
-            
-            expired_reservations.update(status='expired')
-            logger.info(f"Cleaned up {expired_count} expired reservations and reset their slots")
+        if held is False:
+            raise ValueError("Space is already reserved for this time slot")
         
         # Check for overlapping active (non-expired) reservations
         overlapping = Reservation.objects.filter(
@@ -602,23 +645,12 @@ class BookingService:
         ).exists()
         
         if overlapping:
+            if held:
+                ReservationHoldService.release(space.id, reservation_id)
             raise ValueError("Space is already reserved for this time slot")
         
-        # Check for overlapping confirmed bookings
-        overlapping_bookings = Booking.objects.filter(
-            space=space,
-            status__in=['confirmed', 'active'],
-            check_in__lt=end_datetime,
-            check_out__gt=start_datetime
-        ).exists()
-        
-        if overlapping_bookings:
-            raise ValueError("Space is already booked for this time slot")
-        
-        # Create reservation with expiry time
-        expires_at = now + timedelta(minutes=expiry_minutes)
-        
         reservation = Reservation.objects.create(
+            id=reservation_id,
             space=space,
             user=user,
             start=start_datetime,
@@ -627,12 +659,24 @@ class BookingService:
             expires_at=expires_at
         )
         
-        # Mark slots as reserved
+        # Claim the slots in one conditional UPDATE. Concurrent claims serialize on the
+        # row locks and re-check status, so only one request can win each slot.
         if slots:
             from workspace.models import SpaceCalendarSlot
             slot_ids = [slot.id for slot in slots]
-            SpaceCalendarSlot.objects.filter(id__in=slot_ids).update(status='reserved')
+            claimed = SpaceCalendarSlot.objects.filter(
+                id__in=slot_ids,
+                status='available'
+            ).update(status='reserved', reservation=reservation)
+            
+            if claimed != len(slot_ids):
+                if held:
+                    ReservationHoldService.release(space.id, reservation_id)
+                # Rolls back the reservation row and any slots claimed above
+                raise ValueError("Space is already reserved for this time slot")
+            
             logger.info(f"Marked {len(slot_ids)} slots as reserved for reservation {reservation.id}")
+            AvailabilityService.invalidate_range(space.id, start_datetime.date(), end_datetime.date())
         
         # Publish reservation created event
         event = Event(
@@ -655,6 +699,39 @@ class BookingService:
         
         return reservation
     
+    @staticmethod
+    def _create_seat_reservation(space, user, start_datetime, end_datetime, expires_at, slots, seats):
+        """Reserve seats on a shared space through the slot occupancy counters"""
+        if not slots:
+            # Seats are always counted per slot, so claim every slot in the range
+            from workspace.models import SpaceCalendarSlot
+            start = timezone.localtime(start_datetime) if timezone.is_aware(start_datetime) else start_datetime
+            end = timezone.localtime(end_datetime) if timezone.is_aware(end_datetime) else end_datetime
+            slots = list(SpaceCalendarSlot.objects.filter(
+                calendar__space=space,
+                date=start.date(),
+                start_time__gte=start.time(),
+                end_time__lte=end.time()
+            ))
+        if not slots:
+            raise ValueError("No available slots for this time")
+        
+        reservation = Reservation.objects.create(
+            space=space,
+            user=user,
+            start=start_datetime,
+            end=end_datetime,
+            status='active',
+            expires_at=expires_at,
+            seats=seats
+        )
+        # Rolls back the reservation row with the surrounding transaction on failure
+        OccupancyService.claim(reservation, space, [slot.id for slot in slots], seats)
+        AvailabilityService.invalidate_range(space.id, start_datetime.date(), end_datetime.date())
+        
+        logger.info(f"Reserved {seats} seat(s) on {len(slots)} slots for reservation {reservation.id}")
+        return reservation
+    
     @staticmethod
     @transaction.atomic
     def confirm_reservation(reservation):
@@ -669,16 +746,17 @@ class BookingService:
         
         reservation.status = 'confirmed'
         reservation.save(update_fields=['status', 'updated_at'])
+        ReservationHoldService.release(reservation.space_id, reservation.id)
         
-        # Mark slots as booked (payment completed)
+        # Mark the slots this reservation holds as booked (payment completed)
         from workspace.models import SpaceCalendarSlot
         SpaceCalendarSlot.objects.filter(
-            calendar__space=reservation.space,
-            date__gte=reservation.start.date(),
-            date__lte=reservation.end.date(),
+            reservation=reservation,
             status='reserved'
         ).update(status='booked')
         logger.info(f"Marked slots as booked for confirmed reservation {reservation.id}")
+        WaitlistService.reservations_confirmed([reservation.id])
+        AvailabilityService.invalidate_range(reservation.space_id, reservation.start.date(), reservation.end.date())
         
         # Publish reservation confirmed event
         event = Event(
@@ -697,6 +775,67 @@ class BookingService:
         
         return reservation
     
+    @staticmethod
+    @transaction.atomic
+    def confirm_reservations_for_bookings(bookings):
+        """
+        Confirm the active cart reservations behind paid bookings with set-based statements
+
+        Reservations are matched on space, window and user like confirm_reservation's
+        callers do one by one; the matches are confirmed with one UPDATE, their held
+        slots booked with another, and a single batched event is published.
+
+        Args:
+            bookings: Booking instances of one paid order
+
+        Returns:
+            list: IDs of the reservations confirmed
+        """
+        from functools import reduce
+        from operator import or_
+        from django.db.models import Exists, OuterRef, Q
+        from workspace.models import SpaceCalendarSlot
+
+        if not bookings:
+            return []
+
+        windows = reduce(or_, (
+            Q(space_id=booking.space_id, start=booking.check_in, end=booking.check_out, user_id=booking.user_id)
+            for booking in bookings
+        ))
+        rows = list(
+            Reservation.objects.select_for_update().filter(
+                windows,
+                Exists(CartItem.objects.filter(reservation=OuterRef('pk'))),
+                status='active'
+            ).values_list('id', 'space_id', 'start', 'end')
+        )
+        if not rows:
+            return []
+
+        reservation_ids = [row[0] for row in rows]
+        Reservation.objects.filter(id__in=reservation_ids).update(status='confirmed', updated_at=timezone.now())
+        SpaceCalendarSlot.objects.filter(
+            reservation_id__in=reservation_ids,
+            status='reserved'
+        ).update(status='booked')
+        WaitlistService.reservations_confirmed(reservation_ids)
+        ReservationHoldService.release_many((space_id, reservation_id) for reservation_id, space_id, _, _ in rows)
+        for space_id, start, end in {(space_id, start.date(), end.date()) for _, space_id, start, end in rows}:
+            AvailabilityService.invalidate_range(space_id, start, end)
+
+        EventBus.publish(Event(
+            event_type=EventTypes.RESERVATION_BATCH_CONFIRMED,
+            data={
+                'user_id': str(bookings[0].user_id),
+                'reservation_ids': [str(reservation_id) for reservation_id in reservation_ids],
+                'timestamp': timezone.now().isoformat()
+            },
+            source_module='booking'
+        ))
+
+        return reservation_ids
+    
     @staticmethod
     @transaction.atomic
     def cancel_reservation(reservation):
@@ -711,19 +850,21 @@ class BookingService:
         
         reservation.status = 'cancelled'
         reservation.save(update_fields=['status', 'updated_at'])
+        ReservationHoldService.release(reservation.space_id, reservation.id)
         
-        # Reset slots back to available
+        # Reset the slots this reservation holds back to available
         from workspace.models import SpaceCalendarSlot
         SpaceCalendarSlot.objects.filter(
-            calendar__space=reservation.space,
-            date__gte=reservation.start.date(),
-            date__lte=reservation.end.date(),
+            reservation=reservation,
             status='reserved'
-        ).update(status='available')
+        ).update(status='available', reservation=None)
         logger.info(f"Reset slots to available for cancelled reservation {reservation.id}")
+        AvailabilityService.invalidate_range(reservation.space_id, reservation.start.date(), reservation.end.date())
+        OccupancyService.release_reservations([reservation.id])
+        WaitlistService.slots_released([(reservation.space_id, reservation.start, reservation.end)], [reservation.id])
         
         # Remove associated cart items
-        CartItem.objects.filter(reservation=reservation).delete()
+        BookingService.remove_reservation_cart_items([reservation.id])
         
         # Publish reservation cancelled event
         event = Event(
@@ -739,6 +880,441 @@ class BookingService:
         EventBus.publish(event)
         
         return reservation
+    
+    @staticmethod
+    def expire_stale_reservations(space, start_datetime, end_datetime):
+        """
+        Lazily expire lapsed reservations on one space overlapping a time range
+        
+        Keeps the request path independent of system size; everything else is
+        left to the background reaper (`booking.tasks.expire_reservations`).
+        
+        Args:
+            space: Space instance
+            start_datetime: Range start datetime
+            end_datetime: Range end datetime
+            
+        Returns:
+            int: Number of reservations expired
+        """
+        stale = Reservation.objects.filter(
+            space=space,
+            status='active',
+            expires_at__lt=timezone.now(),
+            start__lt=end_datetime,
+            end__gt=start_datetime
+        ).select_related('space')
+        
+        return sum(1 for reservation in stale if BookingService.expire_reservation(reservation))
+    
+    @staticmethod
+    @transaction.atomic
+    def expire_reservation(reservation):
+        """
+        Expire a reservation whose hold has lapsed
+        
+        Args:
+            reservation: Reservation instance
+            
+        Returns:
+            bool: True if the reservation was expired, False if it was no longer active
+        """
+        if reservation.status != 'active':
+            return False
+        
+        reservation.expire()
+        ReservationHoldService.release(reservation.space_id, reservation.id)
+        
+        # Reset the slots this reservation holds back to available
+        from workspace.models import SpaceCalendarSlot
+        SpaceCalendarSlot.objects.filter(
+            reservation=reservation,
+            status='reserved'
+        ).update(status='available', reservation=None)
+        AvailabilityService.invalidate_range(reservation.space_id, reservation.start.date(), reservation.end.date())
+        OccupancyService.release_reservations([reservation.id])
+        WaitlistService.slots_released([(reservation.space_id, reservation.start, reservation.end)], [reservation.id])
+        
+        # Remove associated cart items
+        BookingService.remove_reservation_cart_items([reservation.id])
+        
+        logger.info(f"Expired reservation {reservation.id} - slots reset to available")
+        
+        return True
+    
+    @staticmethod
+    def remove_reservation_cart_items(reservation_ids):
+        """
+        Delete the cart items backed by the given reservations and resync the affected carts
+        
+        Args:
+            reservation_ids: IDs of reservations that were cancelled or expired
+        """
+        carts = list(
+            CartItem.objects.filter(reservation_id__in=reservation_ids).values_list('cart_id', 'cart__user_id').distinct()
+        )
+        if not carts:
+            return
+        
+        CartItem.objects.filter(reservation_id__in=reservation_ids).delete()
+        Cart.refresh_totals([cart_id for cart_id, _ in carts])
+        for _, user_id in carts:
+            Cart.invalidate_snapshot(user_id)
+    
+    @staticmethod
+    def expire_reservations_batch(batch_size=500, now=None):
+        """
+        Expire one batch of lapsed reservations with set-based statements
+        
+        Candidate rows are locked with SELECT ... FOR UPDATE SKIP LOCKED, so
+        concurrent reaper runs pick disjoint batches instead of blocking.
+        
+        Args:
+            batch_size: Maximum number of reservations to expire
+            now: Cut-off time (defaults to now)
+            
+        Returns:
+            int: Number of reservations expired
+        """
+        from workspace.models import SpaceCalendarSlot
+        
+        now = now or timezone.now()
+        
+        with transaction.atomic():
+            rows = list(
+                Reservation.objects.select_for_update(skip_locked=True).filter(
+                    status='active',
+                    expires_at__lte=now
+                ).order_by('expires_at').values_list('id', 'space_id', 'start', 'end')[:batch_size]
+            )
+            
+            if not rows:
+                return 0
+            
+            reservation_ids = [row[0] for row in rows]
+            
+            Reservation.objects.filter(id__in=reservation_ids).update(status='expired', updated_at=now)
+            
+            # Reset the slots the reservations held back to available
+            SpaceCalendarSlot.objects.filter(
+                reservation_id__in=reservation_ids,
+                status='reserved'
+            ).update(status='available', reservation=None)
+            OccupancyService.release_reservations(reservation_ids)
+            WaitlistService.slots_released(
+                ((space_id, start, end) for _, space_id, start, end in rows),
+                reservation_ids
+            )
+            
+            # Remove associated cart items
+            BookingService.remove_reservation_cart_items(reservation_ids)
+        
+        ReservationHoldService.release_many((space_id, reservation_id) for reservation_id, space_id, _, _ in rows)
+        for space_id, start, end in {(space_id, start.date(), end.date()) for _, space_id, start, end in rows}:
+            AvailabilityService.invalidate_range(space_id, start, end)
+        
+        return len(rows)
+
+    @staticmethod
+    @timed('booking.create_bookings_from_cart_items')
+    @transaction.atomic
+    def create_bookings_from_cart_items(items, user):
+        """
+        Turn cart items into pending bookings with a fixed number of statements
+
+        Reservations are confirmed, bookings inserted and held slots linked to
+        their bookings in bulk, and a single batched event is published, so the
+        cost of checkout does not grow with the number of items.
+
+        Args:
+            items: CartItem instances, loaded with select_related('space__branch__workspace', 'reservation')
+            user: User checking out
+
+        Returns:
+            list: Created Booking instances, in cart item order
+        """
+        from django.db.models import Case, When, Value, UUIDField
+        from workspace.models import SpaceCalendarSlot
+
+        now = timezone.now()
+        reserved_items = [item for item in items if item.reservation_id]
+        reservation_ids = [item.reservation_id for item in reserved_items]
+
+        if reservation_ids:
+            # Lock the holds first so a concurrent expiry cannot release them mid-checkout
+            statuses = dict(
+                Reservation.objects.select_for_update().filter(
+                    id__in=reservation_ids
+                ).values_list('id', 'status')
+            )
+            inactive = [item for item in reserved_items if statuses.get(item.reservation_id) != 'active']
+            if inactive:
+                # Report the status read under the lock, not the one loaded with the cart
+                raise ValueError(
+                    f"Cannot confirm reservation with status: {statuses.get(inactive[0].reservation_id, 'missing')}"
+                )
+
+            Reservation.objects.filter(id__in=reservation_ids).update(status='confirmed', updated_at=now)
+            WaitlistService.reservations_confirmed(reservation_ids)
+
+        bookings = Booking.objects.bulk_create([
+            Booking(
+                workspace=item.space.branch.workspace,
+                space=item.space,
+                user=user,
+                booking_type=item.booking_type,
+                booking_date=item.booking_date,
+                start_time=item.start_time,
+                end_time=item.end_time,
+                check_in=item.check_in,
+                check_out=item.check_out,
+                number_of_guests=item.number_of_guests,
+                base_price=item.price,
+                discount_amount=item.discount_amount,
+                tax_amount=item.tax_amount,
+                total_price=item.price - item.discount_amount + item.tax_amount,
+                status='pending',  # Pending until payment
+                special_requests=item.special_requests
+            )
+            for item in items
+        ])
+
+        if reservation_ids:
+            # Book every held slot and point it at its booking in one UPDATE
+            SpaceCalendarSlot.objects.filter(reservation_id__in=reservation_ids).update(
+                status='booked',
+                booking=Case(
+                    *[
+                        When(reservation_id=item.reservation_id, then=Value(booking.id))
+                        for item, booking in zip(items, bookings)
+                        if item.reservation_id
+                    ],
+                    output_field=UUIDField()
+                )
+            )
+            OccupancyService.attach_bookings({
+                item.reservation_id: booking.id
+                for item, booking in zip(items, bookings)
+                if item.reservation_id
+            })
+            ReservationHoldService.release_many(
+                (item.space_id, item.reservation_id) for item in reserved_items
+            )
+
+        for space_id, start, end in {(b.space_id, b.check_in.date(), b.check_out.date()) for b in bookings}:
+            AvailabilityService.invalidate_range(space_id, start, end)
+
+        # bulk_create bypasses CachedModelMixin.save, so drop the booking lists here
+        CacheService.delete_pattern(f'bookings:user:{user.id}:*')
+        for workspace_id in {booking.workspace_id for booking in bookings}:
+            CacheService.delete_pattern(f'bookings:workspace:{workspace_id}:*')
+        CacheService.delete_pattern(f'upcoming-bookings:user:{user.id}')
+        CacheService.delete_pattern(f'dashboard:user:{user.id}')
+
+        event = Event(
+            event_type=EventTypes.BOOKING_BATCH_CREATED,
+            data={
+                'user_id': str(user.id),
+                'booking_count': len(bookings),
+                'reservation_ids': [str(reservation_id) for reservation_id in reservation_ids],
+                'bookings': [
+                    {
+                        'booking_id': str(booking.id),
+                        'workspace_id': str(booking.workspace_id),
+                        'space_id': str(booking.space_id),
+                        'booking_type': booking.booking_type,
+                        'check_in': booking.check_in.isoformat(),
+                        'check_out': booking.check_out.isoformat(),
+                    }
+                    for booking in bookings
+                ],
+            },
+            source_module='booking'
+        )
+        EventBus.publish(event)
+
+        return bookings
+
+
+    @staticmethod
+    @transaction.atomic
+    def add_recurring_to_cart(cart, space, user, dates, start_time, end_time, booking_type='hourly',
+                              number_of_guests=0, special_requests='', allow_partial=True, expiry_minutes=15):
+        """
+        Hold one time window on many dates and add each occurrence to the cart
+
+        Conflicts for every occurrence are found with one query each for slots,
+        overlapping bookings and overlapping holds, and the free occurrences are
+        reserved, claimed and added to the cart in bulk, so the cost does not
+        grow with the number of occurrences. The items then go through the
+        normal (batched) checkout.
+
+        Holds are only recorded in the database; the per-request Redis fast path
+        is skipped, and single add-to-cart requests still see these holds
+        through their database overlap check.
+
+        Args:
+            cart: Cart to add the items to
+            space: Space instance
+            user: User placing the holds
+            dates: Occurrence dates, in order
+            start_time: Daily start time
+            end_time: Daily end time
+            booking_type: 'hourly' or 'daily'
+            number_of_guests: Guests per occurrence
+            special_requests: Special requests copied to every item
+            allow_partial: Add the free occurrences even if others conflict
+            expiry_minutes: Minutes until the holds expire
+
+        Returns:
+            dict: `items` (created CartItem instances) and `conflicts` (one dict
+            per occurrence that could not be held, with a `reason`)
+
+        Raises:
+            ValueError: If a slot was claimed concurrently; nothing is created
+        """
+        from collections import defaultdict
+        from datetime import datetime
+        from django.db.models import Case, When, Value, UUIDField
+        from workspace.models import SpaceCalendarSlot
+        from workspace.services import PricingService
+
+        if space.is_shared:
+            raise ValueError("Recurring bookings are not supported for shared spaces yet")
+        
+        now = timezone.now()
+        windows = [
+            (
+                day,
+                timezone.make_aware(datetime.combine(day, start_time)),
+                timezone.make_aware(datetime.combine(day, end_time))
+            )
+            for day in dates
+        ]
+        earliest = windows[0][1]
+        latest = windows[-1][2]
+
+        slots_by_day = defaultdict(list)
+        for slot in SpaceCalendarSlot.objects.filter(
+            calendar__space=space,
+            date__in=dates
+        ).values('id', 'date', 'start_time', 'end_time', 'status'):
+            slots_by_day[slot['date']].append(slot)
+
+        busy = list(
+            Booking.objects.filter(
+                space=space,
+                status__in=['confirmed', 'active'],
+                check_in__lt=latest,
+                check_out__gt=earliest
+            ).values_list('check_in', 'check_out')
+        )
+        held = list(
+            Reservation.objects.filter(
+                space=space,
+                status='active',
+                expires_at__gte=now,
+                start__lt=latest,
+                end__gt=earliest
+            ).values_list('start', 'end')
+        )
+        prices = PricingService.quote_many([
+            {'space_id': space.id, 'start': start, 'end': end, 'booking_type': booking_type}
+            for _, start, end in windows
+        ])
+
+        free = []
+        conflicts = []
+        for (day, start, end), price in zip(windows, prices):
+            day_slots = slots_by_day[day]
+            if booking_type == 'hourly':
+                day_slots = [
+                    slot for slot in day_slots
+                    if slot['start_time'] >= start_time and slot['end_time'] <= end_time
+                ]
+            available = [slot['id'] for slot in day_slots if slot['status'] == 'available']
+
+            if start <= now:
+                reason = 'Occurrence is in the past'
+            elif 'error' in price:
+                reason = price['error']
+            elif not available:
+                reason = 'No available slots for this time'
+            elif booking_type == 'hourly' and len(available) != len(day_slots):
+                reason = 'Part of this time is already taken'
+            elif any(s < end and e > start for s, e in busy):
+                reason = 'Space is already booked for this time slot'
+            elif any(s < end and e > start for s, e in held):
+                reason = 'Space is already reserved for this time slot'
+            else:
+                free.append((day, start, end, price['amount'], available))
+                continue
+
+            conflicts.append({'date': day.isoformat(), 'reason': reason})
+
+        if not free or (conflicts and not allow_partial):
+            return {'items': [], 'conflicts': conflicts}
+
+        expires_at = now + timedelta(minutes=expiry_minutes)
+        reservations = Reservation.objects.bulk_create([
+            Reservation(
+                space=space,
+                user=user,
+                start=start,
+                end=end,
+                status='active',
+                expires_at=expires_at
+            )
+            for _, start, end, _, _ in free
+        ])
+
+        # Claim every slot for its reservation in one conditional UPDATE
+        slot_owner = {
+            slot_id: reservation.id
+            for (_, _, _, _, slot_ids), reservation in zip(free, reservations)
+            for slot_id in slot_ids
+        }
+        claimed = SpaceCalendarSlot.objects.filter(
+            id__in=list(slot_owner),
+            status='available'
+        ).update(
+            status='reserved',
+            reservation=Case(
+                *[When(id=slot_id, then=Value(reservation_id)) for slot_id, reservation_id in slot_owner.items()],
+                output_field=UUIDField()
+            )
+        )
+        if claimed != len(slot_owner):
+            # Rolls back the reservations and any slots claimed above
+            raise ValueError("Space is already reserved for this time slot")
+
+        items = CartItem.objects.bulk_create([
+            CartItem(
+                cart=cart,
+                space=space,
+                booking_date=day,
+                start_time=start_time,
+                end_time=end_time,
+                check_in=start,
+                check_out=end,
+                booking_type=booking_type,
+                number_of_guests=number_of_guests,
+                price=amount,
+                special_requests=special_requests,
+                reservation=reservation
+            )
+            for (day, start, end, amount, _), reservation in zip(free, reservations)
+        ])
+        Cart.refresh_totals([cart.id])
+        Cart.invalidate_snapshot(user.id)
+
+        AvailabilityService.invalidate_range(space.id, free[0][0], free[-1][0])
+        logger.info(
+            f"Held {len(reservations)} recurring occurrences of space {space.id} for user {user.id} "
+            f"({len(conflicts)} conflicts)"
+        )
+
+        return {'items': items, 'conflicts': conflicts}
 
 
-__all__ = ['BookingService']
+__all__ = ['BookingService', 'ReservationHoldService', 'QuoteService', 'WaitlistService', 'OccupancyService']
@@ -0,0 +1,273 @@
+"""
+Reservation Hold Service
+Redis-backed slot holds with native TTL expiry.
+"""
+import logging
+import threading
+from typing import Optional
+
+import redis
+from django.conf import settings
+
+from core.instrumentation import tracks_io
+
+logger = logging.getLogger(__name__)
+
+
+# Request-path Redis calls give up quickly and fall back to the database
+REDIS_SOCKET_TIMEOUT = 2
+# Pause between listener reconnection attempts
+LISTENER_RECONNECT_SECONDS = 5
+
+
+# Atomically drop expired entries from the space index, reject overlapping
+# holds and register the new one. Entries are stored as "start|end|expires".
+#
+# KEYS[1] = space index hash, KEYS[2] = hold key
+# ARGV = reservation_id, start_ts, end_ts, expires_ts, now_ts, ttl_seconds
+CLAIM_HOLD_SCRIPT = """
+local entries = redis.call('HGETALL', KEYS[1])
+for i = 1, #entries, 2 do
+    local s, e, x = string.match(entries[i + 1], '([^|]+)|([^|]+)|([^|]+)')
+    if tonumber(x) <= tonumber(ARGV[5]) then
+        redis.call('HDEL', KEYS[1], entries[i])
+    elseif tonumber(s) < tonumber(ARGV[3]) and tonumber(e) > tonumber(ARGV[2]) then
+        return 0
+    end
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2] .. '|' .. ARGV[3] .. '|' .. ARGV[4])
+redis.call('SET', KEYS[2], ARGV[1], 'EX', ARGV[6])
+if redis.call('TTL', KEYS[1]) < tonumber(ARGV[6]) then
+    redis.call('EXPIRE', KEYS[1], ARGV[6])
+end
+return 1
+"""
+
+
+class ReservationHoldService:
+    """
+    Fast-path hold manager for reservations.
+
+    Each active reservation owns a Redis key with a native TTL plus an entry
+    in a per-space index hash used for overlap checks. When a hold key
+    expires, Redis keyspace notifications trigger the expiry of the matching
+    Reservation row, so slots are released within seconds instead of waiting
+    for the periodic sweep. Postgres stays the source of truth; the sweep in
+    `booking.tasks.expire_reservations` reconciles anything missed.
+    """
+
+    HOLD_KEY_PREFIX = 'xbooking:hold:'
+
+    _redis_client: Optional[redis.Redis] = None
+    _claim_script = None
+    _pubsub = None
+    _listener_thread = None
+    _listener_stop = threading.Event()
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return getattr(settings, 'RESERVATION_HOLDS_ENABLED', True)
+
+    @classmethod
+    def _get_redis_client(cls):
+        """Get or create Redis client"""
+        if cls._redis_client is None:
+            try:
+                cls._redis_client = redis.Redis(
+                    host=getattr(settings, 'REDIS_HOST', 'localhost'),
+                    port=getattr(settings, 'REDIS_PORT', 6379),
+                    db=getattr(settings, 'REDIS_DB', 1),
+                    decode_responses=True,
+                    socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+                    socket_timeout=REDIS_SOCKET_TIMEOUT
+                )
+                cls._redis_client.ping()
+                cls._claim_script = cls._redis_client.register_script(CLAIM_HOLD_SCRIPT)
+            except Exception as e:
+                logger.error(f"Failed to connect to Redis for reservation holds: {str(e)}")
+                cls._redis_client = None
+                cls._claim_script = None
+        return cls._redis_client
+
+    @classmethod
+    def hold_key(cls, space_id, reservation_id) -> str:
+        return f"{cls.HOLD_KEY_PREFIX}{space_id}:{reservation_id}"
+
+    @staticmethod
+    def space_index_key(space_id) -> str:
+        return f"xbooking:holds:space:{space_id}"
+
+    @classmethod
+    @tracks_io('redis')
+    def claim(cls, space_id, reservation_id, start, end, expires_at, now) -> Optional[bool]:
+        """
+        Atomically claim a hold on a space for a time range.
+
+        Args:
+            space_id: Space being held
+            reservation_id: ID the Reservation row will be created with
+            start: Hold start datetime
+            end: Hold end datetime
+            expires_at: When the hold lapses
+            now: Current time
+
+        Returns:
+            True if claimed, False if an overlapping hold exists,
+            None if Redis is unavailable (caller must fall back to the database)
+        """
+        if not cls.is_enabled() or cls._get_redis_client() is None:
+            return None
+
+        ttl = max(int((expires_at - now).total_seconds()), 1)
+        try:
+            claimed = cls._claim_script(
+                keys=[cls.space_index_key(space_id), cls.hold_key(space_id, reservation_id)],
+                args=[
+                    str(reservation_id),
+                    start.timestamp(),
+                    end.timestamp(),
+                    expires_at.timestamp(),
+                    now.timestamp(),
+                    ttl,
+                ]
+            )
+            return bool(claimed)
+        except Exception as e:
+            logger.error(f"Failed to claim hold for reservation {reservation_id}: {str(e)}")
+            return None
+
+    @classmethod
+    @tracks_io('redis')
+    def release(cls, space_id, reservation_id) -> None:
+        """Release a hold (reservation confirmed, cancelled or expired)"""
+        if not cls.is_enabled():
+            return
+
+        redis_client = cls._get_redis_client()
+        if redis_client is None:
+            return
+
+        try:
+            pipe = redis_client.pipeline()
+            pipe.delete(cls.hold_key(space_id, reservation_id))
+            pipe.hdel(cls.space_index_key(space_id), str(reservation_id))
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to release hold for reservation {reservation_id}: {str(e)}")
+
+    @classmethod
+    @tracks_io('redis')
+    def release_many(cls, holds) -> None:
+        """Release several holds in one round trip; `holds` is an iterable of (space_id, reservation_id)"""
+        if not cls.is_enabled():
+            return
+
+        redis_client = cls._get_redis_client()
+        if redis_client is None:
+            return
+
+        try:
+            pipe = redis_client.pipeline()
+            for space_id, reservation_id in holds:
+                pipe.delete(cls.hold_key(space_id, reservation_id))
+                pipe.hdel(cls.space_index_key(space_id), str(reservation_id))
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to release reservation holds: {str(e)}")
+
+    @classmethod
+    def _handle_expired_key(cls, key: str) -> None:
+        """Expire the Reservation row behind an expired hold key"""
+        if not key.startswith(cls.HOLD_KEY_PREFIX):
+            return
+
+        space_id, _, reservation_id = key[len(cls.HOLD_KEY_PREFIX):].partition(':')
+        if not reservation_id:
+            return
+
+        redis_client = cls._get_redis_client()
+        if redis_client is None:
+            return
+
+        # Every process runs a listener; only the first one to see the key acts on it
+        if not redis_client.set(f"xbooking:hold-expiry:{reservation_id}", "1", nx=True, ex=300):
+            return
+
+        redis_client.hdel(cls.space_index_key(space_id), reservation_id)
+
+        from booking.tasks import expire_reservation
+        expire_reservation.delay(reservation_id)
+        logger.info(f"Hold expired for reservation {reservation_id}, expiry queued")
+
+    @classmethod
+    def _listen_once(cls) -> None:
+        """Subscribe to expired-key events and handle them until the connection drops"""
+        db = getattr(settings, 'REDIS_DB', 1)
+        # Blocking reads are expected here: no read timeout, but a bounded connect and health checks
+        client = redis.Redis(
+            host=getattr(settings, 'REDIS_HOST', 'localhost'),
+            port=getattr(settings, 'REDIS_PORT', 6379),
+            db=db,
+            decode_responses=True,
+            socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_keepalive=True,
+            health_check_interval=30
+        )
+        cls._pubsub = client.pubsub()
+        cls._pubsub.psubscribe(f"__keyevent@{db}__:expired")
+        logger.info("Reservation hold listener subscribed")
+
+        for message in cls._pubsub.listen():
+            if message['type'] == 'pmessage':
+                try:
+                    cls._handle_expired_key(message['data'])
+                except Exception as e:
+                    logger.error(f"Error handling expired hold: {str(e)}")
+
+    @classmethod
+    def start_expiry_listener(cls):
+        """
+        Start Redis keyspace-expiry listener in background thread
+
+        The thread connects (and reconnects after any error or dropped
+        connection) on its own, so startup never blocks or raises. Keyspace
+        notifications must be enabled on the Redis server.
+        """
+        if not cls.is_enabled():
+            return
+
+        if cls._listener_thread and cls._listener_thread.is_alive():
+            logger.info("Reservation hold listener already running")
+            return
+
+        cls._listener_stop.clear()
+
+        def listen():
+            while not cls._listener_stop.is_set():
+                try:
+                    cls._listen_once()
+                except Exception as e:
+                    if cls._listener_stop.is_set():
+                        break
+                    logger.warning(
+                        f"Reservation hold listener disconnected: {str(e)}; "
+                        f"reconnecting in {LISTENER_RECONNECT_SECONDS}s"
+                    )
+                cls._listener_stop.wait(LISTENER_RECONNECT_SECONDS)
+            logger.info("Reservation hold listener exited")
+
+        cls._listener_thread = threading.Thread(target=listen, name='reservation-hold-listener', daemon=True)
+        cls._listener_thread.start()
+        logger.info("Reservation hold listener thread started")
+
+    @classmethod
+    def stop_expiry_listener(cls):
+        """Stop Redis keyspace-expiry listener"""
+        cls._listener_stop.set()
+        if cls._pubsub:
+            try:
+                cls._pubsub.close()
+            except Exception:
+                pass
+            cls._pubsub = None
+        logger.info("Reservation hold listener stopped")
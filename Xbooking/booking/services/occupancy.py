@@ -0,0 +1,139 @@
+"""
+Occupancy Service
+Seat counters for shared (coworking, desk, lounge) spaces.
+"""
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class OccupancyService:
+    """
+    Counted occupancy for spaces booked by the seat.
+
+    Each calendar slot of a shared space carries an `occupied` counter. A
+    reservation takes its seats with one conditional UPDATE that increments
+    every slot in its range only where `occupied + seats <= capacity`; the
+    row lock makes that an atomic increment-if-below-capacity, so concurrent
+    reservations can never oversell a slot. Full slots are marked booked so
+    availability and quotes treat them like taken exclusive slots.
+
+    SeatClaim rows record which slots a reservation (and after checkout its
+    booking) holds, and are used to decrement the counters on release.
+    """
+
+    @staticmethod
+    def claim(reservation, space, slot_ids, seats: int) -> None:
+        """
+        Take `seats` on every slot for a reservation
+
+        Raises:
+            ValueError: If any slot does not have enough free seats; the caller's
+                transaction must be rolled back
+        """
+        from django.db.models import Case, F, Value, When
+        from workspace.models import SpaceCalendarSlot
+        from booking.models import SeatClaim
+
+        if seats > space.capacity:
+            raise ValueError(f"This space has only {space.capacity} seats")
+
+        slot_ids = list(slot_ids)
+        claimed = SpaceCalendarSlot.objects.filter(
+            id__in=slot_ids,
+            occupied__lte=space.capacity - seats
+        ).exclude(
+            status__in=['blocked', 'maintenance']
+        ).update(
+            occupied=F('occupied') + seats,
+            status=Case(
+                When(occupied__gte=space.capacity - seats, then=Value('booked')),
+                default=F('status')
+            )
+        )
+
+        if claimed != len(slot_ids):
+            raise ValueError("Not enough seats left for this time")
+
+        SeatClaim.objects.bulk_create([
+            SeatClaim(slot_id=slot_id, reservation=reservation, seats=seats)
+            for slot_id in slot_ids
+        ])
+
+    @staticmethod
+    def attach_bookings(booking_by_reservation: Dict) -> None:
+        """Move checked-out reservations' seats onto their bookings in one UPDATE"""
+        from django.db.models import Case, UUIDField, Value, When
+        from booking.models import SeatClaim
+
+        if not booking_by_reservation:
+            return
+
+        SeatClaim.objects.filter(reservation_id__in=list(booking_by_reservation)).update(
+            booking=Case(
+                *[
+                    When(reservation_id=reservation_id, then=Value(booking_id))
+                    for reservation_id, booking_id in booking_by_reservation.items()
+                ],
+                output_field=UUIDField()
+            )
+        )
+
+    @classmethod
+    def release_reservations(cls, reservation_ids: Iterable) -> int:
+        """Give back the seats of cancelled or expired reservations"""
+        from booking.models import SeatClaim
+
+        claims = SeatClaim.objects.filter(reservation_id__in=list(reservation_ids), booking__isnull=True)
+        return cls._release(claims)
+
+    @classmethod
+    def release_booking(cls, booking) -> int:
+        """Give back the seats of a cancelled booking"""
+        from booking.models import SeatClaim
+
+        return cls._release(SeatClaim.objects.filter(booking=booking))
+
+    @staticmethod
+    def _release(claims) -> int:
+        from django.db.models import Case, F, IntegerField, Value, When
+        from django.db.models.functions import Greatest
+        from workspace.models import SpaceCalendarSlot
+        from workspace.services import AvailabilityService
+
+        released = defaultdict(int)
+        for slot_id, seats in claims.values_list('slot_id', 'seats'):
+            released[slot_id] += seats
+
+        if not released:
+            return 0
+
+        SpaceCalendarSlot.objects.filter(id__in=list(released)).update(
+            occupied=Greatest(
+                F('occupied') - Case(
+                    *[When(id=slot_id, then=Value(seats)) for slot_id, seats in released.items()],
+                    output_field=IntegerField()
+                ),
+                Value(0)
+            ),
+            # Any released seat means the slot is no longer full
+            status=Case(
+                When(status='booked', then=Value('available')),
+                default=F('status')
+            )
+        )
+        claims.delete()
+
+        # Freed seats change the cached month summaries of every affected space
+        dates = defaultdict(list)
+        for space_id, slot_date in SpaceCalendarSlot.objects.filter(id__in=list(released)).values_list(
+            'calendar__space_id', 'date'
+        ):
+            dates[space_id].append(slot_date)
+        for space_id, slot_dates in dates.items():
+            AvailabilityService.invalidate_range(space_id, min(slot_dates), max(slot_dates))
+
+        logger.info(f"Released seats on {len(released)} shared slot(s)")
+        return len(released)
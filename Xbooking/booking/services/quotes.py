@@ -0,0 +1,159 @@
+"""
+Quote Service
+Read-only price and availability answers for many candidate bookings.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from django.utils import timezone
+
+from core.cache import CacheService
+from workspace.services import PricingService
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteService:
+    """
+    Answers "is it free and what does it cost" for a cart or a page of
+    search results without creating reservations.
+
+    A batch of any size (capped by the serializer) costs a fixed number of
+    queries: slots, overlapping bookings and overlapping holds for every
+    requested space at once, plus at most one rate-table load. Nothing is
+    written. Whole answers are cached for `CACHE_TIMEOUT` seconds; quotes
+    are advisory and add-to-cart re-checks availability when claiming.
+    """
+
+    CACHE_TIMEOUT = 30
+
+    @staticmethod
+    def _window(item):
+        start = timezone.make_aware(datetime.combine(item['booking_date'], item['start_time']))
+        end = timezone.make_aware(datetime.combine(item['booking_date'], item['end_time']))
+        return start, end
+
+    @classmethod
+    def quote(cls, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Quote a batch of candidate bookings.
+
+        Args:
+            items: Validated QuoteItemSerializer data
+
+        Returns:
+            Dictionary with one quote per item (in order) and the total of
+            the available ones
+        """
+        cache_key = CacheService.generate_key('quote', items=items)
+        cached = CacheService.get(cache_key)
+        if cached is not None:
+            return cached
+
+        from workspace.models import Space, SpaceCalendarSlot
+        from booking.models import Booking, Reservation
+
+        windows = [cls._window(item) for item in items]
+        space_ids = {item['space_id'] for item in items}
+        dates = {item['booking_date'] for item in items}
+        earliest = min(start for start, _ in windows)
+        latest = max(end for _, end in windows)
+
+        slots_by_day = defaultdict(list)
+        shared = set()
+        for slot in SpaceCalendarSlot.objects.filter(
+            calendar__space_id__in=space_ids,
+            date__in=dates
+        ).values('calendar__space_id', 'calendar__space__space_type', 'date', 'start_time', 'end_time', 'status'):
+            slots_by_day[(slot['calendar__space_id'], slot['date'])].append(slot)
+            if slot['calendar__space__space_type'] in Space.SHARED_SPACE_TYPES:
+                shared.add(slot['calendar__space_id'])
+
+        busy = defaultdict(list)
+        for space_id, start, end in Booking.objects.filter(
+            space_id__in=space_ids,
+            status__in=['confirmed', 'active'],
+            check_in__lt=latest,
+            check_out__gt=earliest
+        ).values_list('space_id', 'check_in', 'check_out'):
+            busy[space_id].append((start, end))
+
+        held = defaultdict(list)
+        for space_id, start, end in Reservation.objects.filter(
+            space_id__in=space_ids,
+            status='active',
+            expires_at__gte=timezone.now(),
+            start__lt=latest,
+            end__gt=earliest
+        ).values_list('space_id', 'start', 'end'):
+            held[space_id].append((start, end))
+
+        prices = PricingService.quote_many([
+            {
+                'space_id': item['space_id'],
+                'start': start,
+                'end': end,
+                'booking_type': item['booking_type'],
+            }
+            for item, (start, end) in zip(items, windows)
+        ])
+
+        quotes = []
+        total = Decimal('0')
+        for item, (start, end), price in zip(items, windows, prices):
+            reason = price.get('error') or cls._unavailable_reason(
+                item,
+                start,
+                end,
+                slots_by_day[(item['space_id'], item['booking_date'])],
+                busy[item['space_id']],
+                held[item['space_id']],
+                item['space_id'] in shared
+            )
+            quote = {
+                'space_id': str(item['space_id']),
+                'booking_date': item['booking_date'].isoformat(),
+                'start_time': item['start_time'].strftime('%H:%M'),
+                'end_time': item['end_time'].strftime('%H:%M'),
+                'booking_type': item['booking_type'],
+                'available': reason is None,
+                'reason': reason,
+                'unit_price': str(price['unit_price']) if 'amount' in price else None,
+                'units': str(price['units']) if 'amount' in price else None,
+                'price': str(price['amount']) if 'amount' in price else None,
+            }
+            if reason is None:
+                total += price['amount']
+            quotes.append(quote)
+
+        result = {
+            'quotes': quotes,
+            'available_count': sum(1 for quote in quotes if quote['available']),
+            'total': str(total),
+        }
+        CacheService.set(cache_key, result, cls.CACHE_TIMEOUT)
+        return result
+
+    @staticmethod
+    def _unavailable_reason(item, start, end, day_slots, busy, held, shared=False):
+        """Mirror the add-to-cart rules; None means the item can be added"""
+        if item['booking_type'] == 'hourly':
+            day_slots = [
+                slot for slot in day_slots
+                if slot['start_time'] >= item['start_time'] and slot['end_time'] <= item['end_time']
+            ]
+        if not any(slot['status'] == 'available' for slot in day_slots):
+            return 'No available slots for this time'
+        if item['booking_type'] == 'hourly' and any(slot['status'] != 'available' for slot in day_slots):
+            return 'Part of this time is already taken'
+        if shared:
+            # Seat counters already mark full slots as booked
+            return None
+        if any(s < end and e > start for s, e in busy):
+            return 'Space is already booked for this time slot'
+        if any(s < end and e > start for s, e in held):
+            return 'Space is already reserved for this time slot'
+        return None
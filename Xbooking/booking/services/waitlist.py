@@ -0,0 +1,284 @@
+"""
+Waitlist Service
+Hands freed time ranges to waiting users as short reservations.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core.services import EventBus, Event, EventTypes
+
+logger = logging.getLogger(__name__)
+
+
+class WaitlistService:
+    """
+    Waitlist for taken time ranges on a space.
+
+    Every code path that frees slots (reservation cancel/expiry, the batch
+    reaper, booking cancellation) reports the freed ranges through
+    `slots_released`. After the transaction commits, a Celery task reads the
+    waiting entries overlapping each range from the (space, status, start)
+    index and offers the range to them in priority order: the user gets a
+    short reservation on the range plus a cart item, and the entry moves to
+    `offered`. An offer that lapses frees the range again, which hands it to
+    the next entry.
+
+    Entries span at most `MAX_WINDOW`, so the candidates for a freed range
+    are found with a bounded index range scan instead of a scan of the
+    space's whole waitlist.
+    """
+
+    MAX_WINDOW = timedelta(days=1)
+    MAX_CANDIDATES = 20
+
+    @staticmethod
+    def offer_minutes() -> int:
+        return getattr(settings, 'WAITLIST_OFFER_MINUTES', 10)
+
+    @classmethod
+    def join(cls, space, user, start, end, booking_type='hourly', number_of_guests=0, priority=0):
+        """
+        Put a user on the waitlist for a range
+
+        A request that races another one for the same range gets the entry the
+        other request created.
+
+        Raises:
+            ValueError: If the range is invalid or the user is already waiting for it
+        """
+        from booking.models import WaitlistEntry
+
+        if end <= start:
+            raise ValueError("End time must be after start time")
+        if end - start > cls.MAX_WINDOW:
+            raise ValueError("Waitlist ranges cannot be longer than one day")
+        if start <= timezone.now():
+            raise ValueError("Cannot join the waitlist for a past time")
+        if WaitlistEntry.objects.filter(space=space, user=user, start=start, end=end, status='waiting').exists():
+            raise ValueError("You are already on the waitlist for this time")
+
+        try:
+            with transaction.atomic():
+                return WaitlistEntry.objects.create(
+                    space=space,
+                    user=user,
+                    start=start,
+                    end=end,
+                    booking_type=booking_type,
+                    number_of_guests=number_of_guests,
+                    priority=priority
+                )
+        except IntegrityError:
+            # Lost the race on unique_waiting_entry
+            existing = WaitlistEntry.objects.filter(
+                space=space, user=user, start=start, end=end, status='waiting'
+            ).first()
+            if existing is None:
+                raise
+            return existing
+
+    @staticmethod
+    def leave(entry):
+        """Remove a waiting entry from the waitlist"""
+        if entry.status != 'waiting':
+            raise ValueError(f"Cannot leave the waitlist with status: {entry.status}")
+        entry.status = 'cancelled'
+        entry.save(update_fields=['status', 'updated_at'])
+        return entry
+
+    @classmethod
+    def slots_released(cls, windows: Iterable[Tuple], reservation_ids: Iterable = ()) -> None:
+        """
+        Record freed ranges; offers are made once the current transaction commits
+
+        Args:
+            windows: (space_id, start, end) tuples that became free
+            reservation_ids: Released reservations; offers they backed are marked expired
+        """
+        from booking.models import WaitlistEntry
+
+        reservation_ids = list(reservation_ids)
+        if reservation_ids:
+            WaitlistEntry.objects.filter(
+                reservation_id__in=reservation_ids,
+                status='offered'
+            ).update(status='expired', updated_at=timezone.now())
+
+        windows = list(windows)
+        if windows:
+            transaction.on_commit(lambda: cls.schedule_offers(windows))
+
+    @classmethod
+    def schedule_offers(cls, windows) -> None:
+        """Hand freed ranges to a Celery worker, so the releasing request does not create the offers"""
+        try:
+            from booking.tasks import offer_waitlist_slots
+            offer_waitlist_slots.delay([
+                (str(space_id), start.isoformat(), end.isoformat()) for space_id, start, end in windows
+            ])
+        except Exception as e:
+            logger.error(f"Could not queue waitlist offers, offering inline: {str(e)}")
+            cls.offer_released(windows)
+
+    @staticmethod
+    def reservations_confirmed(reservation_ids: Iterable) -> None:
+        """Mark offers as fulfilled once their reservations are checked out"""
+        from booking.models import WaitlistEntry
+
+        WaitlistEntry.objects.filter(
+            reservation_id__in=list(reservation_ids),
+            status='offered'
+        ).update(status='fulfilled', updated_at=timezone.now())
+
+    @classmethod
+    def offer_released(cls, windows) -> None:
+        """Offer each freed (space_id, start, end) range to its waiting entries"""
+        from booking.models import WaitlistEntry
+
+        by_space = defaultdict(list)
+        for space_id, start, end in windows:
+            by_space[space_id].append((start, end))
+
+        # One query tells which spaces have anybody waiting at all
+        waiting_spaces = set(
+            WaitlistEntry.objects.filter(
+                space_id__in=list(by_space),
+                status='waiting'
+            ).values_list('space_id', flat=True).distinct()
+        )
+
+        for space_id in waiting_spaces:
+            for start, end in by_space[space_id]:
+                try:
+                    cls.offer_next(space_id, start, end)
+                except Exception as e:
+                    logger.error(f"Waitlist hand-off failed for space {space_id}: {str(e)}", exc_info=True)
+
+    @classmethod
+    def offer_next(cls, space_id, start, end) -> List:
+        """
+        Offer a freed range to the waiting entries that fit in it, in priority order
+
+        Args:
+            space_id: Space whose slots were freed
+            start: Freed range start datetime
+            end: Freed range end datetime
+
+        Returns:
+            list: WaitlistEntry instances that received an offer
+        """
+        from booking.models import WaitlistEntry
+
+        now = timezone.now()
+        candidates = list(
+            WaitlistEntry.objects.filter(
+                space_id=space_id,
+                status='waiting',
+                start__gt=max(now, start - cls.MAX_WINDOW),
+                start__lt=end,
+                end__gt=start
+            ).select_related('space', 'user').order_by('-priority', 'created_at')[:cls.MAX_CANDIDATES]
+        )
+
+        offered = []
+        for entry in candidates:
+            try:
+                with transaction.atomic():
+                    locked = list(
+                        WaitlistEntry.objects.select_for_update(skip_locked=True).filter(
+                            id=entry.id,
+                            status='waiting'
+                        ).values_list('id', flat=True)
+                    )
+                    if not locked:
+                        continue
+                    entry.reservation = cls._hold_for(entry)
+                    entry.status = 'offered'
+                    entry.offered_at = now
+                    entry.save(update_fields=['reservation', 'status', 'offered_at', 'updated_at'])
+            except ValueError as e:
+                # The entry's range is still partly taken; it keeps its place in the queue
+                logger.debug(f"Waitlist entry {entry.id} not offered: {str(e)}")
+                continue
+
+            offered.append(entry)
+            EventBus.publish(Event(
+                event_type=EventTypes.WAITLIST_SLOT_OFFERED,
+                data={
+                    'waitlist_entry_id': str(entry.id),
+                    'reservation_id': str(entry.reservation.id),
+                    'space_id': str(entry.space.id),
+                    'space_name': entry.space.name,
+                    'user_id': str(entry.user.id),
+                    'user_email': entry.user.email,
+                    'start': entry.start.isoformat(),
+                    'end': entry.end.isoformat(),
+                    'expires_at': entry.reservation.expires_at.isoformat(),
+                    'expires_in_minutes': cls.offer_minutes(),
+                },
+                source_module='booking'
+            ))
+
+        if offered:
+            logger.info(f"Offered freed range on space {space_id} to {len(offered)} waitlisted user(s)")
+        return offered
+
+    @classmethod
+    def _hold_for(cls, entry):
+        """Reserve the entry's range and add it to the user's cart"""
+        from booking.models import Cart, CartItem
+        from booking.services import BookingService
+        from workspace.models import SpaceCalendarSlot
+        from workspace.services import PricingService
+
+        start = timezone.localtime(entry.start)
+        end = timezone.localtime(entry.end)
+        price = PricingService.quote(entry.space_id, entry.start, entry.end, entry.booking_type)
+
+        slots = SpaceCalendarSlot.objects.filter(calendar__space_id=entry.space_id, date=start.date())
+        if entry.booking_type == 'hourly':
+            slots = slots.filter(start_time__gte=start.time(), end_time__lte=end.time())
+        slots = list(slots)
+        available = [slot for slot in slots if slot.status == 'available']
+
+        if not available or (entry.booking_type == 'hourly' and len(available) != len(slots)):
+            raise ValueError("Range is not free yet")
+
+        reservation = BookingService.create_reservation(
+            space=entry.space,
+            user=entry.user,
+            start_datetime=entry.start,
+            end_datetime=entry.end,
+            expiry_minutes=cls.offer_minutes(),
+            slots=available
+        )
+
+        cart, _ = Cart.objects.get_or_create(user=entry.user)
+        item, created = CartItem.objects.update_or_create(
+            cart=cart,
+            space=entry.space,
+            booking_date=start.date(),
+            start_time=start.time(),
+            end_time=end.time(),
+            booking_type=entry.booking_type,
+            defaults={
+                'check_in': entry.start,
+                'check_out': entry.end,
+                'number_of_guests': entry.number_of_guests,
+                'price': price,
+                'reservation': reservation,
+            }
+        )
+        if created:
+            cart.apply_item_delta(item)
+        else:
+            # A stale item for the same range was revived with the new hold
+            cart.calculate_totals()
+
+        return reservation
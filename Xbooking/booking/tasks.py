@@ -10,43 +10,25 @@ logger = logging.getLogger(__name__)
 
 
 @shared_task(name='booking.tasks.expire_reservations')
-def expire_reservations():
+def expire_reservations(batch_size=500, max_batches=20):
     """
     Expire old reservations that haven't been confirmed.
-    Runs every 2 minutes to check for expired reservations.
+    Runs every 2 minutes to reconcile any holds whose Redis expiry was missed.
+    
+    Each batch is a handful of set-based statements over rows locked with
+    SKIP LOCKED, so overlapping beat runs split the backlog between them.
     """
-    from booking.models import Reservation, CartItem
+    from booking.services import BookingService
     
     now = timezone.now()
     
-    # Find active reservations that have expired
-    expired_reservations = Reservation.objects.filter(
-        status='active',
-        expires_at__lte=now
-    ).select_related('space', 'user')
-    
     count = 0
-    for reservation in expired_reservations:
-        # Mark reservation as expired
-        reservation.expire()
-        
-        # Reset slots back to available
-        from workspace.models import SpaceCalendarSlot
-        SpaceCalendarSlot.objects.filter(
-            calendar__space=reservation.space,
-            date__gte=reservation.start.date(),
-            date__lte=reservation.end.date(),
-            status='reserved'
-        ).update(status='available')
-        
-        # Remove associated cart items
-        CartItem.objects.filter(reservation=reservation).delete()
+    for _ in range(max_batches):
+        expired = BookingService.expire_reservations_batch(batch_size=batch_size, now=now)
+        count += expired
         
-        logger.info(
-            f"Expired reservation {reservation.id} for {reservation.space.name} "
-            f"by {reservation.user.email} - slots reset to available"
-        )
-        count += 1
+        if expired < batch_size:
+            break
     
     if count > 0:
         logger.info(f"Expired {count} reservation(s)")
@@ -57,15 +39,65 @@ def expire_reservations():
     }
 
 
+@shared_task(name='booking.tasks.expire_reservation')
+def expire_reservation(reservation_id):
+    """
+    Expire a single reservation as soon as its Redis hold lapses.
+    Queued by the reservation hold keyspace-expiry listener.
+    """
+    from booking.models import Reservation
+    from booking.services import BookingService
+    
+    try:
+        reservation = Reservation.objects.select_related('space').get(id=reservation_id)
+    except Reservation.DoesNotExist:
+        return {'expired': False, 'reservation_id': reservation_id}
+    
+    expired = BookingService.expire_reservation(reservation)
+    
+    return {
+        'expired': expired,
+        'reservation_id': reservation_id,
+        'timestamp': timezone.now().isoformat()
+    }
+
+
+@shared_task(name='booking.tasks.offer_waitlist_slots')
+def offer_waitlist_slots(windows):
+    """
+    Offer freed ranges to waitlisted users.
+    Queued once the transaction that released the slots commits.
+    
+    Args:
+        windows: [space_id, start, end] lists with ISO datetimes
+    """
+    from uuid import UUID
+    from django.utils.dateparse import parse_datetime
+    from booking.services import WaitlistService
+    
+    WaitlistService.offer_released([
+        (UUID(space_id), parse_datetime(start), parse_datetime(end)) for space_id, start, end in windows
+    ])
+    
+    return {
+        'windows': len(windows),
+        'timestamp': timezone.now().isoformat()
+    }
+
+
 @shared_task(name='booking.tasks.clean_old_reservations')
 def clean_old_reservations():
     """
-    Clean up old expired reservations (older than 24 hours).
+    Clean up old expired reservations (older than 24 hours) and close
+    waitlist entries whose time has passed.
     Runs daily to keep database clean.
     """
-    from booking.models import Reservation
+    from booking.models import Reservation, WaitlistEntry
     
-    cutoff = timezone.now() - timedelta(hours=24)
+    now = timezone.now()
+    cutoff = now - timedelta(hours=24)
+    
+    WaitlistEntry.objects.filter(status='waiting', start__lte=now).update(status='expired', updated_at=now)
     
     # Delete old expired/cancelled reservations
     deleted_count, _ = Reservation.objects.filter(
@@ -130,8 +162,8 @@ def send_reservation_expiry_warning():
 
 
 @shared_task
-def generate_guest_qr_code(guest_id):
-    """Generate QR code for a guest"""
+def generate_guest_qr_code(guest_id, send_email=True):
+    """Generate QR code for a guest; send_email=False leaves the QR email to the caller"""
     try:
         from booking.models import Guest
         from Xbooking.cloudinary_storage import upload_qr_image_to_cloudinary
@@ -160,11 +192,16 @@ def generate_guest_qr_code(guest_id):
         cloud_result = upload_qr_image_to_cloudinary(qr_image_bytes, filename, public_id=f"qr_guest_{guest.qr_code_verification_code}")
         
         # Send QR code email
-        if cloud_result.get('success'):
+        if cloud_result.get('success') and send_email:
             qr_code_url = cloud_result.get('file_url')
             send_guest_qr_email.delay(str(guest.id), qr_code_url, qr_data)
         
-        return {'success': True, 'guest_id': str(guest.id), 'qr_url': cloud_result.get('file_url')}
+        return {
+            'success': True,
+            'guest_id': str(guest.id),
+            'qr_url': cloud_result.get('file_url') if cloud_result.get('success') else None,
+            'qr_data': qr_data
+        }
     except Exception as e:
         logger.error(f"Failed to generate guest QR code for {guest_id}: {str(e)}")
         return {'success': False, 'error': str(e)}
@@ -395,8 +432,38 @@ def generate_guest_qr_codes_for_booking(booking_id):
         return {'success': False, 'error': str(e)}
 
 
+@shared_task
+def generate_guest_qr_codes_for_bookings(booking_ids):
+    """
+    Generate QR codes for all guests of several bookings in this task.
+    The guest emails are published together as one group instead of one
+    generate task per booking and per guest.
+    """
+    try:
+        from celery import group
+        from booking.models import Guest
+
+        guest_ids = list(Guest.objects.filter(booking_id__in=booking_ids).values_list('id', flat=True))
+        results = [generate_guest_qr_code(str(guest_id), send_email=False) for guest_id in guest_ids]
+
+        emails = [
+            send_guest_qr_email.si(result['guest_id'], result['qr_url'], result['qr_data'])
+            for result in results
+            if result.get('success') and result.get('qr_url')
+        ]
+        if emails:
+            group(emails).apply_async()
+
+        failed = sum(1 for result in results if not result.get('success'))
+        return {'success': not failed, 'guests_count': len(guest_ids), 'failed_count': failed}
+    except Exception as e:
+        logger.error(f"Failed to generate guest QR codes for bookings {booking_ids}: {str(e)}")
+        return {'success': False, 'error': str(e)}
+
+
 __all__ = [
     'expire_reservations',
+    'expire_reservation',
     'clean_old_reservations',
     'send_reservation_expiry_warning',
     'generate_guest_qr_code',
@@ -406,4 +473,5 @@ __all__ = [
     'check_and_send_guest_reminders',
     'check_and_send_checkout_receipts',
     'generate_guest_qr_codes_for_booking',
+    'generate_guest_qr_codes_for_bookings',
 ]
@@ -0,0 +1,154 @@
+import threading
+import unittest
+from datetime import date, datetime, time, timedelta
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+from workspace.models import SpaceCalendar, SpaceCalendarSlot
+from booking.models import Cart, CartItem, Reservation
+from booking.services import BookingService
+from booking.views.v1.cart import IDEMPOTENCY_IN_FLIGHT_TIMEOUT
+from core.cache import CacheService
+
+
+# Number of clients racing for the same slot in the load test
+PARALLEL_CLIENTS = 10
+
+
+class AddToCartFixtureMixin:
+    def create_fixture(self):
+        self.owner = create_user("owner@example.com", full_name="Owner")
+        self.workspace = create_workspace(self.owner, name="Race Workspace")
+        self.branch = create_branch(self.workspace)
+        self.space = create_space(self.branch)
+        self.calendar = SpaceCalendar.objects.create(space=self.space)
+        self.booking_date = date.today() + timedelta(days=4)
+        self.slot = SpaceCalendarSlot.objects.create(
+            calendar=self.calendar,
+            date=self.booking_date,
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+            booking_type='hourly',
+        )
+        self.payload = {
+            'space_id': str(self.space.id),
+            'booking_date': self.booking_date.isoformat(),
+            'start_time': '09:00',
+            'end_time': '10:00',
+            'booking_type': 'hourly',
+        }
+
+    def client_for(self, email):
+        user = create_user(email)
+        Cart.objects.create(user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RESERVATION_HOLDS_ENABLED=False)
+class TestIdempotentAddToCart(AddToCartFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_fixture()
+        self.client = self.client_for('buyer@example.com')
+
+    def test_retry_with_same_key_replays_first_response(self):
+        url = '/api/v1/booking/cart/add_item/'
+        first = self.client.post(url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+        second = self.client.post(url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED, first.content)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED, second.content)
+        self.assertEqual(first.json()['id'], second.json()['id'])
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertEqual(CartItem.objects.count(), 1)
+
+    def test_key_reused_with_different_body_is_rejected(self):
+        url = '/api/v1/booking/cart/add_item/'
+        self.client.post(url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='retry-2')
+        response = self.client.post(
+            url, {**self.payload, 'end_time': '11:00'}, format='json', HTTP_IDEMPOTENCY_KEY='retry-2'
+        )
+        self.assertEqual(response.status_code, 422)
+
+    def test_failed_attempt_frees_the_key(self):
+        url = '/api/v1/booking/cart/add_item/'
+        SpaceCalendarSlot.objects.filter(id=self.slot.id).update(status='blocked')
+        failed = self.client.post(url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='retry-3')
+        self.assertEqual(failed.status_code, status.HTTP_400_BAD_REQUEST)
+
+        SpaceCalendarSlot.objects.filter(id=self.slot.id).update(status='available')
+        retried = self.client.post(url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='retry-3')
+        self.assertEqual(retried.status_code, status.HTTP_201_CREATED, retried.content)
+
+    def test_unavailable_cache_serves_the_request(self):
+        url = '/api/v1/booking/cart/add_item/'
+        with patch.object(CacheService, 'add', return_value=False), \
+                patch.object(CacheService, 'get', return_value=None):
+            response = self.client.post(url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='retry-4')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+
+    def test_unfinished_request_reserves_the_key_briefly(self):
+        url = '/api/v1/booking/cart/add_item/'
+        with patch.object(CacheService, 'add', wraps=CacheService.add) as add:
+            self.client.post(url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='retry-5')
+        reserved = [call.args for call in add.call_args_list if call.args[0].startswith('cart:idempotency:')]
+        self.assertEqual([args[2] for args in reserved], [IDEMPOTENCY_IN_FLIGHT_TIMEOUT])
+
+    def test_claim_fails_when_slot_taken_after_lookup(self):
+        stale_slots = list(SpaceCalendarSlot.objects.filter(id=self.slot.id))
+        # Another transaction wins the slot between the lookup and the claim
+        SpaceCalendarSlot.objects.filter(id=self.slot.id).update(status='reserved')
+
+        with self.assertRaises(ValueError):
+            BookingService.create_reservation(
+                space=self.space,
+                user=self.owner,
+                start_datetime=timezone.make_aware(datetime.combine(self.booking_date, time(9, 0))),
+                end_datetime=timezone.make_aware(datetime.combine(self.booking_date, time(10, 0))),
+                slots=stale_slots
+            )
+        self.assertFalse(Reservation.objects.exists())
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Parallel slot claims need row-level locking (PostgreSQL)')
+@override_settings(CACHES=LOCMEM_CACHES, RESERVATION_HOLDS_ENABLED=False)
+class TestParallelAddToCart(AddToCartFixtureMixin, TransactionTestCase):
+    def setUp(self):
+        self.create_fixture()
+
+    def test_parallel_clients_racing_for_one_slot(self):
+        clients = [self.client_for(f'racer{i}@example.com') for i in range(PARALLEL_CLIENTS)]
+        barrier = threading.Barrier(PARALLEL_CLIENTS)
+        results = []
+
+        def worker(client):
+            try:
+                barrier.wait()
+                response = client.post('/api/v1/booking/cart/add_item/', self.payload, format='json')
+                results.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), PARALLEL_CLIENTS)
+        self.assertEqual(results.count(status.HTTP_201_CREATED), 1)
+        self.assertTrue(all(code in (400, 409) for code in results if code != status.HTTP_201_CREATED))
+
+        self.slot.refresh_from_db()
+        self.assertEqual(self.slot.status, 'reserved')
+        self.assertEqual(Reservation.objects.filter(status='active').count(), 1)
+        self.assertEqual(self.slot.reservation_id, Reservation.objects.get(status='active').id)
+        self.assertEqual(CartItem.objects.count(), 1)
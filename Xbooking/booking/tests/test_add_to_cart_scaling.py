@@ -0,0 +1,115 @@
+from datetime import date, datetime, time, timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+from workspace.models import SpaceCalendar, SpaceCalendarSlot
+from booking.models import Cart, Reservation
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RESERVATION_HOLDS_ENABLED=False)
+class TestAddToCartScaling(TestCase):
+    """Add-to-cart work must not grow with the number of lapsed reservations elsewhere"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user("cartscale@example.com", full_name="Cart User")
+        self.client.force_authenticate(user=self.user)
+        Cart.objects.create(user=self.user)
+        self.workspace = create_workspace(self.user, name="Scale Workspace")
+        self.branch = create_branch(self.workspace)
+        self.booking_date = date.today() + timedelta(days=7)
+        self.backlog_space = self._create_space("Backlog Space")
+
+    def _create_space(self, name):
+        space = create_space(self.branch, name=name)
+        calendar = SpaceCalendar.objects.create(space=space)
+        SpaceCalendarSlot.objects.bulk_create([
+            SpaceCalendarSlot(
+                calendar=calendar,
+                date=self.booking_date,
+                start_time=time(hour, 0),
+                end_time=time(hour + 1, 0),
+                booking_type='hourly',
+            )
+            for hour in range(9, 17)
+        ])
+        return space
+
+    def _seed_lapsed_reservations(self, count):
+        now = timezone.now()
+        start = timezone.make_aware(datetime.combine(self.booking_date, time(9, 0)))
+        reservations = Reservation.objects.bulk_create([
+            Reservation(
+                space=self.backlog_space,
+                user=self.user,
+                start=start + timedelta(seconds=i),
+                end=start + timedelta(hours=1, seconds=i),
+                status='active',
+                expires_at=now - timedelta(minutes=5)
+            )
+            for i in range(count)
+        ])
+        SpaceCalendarSlot.objects.filter(calendar__space=self.backlog_space).update(
+            status='reserved',
+            reservation=reservations[0]
+        )
+
+    def _add_to_cart(self, space):
+        payload = {
+            'space_id': str(space.id),
+            'booking_date': self.booking_date.isoformat(),
+            'start_time': '10:00',
+            'end_time': '12:00',
+            'booking_type': 'hourly',
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/v1/booking/cart/add_item/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        return len(queries)
+
+    def test_add_to_cart_cost_is_independent_of_lapsed_backlog(self):
+        self._seed_lapsed_reservations(10)
+        small_queries = self._add_to_cart(self._create_space("Target Small"))
+
+        self._seed_lapsed_reservations(1000)
+        large_queries = self._add_to_cart(self._create_space("Target Large"))
+
+        self.assertEqual(small_queries, large_queries)
+        # Lapsed holds on other spaces are left for the background reaper
+        self.assertEqual(
+            Reservation.objects.filter(space=self.backlog_space, status='active').count(),
+            1010
+        )
+
+    def test_reaper_drains_backlog_in_batches(self):
+        from booking.tasks import expire_reservations
+
+        self._seed_lapsed_reservations(25)
+        result = expire_reservations(batch_size=10, max_batches=2)
+        self.assertEqual(result['expired_count'], 20)
+
+        result = expire_reservations(batch_size=10, max_batches=2)
+        self.assertEqual(result['expired_count'], 5)
+        self.assertFalse(Reservation.objects.filter(status='active').exists())
+
+    def test_reaper_batch_uses_constant_queries(self):
+        from booking.services import BookingService
+
+        self._seed_lapsed_reservations(5)
+        with CaptureQueriesContext(connection) as small_batch:
+            self.assertEqual(BookingService.expire_reservations_batch(batch_size=100), 5)
+
+        self._seed_lapsed_reservations(50)
+        with CaptureQueriesContext(connection) as large_batch:
+            self.assertEqual(BookingService.expire_reservations_batch(batch_size=100), 50)
+
+        self.assertEqual(len(small_batch), len(large_batch))
+        self.assertFalse(
+            SpaceCalendarSlot.objects.filter(calendar__space=self.backlog_space, status='reserved').exists()
+        )
@@ -0,0 +1,116 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+from workspace.models import SpaceCalendar, SpaceCalendarSlot
+from booking.models import Cart, CartItem, Reservation
+from booking.services import BookingService
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RESERVATION_HOLDS_ENABLED=False)
+class TestCartTotals(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user("totals@example.com", full_name="Totals User")
+        self.client.force_authenticate(user=self.user)
+        self.cart = Cart.objects.create(user=self.user)
+        self.workspace = create_workspace(self.user, name="Totals Workspace")
+        self.branch = create_branch(self.workspace)
+        self.space = create_space(self.branch)
+        calendar = SpaceCalendar.objects.create(space=self.space)
+        self.booking_date = date.today() + timedelta(days=2)
+        SpaceCalendarSlot.objects.bulk_create([
+            SpaceCalendarSlot(
+                calendar=calendar,
+                date=self.booking_date,
+                start_time=time(hour, 0),
+                end_time=time(hour + 1, 0),
+                booking_type='hourly',
+            )
+            for hour in range(9, 17)
+        ])
+
+    def _add_item(self, start, end):
+        response = self.client.post('/api/v1/booking/cart/add_item/', {
+            'space_id': str(self.space.id),
+            'booking_date': self.booking_date.isoformat(),
+            'start_time': start,
+            'end_time': end,
+            'booking_type': 'hourly',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        return response.json()['id']
+
+    def _get_cart(self):
+        response = self.client.get('/api/v1/booking/cart/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_add_and_remove_adjust_totals_incrementally(self):
+        self._add_item('09:00', '11:00')
+        item_id = self._add_item('12:00', '13:00')
+
+        self.cart.refresh_from_db()
+        self.assertEqual(self.cart.subtotal, Decimal('30.00'))
+        self.assertEqual(self.cart.total, Decimal('30.00'))
+        self.assertEqual(self.cart.item_count, 2)
+
+        response = self.client.post('/api/v1/booking/cart/remove_item/', {'cart_item_id': item_id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Decimal(response.json()['subtotal']), Decimal('20.00'))
+
+        self.cart.refresh_from_db()
+        self.assertEqual(self.cart.subtotal, Decimal('20.00'))
+        self.assertEqual(self.cart.item_count, 1)
+
+    def test_concurrent_remove_of_the_same_item_subtracts_once(self):
+        self._add_item('09:00', '11:00')
+        item_id = self._add_item('12:00', '13:00')
+        original_delete = CartItem.delete
+        raced = []
+
+        def delete(item, *args, **kwargs):
+            if not raced:
+                raced.append(item.pk)
+                # The other request removes the item (and subtracts it) first
+                self.client.post('/api/v1/booking/cart/remove_item/', {'cart_item_id': item_id}, format='json')
+            return original_delete(item, *args, **kwargs)
+
+        with patch.object(CartItem, 'delete', autospec=True, side_effect=delete):
+            response = self.client.post('/api/v1/booking/cart/remove_item/', {'cart_item_id': item_id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.cart.refresh_from_db()
+        self.assertEqual((self.cart.subtotal, self.cart.item_count), (Decimal('20.00'), 1))
+
+    def test_cart_snapshot_is_cached_until_cart_changes(self):
+        self._add_item('09:00', '10:00')
+        self.assertEqual(self._get_cart()['item_count'], 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._get_cart()['item_count'], 1)
+
+        self._add_item('10:00', '11:00')
+        snapshot = self._get_cart()
+        self.assertEqual(snapshot['item_count'], 2)
+        self.assertEqual(Decimal(snapshot['total']), Decimal('20.00'))
+
+    def test_expired_reservations_resync_cart(self):
+        self._add_item('09:00', '10:00')
+        self._add_item('10:00', '12:00')
+        self._get_cart()
+
+        reservation = Reservation.objects.get(start__hour=9)
+        Reservation.objects.filter(id=reservation.id).update(expires_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(BookingService.expire_reservations_batch(), 1)
+
+        self.cart.refresh_from_db()
+        self.assertEqual(self.cart.subtotal, Decimal('20.00'))
+        self.assertEqual(self.cart.item_count, 1)
+        self.assertEqual(self._get_cart()['item_count'], 1)
@@ -0,0 +1,154 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.cache import CacheService
+from core.services import EventBus, EventTypes
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+from workspace.models import SpaceCalendar, SpaceCalendarSlot
+from booking.models import Booking, Cart, CartItem, Reservation
+from booking.services import BookingService
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RESERVATION_HOLDS_ENABLED=False)
+class TestCheckoutScaling(TestCase):
+    """Checkout must run a fixed number of statements regardless of cart size"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user("checkout@example.com", full_name="Checkout User")
+        self.client.force_authenticate(user=self.user)
+        self.cart = Cart.objects.create(user=self.user)
+        self.workspace = create_workspace(self.user, name="Checkout Workspace")
+        self.branch = create_branch(self.workspace)
+        self.space = create_space(self.branch)
+        self.calendar = SpaceCalendar.objects.create(space=self.space)
+        self.next_day = date.today() + timedelta(days=1)
+
+    def _fill_cart(self, count):
+        """Add `count` held hourly items, each on its own day with two slots"""
+        days = [self.next_day + timedelta(days=i) for i in range(count)]
+        self.next_day += timedelta(days=count)
+        expires_at = timezone.now() + timedelta(minutes=15)
+
+        reservations = Reservation.objects.bulk_create([
+            Reservation(
+                space=self.space,
+                user=self.user,
+                start=timezone.make_aware(datetime.combine(day, time(9, 0))),
+                end=timezone.make_aware(datetime.combine(day, time(11, 0))),
+                expires_at=expires_at
+            )
+            for day in days
+        ])
+        SpaceCalendarSlot.objects.bulk_create([
+            SpaceCalendarSlot(
+                calendar=self.calendar,
+                date=day,
+                start_time=time(hour, 0),
+                end_time=time(hour + 1, 0),
+                booking_type='hourly',
+                status='reserved',
+                reservation=reservation
+            )
+            for day, reservation in zip(days, reservations)
+            for hour in (9, 10)
+        ])
+        CartItem.objects.bulk_create([
+            CartItem(
+                cart=self.cart,
+                space=self.space,
+                booking_date=day,
+                start_time=time(9, 0),
+                end_time=time(11, 0),
+                check_in=reservation.start,
+                check_out=reservation.end,
+                booking_type='hourly',
+                price=Decimal('20.00'),
+                reservation=reservation
+            )
+            for day, reservation in zip(days, reservations)
+        ])
+        return reservations
+
+    def _checkout(self):
+        with patch.object(EventBus, 'publish') as mock_publish:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post('/api/v1/booking/cart/checkout/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        event_types = [call.args[0].event_type for call in mock_publish.call_args_list]
+        return response.json(), len(queries), event_types
+
+    def test_checkout_query_count_is_independent_of_cart_size(self):
+        self._fill_cart(1)
+        _, single_queries, _ = self._checkout()
+
+        self._fill_cart(20)
+        data, bulk_queries, _ = self._checkout()
+
+        self.assertEqual(single_queries, bulk_queries)
+        self.assertEqual(data['total_bookings'], 20)
+
+    def test_checkout_books_held_slots_and_publishes_one_batch_event(self):
+        reservations = self._fill_cart(5)
+        data, _, event_types = self._checkout()
+
+        self.assertEqual(event_types, [EventTypes.BOOKING_BATCH_CREATED, EventTypes.ORDER_CREATED])
+        self.assertFalse(Reservation.objects.exclude(status='confirmed').exists())
+        self.assertFalse(self.cart.items.exists())
+
+        for reservation in reservations:
+            booking = Booking.objects.get(space=self.space, check_in=reservation.start)
+            self.assertEqual(
+                set(reservation.held_slots.values_list('status', 'booking')),
+                {('booked', booking.id)}
+            )
+        self.assertEqual(data['order']['booking_count'], 5)
+
+    def test_inactive_reservation_aborts_checkout(self):
+        reservations = self._fill_cart(3)
+        Reservation.objects.filter(id=reservations[1].id).update(status='cancelled')
+
+        response = self.client.post('/api/v1/booking/cart/checkout/', {}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Booking.objects.exists())
+        self.assertEqual(Reservation.objects.filter(status='active').count(), 2)
+        self.assertEqual(response.json()['message'], 'Cannot confirm reservation with status: cancelled')
+
+    def test_reservation_lapsing_after_the_cart_loaded_reports_its_locked_status(self):
+        reservations = self._fill_cart(2)
+        items = list(self.cart.items.select_related('space__branch__workspace', 'reservation').order_by('created_at'))
+        Reservation.objects.filter(id=reservations[0].id).update(status='expired')
+
+        with self.assertRaisesMessage(ValueError, 'Cannot confirm reservation with status: expired'):
+            BookingService.create_bookings_from_cart_items(items, self.user)
+
+    def test_checkout_invalidates_the_booking_lists(self):
+        self._fill_cart(2)
+
+        with patch.object(CacheService, 'delete_pattern') as delete_pattern:
+            self._checkout()
+
+        patterns = {call.args[0] for call in delete_pattern.call_args_list}
+        self.assertIn(f'bookings:user:{self.user.id}:*', patterns)
+        self.assertIn(f'bookings:workspace:{self.workspace.id}:*', patterns)
+
+    def test_failed_order_rolls_back_the_bookings(self):
+        self._fill_cart(2)
+
+        with patch.object(EventBus, 'publish'), \
+                patch('payment.services.PaymentService.create_order', side_effect=ValueError('No gateway')):
+            response = self.client.post('/api/v1/booking/cart/checkout/', {}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Booking.objects.exists())
+        self.assertEqual(Reservation.objects.filter(status='active').count(), 2)
+        self.assertEqual(self.cart.items.count(), 2)
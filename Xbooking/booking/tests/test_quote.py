@@ -0,0 +1,104 @@
+from datetime import date, datetime, time, timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+from workspace.models import SpaceCalendar, SpaceCalendarSlot
+from booking.models import Booking, CartItem, Reservation
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestQuoteEndpoint(TestCase):
+    url = '/api/v1/booking/quote/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user("quote@example.com", full_name="Quote User")
+        self.workspace = create_workspace(self.user, name="Quote Workspace")
+        self.branch = create_branch(self.workspace)
+        self.day = date.today() + timedelta(days=5)
+        self.room = self._create_space("Room", monthly_rate=1000)
+        self.desk = self._create_space("Desk", monthly_rate=None)
+
+        # 11:00-12:00 on the room is booked; 14:00-15:00 on the desk is held
+        SpaceCalendarSlot.objects.filter(calendar__space=self.room, start_time=time(11, 0)).update(status='booked')
+        Booking.objects.create(
+            workspace=self.workspace,
+            space=self.room,
+            user=self.user,
+            booking_date=self.day,
+            check_in=self._at(11),
+            check_out=self._at(12),
+            base_price=10,
+            total_price=10,
+            status='confirmed'
+        )
+        Reservation.objects.create(
+            space=self.desk,
+            user=self.user,
+            start=self._at(14),
+            end=self._at(15),
+            expires_at=timezone.now() + timedelta(minutes=10)
+        )
+
+    def _create_space(self, name, monthly_rate):
+        space = create_space(self.branch, name=name, monthly_rate=monthly_rate)
+        calendar = SpaceCalendar.objects.create(space=space)
+        SpaceCalendarSlot.objects.bulk_create([
+            SpaceCalendarSlot(
+                calendar=calendar,
+                date=self.day,
+                start_time=time(hour, 0),
+                end_time=time(hour + 1, 0),
+                booking_type='hourly',
+            )
+            for hour in range(9, 17)
+        ])
+        return space
+
+    def _at(self, hour):
+        return timezone.make_aware(datetime.combine(self.day, time(hour, 0)))
+
+    def _item(self, space, start, end, booking_type='hourly'):
+        return {
+            'space_id': str(space.id),
+            'booking_date': self.day.isoformat(),
+            'start_time': start,
+            'end_time': end,
+            'booking_type': booking_type,
+        }
+
+    def test_batch_quote_is_read_only_and_set_based(self):
+        payload = {'items': [
+            self._item(self.room, '09:00', '11:00'),
+            self._item(self.room, '10:00', '12:00'),
+            self._item(self.desk, '14:00', '15:00'),
+            self._item(self.desk, '09:00', '13:00', 'daily'),
+            self._item(self.desk, '09:00', '17:00', 'monthly'),
+        ]}
+
+        # Slots, bookings, holds and rate tables: one query each
+        with self.assertNumQueries(4):
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+
+        quotes = response.json()['quotes']
+        self.assertEqual([quote['available'] for quote in quotes], [True, False, False, True, False])
+        self.assertEqual(quotes[0]['price'], '20.00')
+        self.assertEqual(quotes[3]['price'], '50.00')
+        self.assertIn('rate', quotes[4]['reason'])
+        self.assertEqual(response.json()['total'], '70.00')
+
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertFalse(CartItem.objects.exists())
+
+        with self.assertNumQueries(0):
+            cached = self.client.post(self.url, payload, format='json')
+        self.assertEqual(cached.json()['quotes'], quotes)
+
+    def test_rejects_invalid_range(self):
+        response = self.client.post(self.url, {'items': [self._item(self.room, '12:00', '10:00')]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
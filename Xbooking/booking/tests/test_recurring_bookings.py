@@ -0,0 +1,125 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+from workspace.models import SpaceCalendar, SpaceCalendarSlot
+from booking.models import Booking, Cart, CartItem, Reservation
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RESERVATION_HOLDS_ENABLED=False)
+class TestRecurringBookings(TestCase):
+    url = '/api/v1/booking/cart/add_recurring/'
+    weeks = 10
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user("recurring@example.com", full_name="Recurring User")
+        self.client.force_authenticate(user=self.user)
+        self.workspace = create_workspace(self.user, name="Recurring Workspace")
+        self.branch = create_branch(self.workspace)
+        self.space = create_space(self.branch)
+        calendar = SpaceCalendar.objects.create(space=self.space)
+        self.first_day = date.today() + timedelta(days=3)
+        self.days = [self.first_day + timedelta(weeks=week) for week in range(self.weeks)]
+        SpaceCalendarSlot.objects.bulk_create([
+            SpaceCalendarSlot(
+                calendar=calendar,
+                date=day,
+                start_time=time(hour, 0),
+                end_time=time(hour + 1, 0),
+                booking_type='hourly',
+            )
+            for day in self.days
+            for hour in range(9, 17)
+        ])
+
+    def _payload(self, count, **extra):
+        payload = {
+            'space_id': str(self.space.id),
+            'start_date': self.first_day.isoformat(),
+            'start_time': '10:00',
+            'end_time': '12:00',
+            'rrule': f'FREQ=WEEKLY;COUNT={count}',
+        }
+        payload.update(extra)
+        return payload
+
+    def _book_second_week(self):
+        day = self.days[1]
+        SpaceCalendarSlot.objects.filter(date=day, start_time=time(11, 0)).update(status='booked')
+        Booking.objects.create(
+            workspace=self.workspace,
+            space=self.space,
+            user=self.user,
+            booking_date=day,
+            check_in=timezone.make_aware(datetime.combine(day, time(11, 0))),
+            check_out=timezone.make_aware(datetime.combine(day, time(12, 0))),
+            base_price=10,
+            total_price=10,
+            status='confirmed'
+        )
+
+    def test_partial_conflicts_are_reported(self):
+        self._book_second_week()
+
+        response = self.client.post(self.url, self._payload(4), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+
+        body = response.json()
+        self.assertEqual(len(body['items']), 3)
+        self.assertEqual(body['conflicts'], [
+            {'date': self.days[1].isoformat(), 'reason': 'Part of this time is already taken'}
+        ])
+
+        self.assertEqual(Reservation.objects.filter(status='active').count(), 3)
+        self.assertEqual(SpaceCalendarSlot.objects.filter(status='reserved').count(), 6)
+        for reservation in Reservation.objects.all():
+            self.assertEqual(reservation.held_slots.count(), 2)
+
+        cart = Cart.objects.get(user=self.user)
+        self.assertEqual(cart.item_count, 3)
+        self.assertEqual(cart.total, Decimal('60.00'))
+
+    def test_all_or_nothing_creates_nothing_on_conflict(self):
+        self._book_second_week()
+
+        response = self.client.post(self.url, self._payload(4, allow_partial=False), format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(len(response.json()['errors']['conflicts']), 1)
+
+        self.assertFalse(Reservation.objects.exists())
+        self.assertFalse(CartItem.objects.exists())
+        self.assertFalse(SpaceCalendarSlot.objects.filter(status='reserved').exists())
+
+    def test_query_count_does_not_grow_with_occurrences(self):
+        def queries_for(count):
+            CartItem.objects.all().delete()
+            Reservation.objects.all().delete()
+            SpaceCalendarSlot.objects.update(status='available', reservation=None)
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(self.url, self._payload(count), format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+            self.assertEqual(len(response.json()['items']), count)
+            return len(context.captured_queries)
+
+        # Warm up: creates the cart and caches the rate table
+        queries_for(1)
+        self.assertEqual(queries_for(2), queries_for(self.weeks))
+
+    def test_unbounded_rule_is_rejected(self):
+        response = self.client.post(self.url, self._payload(1, rrule='FREQ=DAILY'), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('COUNT or UNTIL', str(response.json()['errors']))
+
+    def test_rules_repeating_within_a_day_are_rejected(self):
+        for rrule in ('FREQ=HOURLY;COUNT=3', 'FREQ=DAILY;BYHOUR=9,14;COUNT=4'):
+            response = self.client.post(self.url, self._payload(1, rrule=rrule), format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, rrule)
+        self.assertFalse(CartItem.objects.exists())
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from celery.signals import worker_ready
+from django.apps import apps
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from booking.models import Reservation
+from booking.services import BookingService, ReservationHoldService
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestReservationHolds(TestCase):
+    def setUp(self):
+        self.user = create_user("hold@example.com", full_name="Hold User")
+        self.workspace = create_workspace(self.user, name="Hold Workspace")
+        self.branch = create_branch(self.workspace)
+        self.space = create_space(self.branch)
+        self.start = timezone.now() + timedelta(days=1)
+        self.end = self.start + timedelta(hours=2)
+
+    def test_rejects_when_redis_hold_is_taken(self):
+        with patch.object(ReservationHoldService, 'claim', return_value=False):
+            with self.assertRaises(ValueError):
+                BookingService.create_reservation(self.space, self.user, self.start, self.end)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_reservation_uses_claimed_hold_id(self):
+        with patch.object(ReservationHoldService, 'claim', return_value=True) as mock_claim:
+            reservation = BookingService.create_reservation(self.space, self.user, self.start, self.end)
+        self.assertEqual(mock_claim.call_args[0][1], reservation.id)
+
+    def test_expire_reservation_releases_hold(self):
+        with patch.object(ReservationHoldService, 'claim', return_value=None):
+            reservation = BookingService.create_reservation(self.space, self.user, self.start, self.end)
+
+        with patch.object(ReservationHoldService, 'release') as mock_release:
+            self.assertTrue(BookingService.expire_reservation(reservation))
+            self.assertFalse(BookingService.expire_reservation(reservation))
+        mock_release.assert_called_once_with(self.space.id, reservation.id)
+
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, 'expired')
+
+
+class TestReservationHoldListener(SimpleTestCase):
+    def test_listener_reconnects_after_a_dropped_connection(self):
+        attempts = []
+
+        def listen_once():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError('Connection closed by server')
+            ReservationHoldService._listener_stop.set()
+
+        with patch.object(ReservationHoldService, '_listen_once', side_effect=listen_once), \
+                patch('booking.services.holds.LISTENER_RECONNECT_SECONDS', 0):
+            ReservationHoldService.start_expiry_listener()
+            ReservationHoldService._listener_thread.join(timeout=5)
+
+        self.assertFalse(ReservationHoldService._listener_thread.is_alive())
+        self.assertEqual(len(attempts), 2)
+
+    def test_listener_only_starts_where_enabled(self):
+        config = apps.get_app_config('booking')
+        with patch.object(ReservationHoldService, 'start_expiry_listener') as start:
+            config.ready()
+            start.assert_not_called()
+
+            with override_settings(RESERVATION_HOLD_LISTENER_ENABLED=True):
+                start.side_effect = ConnectionError('Redis down')
+                config.ready()
+            start.assert_called_once()
+
+    def test_celery_workers_start_the_listener_by_default(self):
+        with patch.object(ReservationHoldService, 'start_expiry_listener') as start:
+            worker_ready.send(sender=None)
+        start.assert_called_once()
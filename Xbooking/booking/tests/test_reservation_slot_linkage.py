@@ -0,0 +1,137 @@
+import threading
+import unittest
+from datetime import date, datetime, time, timedelta
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+from workspace.models import SpaceCalendar, SpaceCalendarSlot
+from booking.models import Reservation
+from booking.services import BookingService
+
+
+class SlotLinkageFixtureMixin:
+    def create_fixture(self):
+        self.user_a = create_user("holder-a@example.com", full_name="Holder A")
+        self.user_b = create_user("holder-b@example.com", full_name="Holder B")
+        self.workspace = create_workspace(self.user_a, name="Linkage Workspace")
+        self.branch = create_branch(self.workspace)
+        self.space = create_space(self.branch)
+        self.calendar = SpaceCalendar.objects.create(space=self.space)
+        self.day = date.today() + timedelta(days=3)
+        SpaceCalendarSlot.objects.bulk_create([
+            SpaceCalendarSlot(
+                calendar=self.calendar,
+                date=self.day,
+                start_time=time(hour, 0),
+                end_time=time(hour + 1, 0),
+                booking_type='hourly',
+            )
+            for hour in range(9, 17)
+        ])
+
+    def hold(self, user, start_hour, end_hour):
+        slots = list(SpaceCalendarSlot.objects.filter(
+            calendar=self.calendar,
+            start_time__gte=time(start_hour, 0),
+            end_time__lte=time(end_hour, 0)
+        ))
+        return BookingService.create_reservation(
+            space=self.space,
+            user=user,
+            start_datetime=timezone.make_aware(datetime.combine(self.day, time(start_hour, 0))),
+            end_datetime=timezone.make_aware(datetime.combine(self.day, time(end_hour, 0))),
+            slots=slots
+        )
+
+    def slot_statuses(self):
+        return dict(
+            SpaceCalendarSlot.objects.filter(calendar=self.calendar).values_list('start_time__hour', 'status')
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RESERVATION_HOLDS_ENABLED=False)
+class TestReservationSlotLinkage(SlotLinkageFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_fixture()
+
+    def test_cancel_releases_only_own_slots(self):
+        reservation_a = self.hold(self.user_a, 9, 11)
+        reservation_b = self.hold(self.user_b, 11, 13)
+
+        BookingService.cancel_reservation(reservation_a)
+
+        statuses = self.slot_statuses()
+        self.assertEqual(statuses[9], 'available')
+        self.assertEqual(statuses[10], 'available')
+        self.assertEqual(statuses[11], 'reserved')
+        self.assertEqual(statuses[12], 'reserved')
+        self.assertEqual(
+            set(reservation_b.held_slots.values_list('start_time__hour', flat=True)),
+            {11, 12}
+        )
+
+    def test_confirm_books_only_own_slots(self):
+        self.hold(self.user_a, 9, 11)
+        reservation_b = self.hold(self.user_b, 11, 13)
+
+        BookingService.confirm_reservation(reservation_b)
+
+        statuses = self.slot_statuses()
+        self.assertEqual([statuses[h] for h in (9, 10)], ['reserved', 'reserved'])
+        self.assertEqual([statuses[h] for h in (11, 12)], ['booked', 'booked'])
+
+    def test_expiry_releases_only_lapsed_slots(self):
+        reservation_a = self.hold(self.user_a, 9, 11)
+        self.hold(self.user_b, 11, 13)
+        Reservation.objects.filter(id=reservation_a.id).update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        self.assertEqual(BookingService.expire_reservations_batch(), 1)
+
+        statuses = self.slot_statuses()
+        self.assertEqual([statuses[h] for h in (9, 10)], ['available', 'available'])
+        self.assertEqual([statuses[h] for h in (11, 12)], ['reserved', 'reserved'])
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Concurrent holds need row-level locking (PostgreSQL)')
+@override_settings(CACHES=LOCMEM_CACHES, RESERVATION_HOLDS_ENABLED=False)
+class TestConcurrentReservationHolds(SlotLinkageFixtureMixin, TransactionTestCase):
+    def setUp(self):
+        self.create_fixture()
+
+    def test_concurrent_holds_on_same_space_do_not_interfere(self):
+        barrier = threading.Barrier(2)
+        reservations = {}
+        errors = []
+
+        def worker(user, start_hour, end_hour):
+            try:
+                barrier.wait()
+                reservation = self.hold(user, start_hour, end_hour)
+                barrier.wait()
+                reservations[user.email] = reservation
+                if user == self.user_a:
+                    BookingService.cancel_reservation(reservation)
+                else:
+                    BookingService.confirm_reservation(reservation)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(self.user_a, 9, 11)),
+            threading.Thread(target=worker, args=(self.user_b, 11, 13)),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        statuses = self.slot_statuses()
+        self.assertEqual([statuses[h] for h in (9, 10)], ['available', 'available'])
+        self.assertEqual([statuses[h] for h in (11, 12)], ['booked', 'booked'])
+        self.assertEqual(statuses[13], 'available')
@@ -0,0 +1,174 @@
+import threading
+import unittest
+from datetime import date, time, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+from workspace.models import SpaceCalendar, SpaceCalendarSlot
+from booking.models import Cart, CartItem, Reservation, SeatClaim
+from booking.services import BookingService
+from booking.services.occupancy import OccupancyService
+from workspace.services import AvailabilityService
+
+
+# Seats on the shared space in the load test (more clients than seats race for them)
+SHARED_CAPACITY = 3
+PARALLEL_CLIENTS = 8
+
+
+class SharedSpaceFixtureMixin:
+    def create_fixture(self, capacity=SHARED_CAPACITY):
+        self.owner = create_user("owner@example.com", full_name="Owner")
+        self.workspace = create_workspace(self.owner, name="Shared Workspace")
+        self.branch = create_branch(self.workspace)
+        self.space = create_space(self.branch, name="Hot Desks", space_type="coworking", capacity=capacity)
+        calendar = SpaceCalendar.objects.create(space=self.space)
+        self.booking_date = date.today() + timedelta(days=3)
+        SpaceCalendarSlot.objects.bulk_create([
+            SpaceCalendarSlot(
+                calendar=calendar,
+                date=self.booking_date,
+                start_time=time(hour, 0),
+                end_time=time(hour + 1, 0),
+                booking_type='hourly',
+            )
+            for hour in range(9, 17)
+        ])
+
+    def client_for(self, email):
+        user = create_user(email)
+        Cart.objects.create(user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        client.user = user
+        return client
+
+    def add(self, client, start='10:00', end='12:00', seats=1):
+        return client.post('/api/v1/booking/cart/add_item/', {
+            'space_id': str(self.space.id),
+            'booking_date': self.booking_date.isoformat(),
+            'start_time': start,
+            'end_time': end,
+            'booking_type': 'hourly',
+            'seats': seats,
+        }, format='json')
+
+    def occupancy(self):
+        return list(
+            SpaceCalendarSlot.objects.filter(start_time__in=[time(10, 0), time(11, 0)])
+            .order_by('start_time').values_list('occupied', 'status')
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RESERVATION_HOLDS_ENABLED=False)
+class TestSharedSpaceOccupancy(SharedSpaceFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_fixture()
+
+    def test_seats_are_counted_until_full(self):
+        first = self.client_for('first@example.com')
+        response = self.add(first, seats=2)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        self.assertEqual(Decimal(response.json()['price']), Decimal('40.00'))
+        self.assertEqual(self.occupancy(), [(2, 'available'), (2, 'available')])
+
+        # Overlapping, not exclusive: one more seat fits, two do not
+        second = self.client_for('second@example.com')
+        self.assertEqual(self.add(second, start='11:00', end='13:00', seats=2).status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.add(second, start='11:00', end='13:00').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.occupancy(), [(2, 'available'), (3, 'booked')])
+
+        third = self.client_for('third@example.com')
+        self.assertEqual(self.add(third).status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.add(third, start='10:00', end='11:00').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.occupancy(), [(3, 'booked'), (3, 'booked')])
+
+    def test_cancel_and_expiry_give_seats_back(self):
+        first = self.client_for('first@example.com')
+        second = self.client_for('second@example.com')
+        self.add(first, seats=2)
+        self.add(second)
+        self.assertEqual(self.occupancy(), [(3, 'booked'), (3, 'booked')])
+
+        BookingService.cancel_reservation(Reservation.objects.get(user=second.user))
+        self.assertEqual(self.occupancy(), [(2, 'available'), (2, 'available')])
+
+        expired = BookingService.expire_reservations_batch(now=Reservation.objects.get(user=first.user).expires_at)
+        self.assertEqual(expired, 1)
+        self.assertEqual(self.occupancy(), [(0, 'available'), (0, 'available')])
+        self.assertFalse(SeatClaim.objects.exists())
+
+    def test_checkout_moves_seats_to_booking_and_cancellation_frees_them(self):
+        client = self.client_for('buyer@example.com')
+        self.add(client, seats=3)
+
+        items = list(
+            CartItem.objects.filter(cart__user=client.user).select_related('space__branch__workspace', 'reservation')
+        )
+        booking = BookingService.create_bookings_from_cart_items(items, client.user)[0]
+        self.assertEqual(SeatClaim.objects.filter(booking=booking).count(), 2)
+
+        # The confirmed reservation is no longer reaped, so the seats stay taken
+        self.assertEqual(BookingService.expire_reservations_batch(), 0)
+        self.assertEqual(self.occupancy(), [(3, 'booked'), (3, 'booked')])
+
+        BookingService.release_booking_slots(booking)
+        self.assertEqual(self.occupancy(), [(0, 'available'), (0, 'available')])
+
+    def test_blocked_slots_are_never_claimed(self):
+        SpaceCalendarSlot.objects.filter(start_time=time(11, 0)).update(status='blocked')
+        client = self.client_for('first@example.com')
+
+        self.assertEqual(self.add(client).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.occupancy(), [(1, 'available'), (0, 'blocked')])
+
+    def test_released_seats_invalidate_availability(self):
+        client = self.client_for('first@example.com')
+        self.add(client)
+        reservation = Reservation.objects.get(user=client.user)
+
+        with patch.object(AvailabilityService, 'invalidate_range') as invalidate_range:
+            OccupancyService.release_reservations([reservation.id])
+
+        invalidate_range.assert_called_once_with(self.space.id, self.booking_date, self.booking_date)
+
+    def test_exclusive_spaces_reject_seats(self):
+        self.space.space_type = 'meeting_room'
+        self.space.save()
+        client = self.client_for('first@example.com')
+        self.assertEqual(self.add(client, seats=2).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Parallel seat claims need row-level locking (PostgreSQL)')
+@override_settings(CACHES=LOCMEM_CACHES, RESERVATION_HOLDS_ENABLED=False)
+class TestParallelSeatClaims(SharedSpaceFixtureMixin, TransactionTestCase):
+    def setUp(self):
+        self.create_fixture()
+
+    def test_parallel_clients_never_oversell(self):
+        clients = [self.client_for(f'racer{i}@example.com') for i in range(PARALLEL_CLIENTS)]
+        barrier = threading.Barrier(PARALLEL_CLIENTS)
+        results = []
+
+        def worker(client):
+            try:
+                barrier.wait()
+                results.append(self.add(client).status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(status.HTTP_201_CREATED), SHARED_CAPACITY)
+        self.assertEqual(self.occupancy(), [(SHARED_CAPACITY, 'booked'), (SHARED_CAPACITY, 'booked')])
+        self.assertEqual(Reservation.objects.filter(status='active').count(), SHARED_CAPACITY)
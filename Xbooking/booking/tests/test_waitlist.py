@@ -0,0 +1,166 @@
+import json
+from datetime import date, datetime, time, timedelta
+from unittest.mock import patch
+
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+from workspace.models import SpaceCalendar, SpaceCalendarSlot
+from booking.models import CartItem, Reservation
+from booking.services import BookingService, WaitlistService
+from booking.tasks import offer_waitlist_slots
+from core.services import EventBus, EventTypes
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RESERVATION_HOLDS_ENABLED=False)
+class TestWaitlist(TestCase):
+    def setUp(self):
+        publish = patch.object(EventBus, 'publish')
+        self.publish = publish.start()
+        self.addCleanup(publish.stop)
+        # Run the offer task in-process, with arguments as the broker would deliver them
+        queue = patch.object(
+            offer_waitlist_slots, 'delay', side_effect=lambda windows: offer_waitlist_slots(json.loads(json.dumps(windows)))
+        )
+        self.queue_offers = queue.start()
+        self.addCleanup(queue.stop)
+        self.holder = create_user("holder@example.com", full_name="Holder")
+        self.first = create_user("first@example.com", full_name="First")
+        self.second = create_user("second@example.com", full_name="Second")
+        self.workspace = create_workspace(self.holder, name="Waitlist Workspace")
+        self.branch = create_branch(self.workspace)
+        self.space = create_space(self.branch)
+        calendar = SpaceCalendar.objects.create(space=self.space)
+        self.day = date.today() + timedelta(days=2)
+        SpaceCalendarSlot.objects.bulk_create([
+            SpaceCalendarSlot(
+                calendar=calendar,
+                date=self.day,
+                start_time=time(hour, 0),
+                end_time=time(hour + 1, 0),
+                booking_type='hourly',
+            )
+            for hour in range(9, 17)
+        ])
+        self.held = BookingService.create_reservation(
+            space=self.space,
+            user=self.holder,
+            start_datetime=self._at(10),
+            end_datetime=self._at(12),
+            slots=list(SpaceCalendarSlot.objects.filter(start_time__in=[time(10, 0), time(11, 0)]))
+        )
+
+    def _at(self, hour):
+        return timezone.make_aware(datetime.combine(self.day, time(hour, 0)))
+
+    def _join(self, user, start=10, end=12, **extra):
+        return WaitlistService.join(self.space, user, self._at(start), self._at(end), **extra)
+
+    def test_join_via_api(self):
+        client = APIClient()
+        client.force_authenticate(user=self.first)
+        payload = {
+            'space_id': str(self.space.id),
+            'booking_date': self.day.isoformat(),
+            'start_time': '10:00',
+            'end_time': '11:00',
+        }
+
+        response = client.post('/api/v1/booking/waitlist/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        self.assertEqual(response.json()['status'], 'waiting')
+
+        duplicate = client.post('/api/v1/booking/waitlist/', payload, format='json')
+        self.assertEqual(duplicate.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cancelled_hold_is_offered_in_priority_order(self):
+        first = self._join(self.first)
+        second = self._join(self.second, priority=0)
+        late_but_urgent = self._join(self.holder, start=11, end=12, priority=5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BookingService.cancel_reservation(self.held)
+
+        late_but_urgent.refresh_from_db()
+        first.refresh_from_db()
+        second.refresh_from_db()
+
+        # The higher priority entry wins 11-12, so 10-12 is no longer free for the FIFO entries
+        self.assertEqual(late_but_urgent.status, 'offered')
+        self.assertEqual(first.status, 'waiting')
+        self.assertEqual(second.status, 'waiting')
+
+        offer = late_but_urgent.reservation
+        self.assertEqual(offer.status, 'active')
+        self.assertEqual(offer.held_slots.count(), 1)
+        self.assertTrue(CartItem.objects.filter(reservation=offer, cart__user=self.holder).exists())
+        offered_events = [
+            call.args[0] for call in self.publish.call_args_list
+            if call.args[0].event_type == EventTypes.WAITLIST_SLOT_OFFERED
+        ]
+        self.assertEqual([event.data['waitlist_entry_id'] for event in offered_events], [str(late_but_urgent.id)])
+
+    def test_lapsed_offer_moves_to_next_entry(self):
+        first = self._join(self.first)
+        second = self._join(self.second)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BookingService.cancel_reservation(self.held)
+        first.refresh_from_db()
+        self.assertEqual(first.status, 'offered')
+        self.assertTrue(CartItem.objects.filter(cart__user=self.first).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            expired = BookingService.expire_reservations_batch(now=timezone.now() + timedelta(hours=1))
+        self.assertEqual(expired, 1)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, 'expired')
+        self.assertFalse(CartItem.objects.filter(cart__user=self.first).exists())
+        self.assertEqual(second.status, 'offered')
+        self.assertEqual(second.reservation.held_slots.count(), 2)
+
+    def test_checkout_fulfils_offer(self):
+        entry = self._join(self.first)
+        with self.captureOnCommitCallbacks(execute=True):
+            BookingService.cancel_reservation(self.held)
+
+        items = list(CartItem.objects.filter(cart__user=self.first).select_related('space__branch__workspace', 'reservation'))
+        BookingService.create_bookings_from_cart_items(items, self.first)
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, 'fulfilled')
+
+    def test_entry_stays_waiting_while_range_is_taken(self):
+        entry = self._join(self.first, start=11, end=13)
+
+        # 12-13 frees up but 11-12 is still held
+        self.assertEqual(WaitlistService.offer_next(self.space.id, self._at(12), self._at(13)), [])
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, 'waiting')
+        self.assertEqual(Reservation.objects.filter(user=self.first).count(), 0)
+
+    def test_concurrent_join_returns_the_existing_entry(self):
+        entry = self._join(self.first)
+
+        # The other request inserted its entry after this one's duplicate check
+        with patch.object(QuerySet, 'exists', return_value=False):
+            self.assertEqual(self._join(self.first), entry)
+
+    def test_released_ranges_are_offered_by_a_task(self):
+        entry = self._join(self.first)
+        self.queue_offers.side_effect = None
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BookingService.cancel_reservation(self.held)
+
+        self.queue_offers.assert_called_once_with(
+            [(str(self.space.id), self.held.start.isoformat(), self.held.end.isoformat())]
+        )
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, 'waiting')
@@ -12,6 +12,8 @@ from booking.views.v1 import (
     AdminBookingViewSet,
     GuestViewSet,
     BookingCancellationViewSet,
+    QuoteView,
+    WaitlistViewSet,
 )
 
 app_name = 'booking_v1'
@@ -23,6 +25,7 @@ router.register(r'cart', CartViewSet, basename='cart')
 router.register(r'reviews', BookingReviewViewSet, basename='review')
 router.register(r'guests', GuestViewSet, basename='guest')
 router.register(r'cancellations', BookingCancellationViewSet, basename='cancellation')
+router.register(r'waitlist', WaitlistViewSet, basename='waitlist')
 
 # Admin routes with workspace context
 admin_router = DefaultRouter()
@@ -30,6 +33,7 @@ admin_router.register(r'bookings', AdminBookingViewSet, basename='admin-booking'
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('quote/', QuoteView.as_view(), name='quote'),
     # Admin routes under workspaces/<workspace_id>/admin/
     path('workspaces/<uuid:workspace_id>/admin/', include(admin_router.urls)),
 ]
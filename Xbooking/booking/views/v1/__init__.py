@@ -8,6 +8,8 @@ from .review import BookingReviewViewSet
 from .admin import AdminBookingViewSet
 from .guest import GuestViewSet
 from .cancellation import BookingCancellationViewSet
+from .quote import QuoteView
+from .waitlist import WaitlistViewSet
 
 __all__ = [
     'BookingViewSet',
@@ -16,4 +18,6 @@ __all__ = [
     'AdminBookingViewSet',
     'GuestViewSet',
     'BookingCancellationViewSet',
+    'QuoteView',
+    'WaitlistViewSet',
 ]
@@ -21,6 +21,7 @@ class AdminBookingViewSet(CachedModelViewSet):
     """Admin ViewSet for managing bookings in workspaces"""
     permission_classes = [IsAuthenticated]
     pagination_class = StandardResultsSetPagination
+    pagination_count_strategy = 'estimate'
     serializer_class = BookingDetailSerializer
     filterset_fields = ['status', 'booking_type', 'space']
     search_fields = ['user__email', 'user__first_name', 'user__last_name']
@@ -8,6 +8,7 @@ from drf_spectacular.utils import extend_schema, extend_schema_view
 from django.db import transaction
 
 from core.views import CachedModelViewSet
+from core.middleware import query_budget
 from core.responses import SuccessResponse, ErrorResponse
 from core.pagination import StandardResultsSetPagination
 from booking.models import Booking
@@ -20,6 +21,7 @@ from booking.serializers.v1 import (
 )
 from booking.services import BookingService
 from workspace.models import Space
+from workspace.services import PricingService
 from decimal import Decimal
 from datetime import datetime
 
@@ -29,10 +31,12 @@ from datetime import datetime
     retrieve=extend_schema(description="Retrieve booking details"),
     create=extend_schema(description="Create booking (from cart checkout)"),
 )
+@query_budget(8)
 class BookingViewSet(CachedModelViewSet):
     """ViewSet for managing bookings"""
     permission_classes = [IsAuthenticated]
     pagination_class = StandardResultsSetPagination
+    pagination_count_strategy = 'cached'
     cache_timeout = 300
     http_method_names = ['get', 'post', 'delete']
     
@@ -86,6 +90,7 @@ class BookingViewSet(CachedModelViewSet):
         request=DirectBookingSerializer,
         responses={201: BookingDetailSerializer}
     )
+    @query_budget(16)
     def create(self, request):
         """Create a direct booking without cart"""
         serializer = DirectBookingSerializer(data=request.data)
@@ -123,8 +128,7 @@ class BookingViewSet(CachedModelViewSet):
             check_out = datetime.combine(data['booking_date'], data['end_time'])
             
             # Calculate price
-            hours = (check_out - check_in).total_seconds() / 3600
-            base_price = Decimal(str(space.price_per_hour)) * Decimal(str(hours))
+            base_price = PricingService.quote(space.id, check_in, check_out, data['booking_type'])
             
             # Create reservation first (15-minute hold)
             with transaction.atomic():
@@ -181,6 +185,7 @@ class BookingViewSet(CachedModelViewSet):
         request=CancelBookingSerializer,
         responses={200: BookingDetailSerializer}
     )
+    @query_budget(50)
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
         """Cancel a booking"""
@@ -218,6 +223,7 @@ class BookingViewSet(CachedModelViewSet):
     @extend_schema(
         responses={200: BookingDetailSerializer}
     )
+    @query_budget(20)
     @action(detail=True, methods=['post'])
     def check_in(self, request, pk=None):
         """Check in to a booking"""
@@ -244,6 +250,7 @@ class BookingViewSet(CachedModelViewSet):
     @extend_schema(
         responses={200: BookingDetailSerializer}
     )
+    @query_budget(10)
     @action(detail=True, methods=['post'])
     def check_out(self, request, pk=None):
         """Check out from a booking"""
@@ -4,12 +4,18 @@ Cart Views V1
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from django.db import transaction
 from django.utils import timezone
 from decimal import Decimal
 from datetime import datetime, timedelta
+import hashlib
+import json
 
+from core.cache import CacheService
+from core.instrumentation import timed
+from core.middleware import query_budget
 from core.views import CachedModelViewSet
 from core.responses import SuccessResponse, ErrorResponse
 from core.pagination import StandardResultsSetPagination
@@ -19,14 +25,25 @@ from booking.serializers.v1 import (
     CartItemSerializer,
     AddToCartSerializer,
     RemoveFromCartSerializer,
-    CheckoutSerializer
+    CheckoutSerializer,
+    RecurringCartSerializer
 )
 
 
+# Upper bound for how long GET /cart may be served from cache
+CART_SNAPSHOT_TIMEOUT = 60
+
+# How long add-to-cart responses are kept for Idempotency-Key replays
+IDEMPOTENCY_TIMEOUT = CacheService.TIMEOUT_LONG
+# How long a key stays reserved by a request that never finished (e.g. a crashed worker)
+IDEMPOTENCY_IN_FLIGHT_TIMEOUT = 60
+
+
 @extend_schema_view(
     list=extend_schema(description="Get user cart"),
     create=extend_schema(description="Add item to cart"),
 )
+@query_budget(6)
 class CartViewSet(CachedModelViewSet):
     """ViewSet for managing shopping cart"""
     serializer_class = CartSerializer
@@ -37,25 +54,92 @@ class CartViewSet(CachedModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
-        return Cart.objects.filter(user=user).prefetch_related('items__space')
+        return Cart.objects.filter(user=user).prefetch_related('items__space', 'items__reservation')
     
     def list(self, request):
-        """Get user's cart"""
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        serializer = self.get_serializer(cart)
+        """Get user's cart, served from a cached snapshot while nothing has changed"""
+        cache_key = Cart.snapshot_cache_key(request.user.id)
+        data = CacheService.get(cache_key)
+        
+        if data is None:
+            cart = self.get_queryset().first()
+            if cart is None:
+                # get_or_create: concurrent first requests must not both insert the cart
+                cart, _ = Cart.objects.get_or_create(user=request.user)
+            data = self.get_serializer(cart).data
+            
+            # Never outlive the earliest hold, so expiry flags in the snapshot stay truthful
+            timeout = CART_SNAPSHOT_TIMEOUT
+            expiries = [item.reservation.expires_at for item in cart.items.all() if item.reservation]
+            if expiries:
+                seconds_left = int((min(expiries) - timezone.now()).total_seconds())
+                timeout = max(min(timeout, seconds_left), 1)
+            CacheService.set(cache_key, data, timeout)
+        
         return SuccessResponse(
             message='Cart retrieved successfully',
-            data=serializer.data
+            data=data
         )
     
+    @query_budget(16)
     def create(self, request):
         """Redirect POST to add_item action for backward compatibility"""
         return self.add_item(request)
     
-    @extend_schema(request=AddToCartSerializer)
+    @extend_schema(
+        request=AddToCartSerializer,
+        parameters=[
+            OpenApiParameter(
+                name='Idempotency-Key',
+                location=OpenApiParameter.HEADER,
+                required=False,
+                description='Client-generated key; retries with the same key replay the first successful response'
+            )
+        ]
+    )
+    @query_budget(16)
     @action(detail=False, methods=['post'])
+    @timed('cart.add_item')
     def add_item(self, request):
-        """Add item to cart"""
+        """Add item to cart (idempotent when an Idempotency-Key header is sent)"""
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if not idempotency_key:
+            return self._add_item(request)
+        
+        cache_key = f"cart:idempotency:{request.user.id}:{idempotency_key}"
+        fingerprint = hashlib.sha256(
+            json.dumps(request.data, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        
+        # Reserve the key before doing any work so concurrent retries cannot both create holds
+        if not CacheService.add(cache_key, {'fingerprint': fingerprint, 'response': None}, IDEMPOTENCY_IN_FLIGHT_TIMEOUT):
+            previous = CacheService.get(cache_key)
+            if previous is None:
+                # Cache unavailable (or the key just expired): serve the request without replay protection
+                return self._add_item(request)
+            if previous.get('fingerprint') != fingerprint:
+                return ErrorResponse(
+                    message='Idempotency-Key was already used with a different request body',
+                    status_code=422
+                )
+            if previous.get('response') is None:
+                return ErrorResponse(
+                    message='A request with this Idempotency-Key is still being processed',
+                    status_code=409
+                )
+            response = Response(previous['response'], status=201)
+            response['Idempotent-Replayed'] = 'true'
+            return response
+        
+        response = self._add_item(request)
+        if response.status_code == 201:
+            CacheService.set(cache_key, {'fingerprint': fingerprint, 'response': response.data}, IDEMPOTENCY_TIMEOUT)
+        else:
+            # Failed attempts leave nothing behind, so the client may retry with the same key
+            CacheService.delete(cache_key)
+        return response
+    
+    def _add_item(self, request):
         serializer = AddToCartSerializer(data=request.data)
         
         if not serializer.is_valid():
@@ -80,16 +164,18 @@ class CartViewSet(CachedModelViewSet):
             )
         
         # Validate guests based on space type
-        space_type = space.space_type.lower()
         number_of_guests = data.get('number_of_guests', 0)
-        if space_type == 'office' and number_of_guests == 0:
+        guest_error = self._guest_error(space, number_of_guests)
+        if guest_error:
             return ErrorResponse(
-                message='At least 1 guest is required for private office spaces',
+                message=guest_error,
                 status_code=400
             )
-        elif space_type != 'office' and number_of_guests > 0:
+        
+        seats = data['seats']
+        if seats > 1 and not space.is_shared:
             return ErrorResponse(
-                message='Guests are only allowed for private office spaces',
+                message='Seats can only be booked on coworking, desk and lounge spaces',
                 status_code=400
             )
         
@@ -109,17 +195,21 @@ class CartViewSet(CachedModelViewSet):
             check_in = tz.make_aware(datetime.combine(booking_date, start_time))
             check_out = tz.make_aware(datetime.combine(booking_date, end_time))
         
-        # Calculate price based on booking type
+        # Price from the space's cached rate table
         booking_type = data['booking_type']
-        if booking_type == 'hourly':
-            hours = (check_out - check_in).total_seconds() / 3600
-            price = space.price_per_hour * Decimal(str(hours))
-        elif booking_type == 'daily':
-            price = space.daily_rate
-        elif booking_type == 'monthly':
-            price = space.monthly_rate
-        else:
-            price = space.daily_rate
+        from workspace.services import PricingService
+        try:
+            price = PricingService.quote(space.id, check_in, check_out, booking_type) * seats
+        except ValueError as e:
+            return ErrorResponse(
+                message=str(e),
+                status_code=400
+            )
+        
+        from booking.services import BookingService
+        
+        # Release lapsed holds on this space/range only, so their slots show as available
+        BookingService.expire_stale_reservations(space, check_in, check_out)
         
         # Find available slots for this time range to mark as reserved
         from workspace.models import SpaceCalendarSlot
@@ -127,8 +217,13 @@ class CartViewSet(CachedModelViewSet):
             calendar__space=space,
             date=booking_date
         ).exclude(
-            status__in=['booked', 'reserved', 'blocked', 'maintenance']
+            status__in=['blocked', 'maintenance']
         )
+        if not space.is_shared:
+            # Shared spaces claim every open slot in the range; their seat counters decide
+            slots = slots.exclude(
+                status__in=['booked', 'reserved']
+            )
         
         if booking_type == 'hourly':
             slots = slots.filter(
@@ -136,27 +231,24 @@ class CartViewSet(CachedModelViewSet):
                 end_time__lte=end_time
             )
         
-        if not slots.exists():
+        slot_objects = list(slots)
+        if not slot_objects:
             return ErrorResponse(
                 message=f'No available slots found for {space.name}',
                 status_code=400
             )
         
-        # Get the slot objects for marking as reserved
-        slot_objects = list(slots)
-        
         # Create reservation and cart item atomically
-        from booking.services import BookingService
-        
         try:
-            # Create reservation using service (handles validation)
+            # Create reservation using service; it claims the slots only if they are still available
             reservation = BookingService.create_reservation(
                 space=space,
                 user=request.user,
                 start_datetime=check_in,
                 end_datetime=check_out,
                 expiry_minutes=15,
-                slots=slot_objects  # Pass slots to mark as reserved
+                slots=slot_objects,  # Pass slots to mark as reserved
+                seats=seats
             )
             
             # Create cart item with reservation
@@ -175,8 +267,8 @@ class CartViewSet(CachedModelViewSet):
                 reservation=reservation
             )
             
-            # Recalculate cart totals
-            cart.calculate_totals()
+            # Add the item to the running totals
+            cart.apply_item_delta(cart_item)
             
         except ValueError as e:
             return ErrorResponse(
@@ -190,6 +282,86 @@ class CartViewSet(CachedModelViewSet):
             status_code=201
         )
     
+    @staticmethod
+    def _guest_error(space, number_of_guests):
+        """Guests are required for private offices and not allowed elsewhere"""
+        space_type = space.space_type.lower()
+        if space_type == 'office' and number_of_guests == 0:
+            return 'At least 1 guest is required for private office spaces'
+        if space_type != 'office' and number_of_guests > 0:
+            return 'Guests are only allowed for private office spaces'
+        return None
+    
+    @extend_schema(request=RecurringCartSerializer)
+    @query_budget(20)
+    @action(detail=False, methods=['post'])
+    def add_recurring(self, request):
+        """Hold every occurrence of a recurrence rule and add them to the cart"""
+        serializer = RecurringCartSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return ErrorResponse(
+                message='Invalid recurring booking data',
+                errors=serializer.errors,
+                status_code=400
+            )
+        
+        data = serializer.validated_data
+        
+        try:
+            space = Space.objects.get(id=data['space_id'])
+        except Space.DoesNotExist:
+            return ErrorResponse(
+                message='Space not found',
+                status_code=404
+            )
+        
+        guest_error = self._guest_error(space, data['number_of_guests'])
+        if guest_error:
+            return ErrorResponse(
+                message=guest_error,
+                status_code=400
+            )
+        
+        from booking.services import BookingService
+        
+        cart, _ = Cart.objects.get_or_create(user=request.user)
+        
+        try:
+            result = BookingService.add_recurring_to_cart(
+                cart=cart,
+                space=space,
+                user=request.user,
+                dates=data['occurrence_dates'],
+                start_time=data['start_time'],
+                end_time=data['end_time'],
+                booking_type=data['booking_type'],
+                number_of_guests=data['number_of_guests'],
+                special_requests=data.get('special_requests', ''),
+                allow_partial=data['allow_partial']
+            )
+        except ValueError as e:
+            return ErrorResponse(
+                message=str(e),
+                status_code=409
+            )
+        
+        if not result['items']:
+            return ErrorResponse(
+                message='No occurrences could be added to the cart',
+                errors={'conflicts': result['conflicts']},
+                status_code=409
+            )
+        
+        return SuccessResponse(
+            message=f"Added {len(result['items'])} of {len(data['occurrence_dates'])} occurrences to cart",
+            data={
+                'items': CartItemSerializer(result['items'], many=True).data,
+                'conflicts': result['conflicts'],
+            },
+            status_code=201
+        )
+    
     @action(detail=False, methods=['post'])
     def update_item(self, request):
         """Update cart item (e.g., number of guests)"""
@@ -218,7 +390,8 @@ class CartViewSet(CachedModelViewSet):
             cart_item.special_requests = request.data['special_requests']
         
         cart_item.save()
-        cart_item.cart.calculate_totals()
+        # Prices are unchanged, only the cached snapshot is stale
+        Cart.invalidate_snapshot(request.user.id)
         
         return SuccessResponse(
             message='Cart item updated',
@@ -226,6 +399,7 @@ class CartViewSet(CachedModelViewSet):
         )
     
     @extend_schema(request=RemoveFromCartSerializer)
+    @query_budget(20)
     @action(detail=False, methods=['post'])
     def remove_item(self, request):
         """Remove item from cart"""
@@ -253,23 +427,27 @@ class CartViewSet(CachedModelViewSet):
         
         from booking.services import BookingService
         
+        cart = cart_item.cart
+        reservation = cart_item.reservation
+        deleted, _ = cart_item.delete()
+        # A concurrent remove of the same item already took it off the totals
+        if deleted:
+            cart.apply_item_delta(cart_item, sign=-1)
+        
         # Cancel the associated reservation if it exists
-        if cart_item.reservation:
+        if reservation:
             try:
-                BookingService.cancel_reservation(cart_item.reservation)
+                BookingService.cancel_reservation(reservation)
             except ValueError:
                 # Log but allow cart item removal
                 pass
         
-        cart = cart_item.cart
-        cart_item.delete()
-        cart.calculate_totals()
-        
         return SuccessResponse(
             message='Item removed from cart',
             data=CartSerializer(cart).data
         )
     
+    @query_budget(30)
     @action(detail=False, methods=['post'])
     def clear(self, request):
         """Clear all items from cart"""
@@ -277,16 +455,16 @@ class CartViewSet(CachedModelViewSet):
         
         cart, _ = Cart.objects.get_or_create(user=request.user)
         
-        # Cancel all reservations before deleting items
-        for cart_item in cart.items.all():
-            if cart_item.reservation:
-                try:
-                    BookingService.cancel_reservation(cart_item.reservation)
-                except ValueError:
-                    pass
-        
+        reservations = [item.reservation for item in cart.items.select_related('reservation') if item.reservation]
         cart.items.all().delete()
-        cart.calculate_totals()
+        cart.reset_totals()
+        
+        # Release the holds the items had
+        for reservation in reservations:
+            try:
+                BookingService.cancel_reservation(reservation)
+            except ValueError:
+                pass
         
         return SuccessResponse(
             message='Cart cleared successfully',
@@ -294,7 +472,9 @@ class CartViewSet(CachedModelViewSet):
         )
     
     @extend_schema(request=CheckoutSerializer)
+    @query_budget(30)
     @action(detail=False, methods=['post'])
+    @timed('cart.checkout')
     @transaction.atomic
     def checkout(self, request):
         """Checkout cart and create bookings"""
@@ -309,7 +489,12 @@ class CartViewSet(CachedModelViewSet):
         
         cart, _ = Cart.objects.get_or_create(user=request.user)
         
-        if cart.items.count() == 0:
+        # Load every item with its space, branch, workspace and reservation in one query
+        items = list(
+            cart.items.select_related('space__branch__workspace', 'reservation').order_by('created_at')
+        )
+        
+        if not items:
             return ErrorResponse(
                 message='Cart is empty',
                 status_code=400
@@ -317,7 +502,7 @@ class CartViewSet(CachedModelViewSet):
         
         # Check for expired reservations before proceeding
         expired_items = []
-        for item in cart.items.all():
+        for item in items:
             if item.reservation and item.reservation.is_expired():
                 expired_items.append({
                     'id': item.id,
@@ -331,62 +516,20 @@ class CartViewSet(CachedModelViewSet):
         if expired_items:
             return ErrorResponse(
                 message='Some cart items have expired reservations. Please refresh your cart and try again.',
-                data={'expired_items': expired_items},
+                errors={'expired_items': expired_items},
                 status_code=400
             )
         
         # Create bookings from cart items
-        from booking.models import Booking
         from booking.services import BookingService
         
-        bookings = []
-        for item in cart.items.all():
-            # Confirm reservation if it exists and is still active
-            if item.reservation:
-                try:
-                    BookingService.confirm_reservation(item.reservation)
-                except ValueError as e:
-                    return ErrorResponse(
-                        message=str(e),
-                        status_code=400
-                    )
-            
-            booking = Booking.objects.create(
-                workspace=item.space.branch.workspace,
-                space=item.space,
-                user=request.user,
-                booking_type=item.booking_type,
-                booking_date=item.booking_date,
-                start_time=item.start_time,
-                end_time=item.end_time,
-                check_in=item.check_in,
-                check_out=item.check_out,
-                number_of_guests=item.number_of_guests,
-                base_price=item.price,
-                discount_amount=item.discount_amount,
-                tax_amount=item.tax_amount,
-                total_price=item.price - item.discount_amount + item.tax_amount,
-                status='pending',  # Pending until payment
-                special_requests=item.special_requests
-            )
-            
-            # Publish booking created event
-            from core.services import EventBus, Event, EventTypes
-            event = Event(
-                event_type=EventTypes.BOOKING_CREATED,
-                data={
-                    'booking_id': str(booking.id),
-                    'user_id': str(request.user.id),
-                    'workspace_id': str(booking.workspace.id),
-                    'space_id': str(booking.space.id),
-                    'booking_type': booking.booking_type,
-                    'check_in': booking.check_in.isoformat(),
-                    'check_out': booking.check_out.isoformat(),
-                },
-                source_module='booking'
+        try:
+            bookings = BookingService.create_bookings_from_cart_items(items, request.user)
+        except ValueError as e:
+            return ErrorResponse(
+                message=str(e),
+                status_code=400
             )
-            EventBus.publish(event)
-            bookings.append(booking)
         
         # Create order from bookings
         from payment.services import PaymentService
@@ -397,18 +540,9 @@ class CartViewSet(CachedModelViewSet):
                 user=request.user,
                 notes=serializer.validated_data.get('notes', '')
             )
-            
-            # Mark all slots as booked for confirmed bookings
-            from workspace.models import SpaceCalendarSlot
-            for booking in bookings:
-                SpaceCalendarSlot.objects.filter(
-                    calendar__space=booking.space,
-                    date__gte=booking.check_in.date(),
-                    date__lte=booking.check_out.date(),
-                    status='reserved'
-                ).update(status='booked', booking=booking)
-            
         except ValueError as e:
+            # The bookings above were already written in this transaction
+            transaction.set_rollback(True)
             return ErrorResponse(
                 message=f'Failed to create order: {str(e)}',
                 status_code=400
@@ -416,7 +550,7 @@ class CartViewSet(CachedModelViewSet):
         
         # Clear cart
         cart.items.all().delete()
-        cart.calculate_totals()
+        cart.reset_totals()
         
         from booking.serializers.v1 import BookingListSerializer
         from payment.serializers.v1 import OrderListSerializer
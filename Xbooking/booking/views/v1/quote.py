@@ -0,0 +1,45 @@
+"""
+Quote Views V1
+"""
+from rest_framework.views import APIView
+from rest_framework.permissions import AllowAny
+from drf_spectacular.utils import extend_schema, OpenApiResponse
+
+from core.responses import SuccessResponse, ErrorResponse
+from core.middleware import query_budget
+from booking.serializers.v1 import QuoteRequestSerializer
+from booking.services import QuoteService
+
+
+@query_budget(6)
+class QuoteView(APIView):
+    """
+    Batch price and availability check.
+    Read-only: no reservation or cart item is created.
+    """
+    permission_classes = [AllowAny]
+    
+    @extend_schema(
+        request=QuoteRequestSerializer,
+        responses={
+            200: OpenApiResponse(description='One quote per requested item'),
+            400: OpenApiResponse(description='Validation error'),
+        },
+        description='Quote price and availability for many (space, date, time, type) candidates at once',
+        tags=['Booking']
+    )
+    def post(self, request):
+        """Quote candidate bookings"""
+        serializer = QuoteRequestSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return ErrorResponse(
+                message='Invalid quote request',
+                errors=serializer.errors,
+                status_code=400
+            )
+        
+        return SuccessResponse(
+            message='Quotes retrieved successfully',
+            data=QuoteService.quote(serializer.validated_data['items'])
+        )
@@ -0,0 +1,99 @@
+"""
+Booking Waitlist Views V1
+"""
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from drf_spectacular.utils import extend_schema, extend_schema_view
+from django.utils import timezone
+from datetime import datetime
+
+from core.responses import SuccessResponse, ErrorResponse
+from core.pagination import StandardResultsSetPagination
+from booking.models import WaitlistEntry, Space
+from booking.serializers.v1 import WaitlistEntrySerializer, JoinWaitlistSerializer
+
+
+@extend_schema_view(
+    list=extend_schema(description="List the user's waitlist entries"),
+    retrieve=extend_schema(description="Retrieve a waitlist entry"),
+    create=extend_schema(description="Join the waitlist for a taken time range", request=JoinWaitlistSerializer),
+    destroy=extend_schema(description="Leave the waitlist"),
+)
+class WaitlistViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet for the booking waitlist
+    
+    Not cached: entries change state in the background when a range is handed off.
+    """
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+    http_method_names = ['get', 'post', 'delete']
+    
+    def get_queryset(self):
+        return WaitlistEntry.objects.filter(
+            user=self.request.user
+        ).select_related('space', 'reservation').order_by('-created_at')
+    
+    def create(self, request):
+        """Join the waitlist"""
+        serializer = JoinWaitlistSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return ErrorResponse(
+                message='Invalid waitlist data',
+                errors=serializer.errors,
+                status_code=400
+            )
+        
+        data = serializer.validated_data
+        
+        try:
+            space = Space.objects.get(id=data['space_id'])
+        except Space.DoesNotExist:
+            return ErrorResponse(
+                message='Space not found',
+                status_code=404
+            )
+        
+        from booking.services import WaitlistService
+        
+        try:
+            entry = WaitlistService.join(
+                space=space,
+                user=request.user,
+                start=timezone.make_aware(datetime.combine(data['booking_date'], data['start_time'])),
+                end=timezone.make_aware(datetime.combine(data['booking_date'], data['end_time'])),
+                booking_type=data['booking_type'],
+                number_of_guests=data['number_of_guests']
+            )
+        except ValueError as e:
+            return ErrorResponse(
+                message=str(e),
+                status_code=400
+            )
+        
+        return SuccessResponse(
+            message='Added to waitlist',
+            data=WaitlistEntrySerializer(entry).data,
+            status_code=201
+        )
+    
+    def destroy(self, request, pk=None):
+        """Leave the waitlist"""
+        from booking.services import WaitlistService
+        
+        entry = self.get_object()
+        
+        try:
+            WaitlistService.leave(entry)
+        except ValueError as e:
+            return ErrorResponse(
+                message=str(e),
+                status_code=400
+            )
+        
+        return SuccessResponse(
+            message='Removed from waitlist',
+            data=WaitlistEntrySerializer(entry).data
+        )
@@ -11,6 +11,8 @@ from django.core.cache import cache
 from django.conf import settings
 import logging
 
+from core.instrumentation import tracks_io
+
 logger = logging.getLogger(__name__)
 
 
@@ -50,6 +52,7 @@ class CacheService:
         return f"{prefix}:{params_str}"
     
     @staticmethod
+    @tracks_io('redis')
     def get(key: str, default: Any = None) -> Any:
         """
         Get value from cache
@@ -73,6 +76,7 @@ class CacheService:
             return default
     
     @staticmethod
+    @tracks_io('redis')
     def set(key: str, value: Any, timeout: int = TIMEOUT_MEDIUM) -> bool:
         """
         Set value in cache
@@ -94,6 +98,29 @@ class CacheService:
             return False
     
     @staticmethod
+    @tracks_io('redis')
+    def add(key: str, value: Any, timeout: int = TIMEOUT_MEDIUM) -> bool:
+        """
+        Set value in cache only if the key does not exist yet (atomic)
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            timeout: Cache timeout in seconds
+            
+        Returns:
+            True if the key was added, False if it already existed or on error
+        """
+        try:
+            added = cache.add(key, value, timeout)
+            logger.debug(f"Cache ADD: {key} ({'added' if added else 'exists'})")
+            return added
+        except Exception as e:
+            logger.error(f"Cache ADD error for {key}: {str(e)}")
+            return False
+    
+    @staticmethod
+    @tracks_io('redis')
     def delete(key: str) -> bool:
         """
         Delete value from cache
@@ -113,6 +140,27 @@ class CacheService:
             return False
     
     @staticmethod
+    @tracks_io('redis')
+    def delete_many(keys: list) -> bool:
+        """
+        Delete several keys in one round trip
+        
+        Args:
+            keys: Cache keys
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            cache.delete_many(keys)
+            logger.debug(f"Cache DELETE MANY: {len(keys)} keys")
+            return True
+        except Exception as e:
+            logger.error(f"Cache DELETE MANY error for {len(keys)} keys: {str(e)}")
+            return False
+    
+    @staticmethod
+    @tracks_io('redis')
     def delete_pattern(pattern: str) -> bool:
         """
         Delete all keys matching pattern
@@ -0,0 +1,245 @@
+"""
+Shared outbound HTTP client for Xbooking
+Pooled keep-alive sessions, retries with jittered backoff, a circuit breaker
+and latency metrics for every external provider.
+
+Usage:
+    from core.http import get_client
+
+    http = get_client('paystack')
+    response = http.get(url, headers=headers, timeout=30)
+
+Responses and exceptions are plain `requests` ones, so existing handling of
+`requests.exceptions.RequestException` keeps working (an open circuit raises
+CircuitOpenError, a ConnectionError).
+
+Settings:
+    HTTP_CLIENT_POOL_MAXSIZE: Keep-alive connections kept per host (default 20)
+    HTTP_CLIENT_RETRIES: Retries after the first attempt (default 2)
+    HTTP_CLIENT_BACKOFF: Base of the exponential backoff in seconds (default 0.2)
+    HTTP_CLIENT_BREAKER_THRESHOLD: Consecutive failures that open a provider's circuit (default 5)
+    HTTP_CLIENT_BREAKER_RESET: Seconds an open circuit waits before a trial call (default 30)
+    HTTP_CLIENT_BASE_URLS: {provider: base URL} overrides, e.g. a local stub server in tests
+"""
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from core.instrumentation import registry, track_io
+
+logger = logging.getLogger(__name__)
+
+
+# Retried for idempotent methods: the provider is overloaded or restarting
+RETRY_STATUSES = (429, 502, 503, 504)
+# Retried for any method: the provider turned the request away without handling it
+REJECTED_STATUSES = (429, 503)
+# Safe to send twice; other methods are only retried when the connection never opened
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+# Upper bound of one backoff sleep
+MAX_BACKOFF = 5.0
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a provider whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed: calls pass; `threshold` failures in a row open the circuit.
+    open: calls fail fast until `reset_timeout` has passed.
+    half-open: one trial call is let through; success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class HttpClient:
+    """HTTP client for one provider; one pooled keep-alive Session per host"""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.breaker = CircuitBreaker(
+            threshold=getattr(settings, 'HTTP_CLIENT_BREAKER_THRESHOLD', 5),
+            reset_timeout=getattr(settings, 'HTTP_CLIENT_BREAKER_RESET', 30)
+        )
+        self._sessions: Dict[Tuple[str, str], requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, url: str) -> requests.Session:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        session = self._sessions.get(key)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(key)
+                if session is None:
+                    pool_size = getattr(settings, 'HTTP_CLIENT_POOL_MAXSIZE', 20)
+                    session = requests.Session()
+                    # Retries are done here (with jitter and breaker bookkeeping), not by urllib3
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+                    session.mount(f'{parts.scheme}://', adapter)
+                    self._sessions[key] = session
+        return session
+
+    def _rewrite(self, url: str) -> str:
+        base_url = getattr(settings, 'HTTP_CLIENT_BASE_URLS', {}).get(self.provider)
+        if not base_url:
+            return url
+        base, parts = urlsplit(base_url), urlsplit(url)
+        return urlunsplit((base.scheme, base.netloc, base.path.rstrip('/') + parts.path, parts.query, parts.fragment))
+
+    def request(self, method: str, url: str, timeout: float = 30, retries: Optional[int] = None, **kwargs):
+        """
+        Send a request through the provider's pooled session.
+
+        Idempotent methods are retried on connection errors, timeouts and
+        429/502/503/504; other methods only when the connection could not be
+        opened or the provider answered 429/503, so a payment is never
+        submitted twice.
+        """
+        method = method.upper()
+        url = self._rewrite(url)
+        retries = getattr(settings, 'HTTP_CLIENT_RETRIES', 2) if retries is None else retries
+        session = self.session_for(url)
+
+        allow_redirects = kwargs.pop('allow_redirects', True)
+        stream, verify, cert = kwargs.pop('stream', None), kwargs.pop('verify', None), kwargs.pop('cert', None)
+        proxies = kwargs.pop('proxies', None) or {}
+
+        # Prepared once so file streams are not consumed by the first attempt
+        prepared = session.prepare_request(requests.Request(method, url, **kwargs))
+        send_kwargs = session.merge_environment_settings(prepared.url, proxies, stream, verify, cert)
+        send_kwargs['allow_redirects'] = allow_redirects
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                registry.increment('http_short_circuits', self.provider)
+                raise CircuitOpenError(f"{self.provider} circuit is open, not calling {prepared.url}")
+
+            started = time.perf_counter()
+            try:
+                with track_io('http'):
+                    response = session.send(prepared, timeout=timeout, **send_kwargs)
+            except requests.exceptions.RequestException as e:
+                registry.observe('http_request', self.provider, time.perf_counter() - started)
+                registry.increment('http_errors', self.provider)
+                self.breaker.record_failure()
+                retryable = method in IDEMPOTENT_METHODS or isinstance(e, requests.exceptions.ConnectTimeout)
+                if attempt >= retries or not retryable:
+                    raise
+                logger.warning(f"{self.provider} {method} {prepared.url} failed ({str(e)}), retrying")
+            else:
+                registry.observe('http_request', self.provider, time.perf_counter() - started)
+                if response.status_code < 500:
+                    self.breaker.record_success()
+                else:
+                    registry.increment('http_errors', self.provider)
+                    self.breaker.record_failure()
+                if method in IDEMPOTENT_METHODS:
+                    retryable = response.status_code in RETRY_STATUSES
+                else:
+                    retryable = response.status_code in REJECTED_STATUSES
+                if attempt >= retries or not retryable:
+                    return response
+                logger.warning(f"{self.provider} {method} {prepared.url} returned {response.status_code}, retrying")
+
+            attempt += 1
+            registry.increment('http_retries', self.provider)
+            self._sleep(attempt)
+
+    def _sleep(self, attempt: int) -> None:
+        # Full jitter: spreads out retries of many workers hitting the same outage
+        base = getattr(settings, 'HTTP_CLIENT_BACKOFF', 0.2)
+        time.sleep(random.uniform(0, min(MAX_BACKOFF, base * 2 ** attempt)))
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_clients: Dict[str, HttpClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(provider: str) -> HttpClient:
+    """Process-wide client for a provider (e.g. 'paystack', 'mailjet')"""
+    client = _clients.get(provider)
+    if client is None:
+        with _clients_lock:
+            client = _clients.setdefault(provider, HttpClient(provider))
+    return client
+
+
+def reset_clients() -> None:
+    """
+    Close every pooled connection and forget breaker state.
+
+    Called in each Celery prefork child (worker_process_init) and by tests.
+    """
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -0,0 +1,290 @@
+"""
+Hot-path instrumentation for Xbooking
+Named spans that record wall time, SQL queries, Redis, event-publish and
+outbound HTTP time, aggregated into per-process histograms.
+
+Usage:
+    from core.instrumentation import span, timed
+
+    with span('cart.add_item'):
+        ...
+
+    @timed('payment.complete_payment')
+    def complete_payment(...):
+        ...
+
+Histograms are exported in Prometheus text format by `render_prometheus()`
+(served at /metrics/) and, when `INSTRUMENTATION_LOG_SPANS` is on, every
+finished span is also written to the `xbooking.spans` logger.
+"""
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, List, Tuple
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+span_logger = logging.getLogger('xbooking.spans')
+
+
+# Upper bounds of the histogram buckets
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# (metric name, help text, buckets) for every value a span records
+SPAN_METRICS = {
+    'duration': ('xbooking_stage_duration_seconds', 'Wall time per stage', SECONDS_BUCKETS),
+    'db': ('xbooking_stage_db_seconds', 'Time spent in SQL per stage', SECONDS_BUCKETS),
+    'queries': ('xbooking_stage_queries', 'SQL queries per stage', QUERY_BUCKETS),
+    'redis': ('xbooking_stage_redis_seconds', 'Time spent in Redis/cache calls per stage', SECONDS_BUCKETS),
+    'event': ('xbooking_stage_event_seconds', 'Time spent publishing events per stage', SECONDS_BUCKETS),
+    'http': ('xbooking_stage_http_seconds', 'Time spent in outbound HTTP calls per stage', SECONDS_BUCKETS),
+}
+
+# Outbound HTTP (core.http), labelled by provider instead of stage
+PROVIDER_METRICS = {
+    'http_request': ('xbooking_http_request_seconds', 'Outbound HTTP latency per provider', SECONDS_BUCKETS),
+}
+PROVIDER_COUNTERS = {
+    'http_errors': ('xbooking_http_errors_total', 'Failed outbound HTTP attempts per provider'),
+    'http_retries': ('xbooking_http_retries_total', 'Retried outbound HTTP attempts per provider'),
+    'http_short_circuits': ('xbooking_http_short_circuits_total', 'Calls refused by an open circuit breaker'),
+}
+
+HISTOGRAMS = {**SPAN_METRICS, **PROVIDER_METRICS}
+
+
+def _label(metric: str) -> str:
+    return 'provider' if metric in PROVIDER_METRICS or metric in PROVIDER_COUNTERS else 'stage'
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets, safe to update from many threads"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.total, self.count
+
+
+class MetricsRegistry:
+    """Per-process histograms and counters keyed by (metric, stage or provider)"""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._counters: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, metric: str, stage: str, value: float) -> None:
+        key = (metric, stage)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(HISTOGRAMS[metric][2]))
+        histogram.observe(value)
+
+    def increment(self, counter: str, label: str, amount: int = 1) -> None:
+        key = (counter, label)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def counter(self, counter: str, label: str) -> int:
+        return self._counters.get((counter, label), 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render_prometheus(self) -> str:
+        """Render every histogram and counter in the Prometheus text exposition format"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        lines = []
+        for metric, (name, help_text, _) in HISTOGRAMS.items():
+            series = [(stage, histogram) for (m, stage), histogram in items if m == metric]
+            if not series:
+                continue
+            label = _label(metric)
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for stage, histogram in series:
+                counts, total, count = histogram.snapshot()
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{{label}="{stage}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{label}="{stage}",le="+Inf"}} {count}')
+                lines.append(f'{name}_sum{{{label}="{stage}"}} {total:.6f}')
+                lines.append(f'{name}_count{{{label}="{stage}"}} {count}')
+        for counter, (name, help_text) in PROVIDER_COUNTERS.items():
+            series = [(label_value, value) for (c, label_value), value in counters if c == counter]
+            if not series:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for label_value, value in series:
+                lines.append(f'{name}{{{_label(counter)}="{label_value}"}} {value}')
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+registry = MetricsRegistry()
+
+
+class Span:
+    """Costs accumulated by one named stage (including its nested stages)"""
+
+    __slots__ = ('name', 'started', 'duration', 'queries', 'db', 'redis', 'event', 'http')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.queries = 0
+        self.db = 0.0
+        self.redis = 0.0
+        self.event = 0.0
+        self.http = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'stage': self.name,
+            'duration': round(self.duration, 6),
+            'queries': self.queries,
+            'db': round(self.db, 6),
+            'redis': round(self.redis, 6),
+            'event': round(self.event, 6),
+            'http': round(self.http, 6),
+        }
+
+
+_active_spans: ContextVar[Tuple[Span, ...]] = ContextVar('xbooking_active_spans', default=())
+
+
+def is_enabled() -> bool:
+    return getattr(settings, 'INSTRUMENTATION_ENABLED', True)
+
+
+def _count_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        for active in _active_spans.get():
+            active.queries += 1
+            active.db += elapsed
+
+
+@contextmanager
+def span(name: str):
+    """
+    Record the cost of a named stage.
+
+    Spans nest: an inner stage's queries and I/O also count towards every
+    enclosing stage. The query hook is installed once, by the outermost span,
+    so nested spans add no extra wrappers.
+    """
+    if not is_enabled():
+        yield None
+        return
+
+    current = Span(name)
+    parents = _active_spans.get()
+    token = _active_spans.set(parents + (current,))
+
+    with ExitStack() as stack:
+        if not parents:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_count_query))
+        try:
+            yield current
+        finally:
+            current.duration = time.perf_counter() - current.started
+            _active_spans.reset(token)
+            _finish(current)
+
+
+def _finish(current: Span) -> None:
+    for metric in SPAN_METRICS:
+        registry.observe(metric, current.name, getattr(current, metric))
+    if getattr(settings, 'INSTRUMENTATION_LOG_SPANS', False):
+        span_logger.info(
+            'stage=%s duration=%.6f queries=%d db=%.6f redis=%.6f event=%.6f http=%.6f',
+            current.name, current.duration, current.queries, current.db, current.redis, current.event, current.http,
+            extra={'span': current.as_dict()}
+        )
+
+
+def timed(name: str):
+    """Decorator form of `span`"""
+    def decorator(func: Callable):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def track_io(kind: str):
+    """
+    Charge the time of a Redis ('redis'), event-publish ('event') or outbound
+    HTTP ('http') call to the active spans. Costs one ContextVar lookup when no span is active.
+    """
+    if not _active_spans.get():
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        for active in _active_spans.get():
+            setattr(active, kind, getattr(active, kind) + elapsed)
+
+
+def tracks_io(kind: str):
+    """Decorator form of `track_io`"""
+    def decorator(func: Callable):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with track_io(kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_spans() -> List[Span]:
+    """Active spans, outermost first"""
+    return list(_active_spans.get())
+
+
+def render_prometheus() -> str:
+    return registry.render_prometheus()
@@ -1,13 +1,163 @@
 """
 Custom middleware to disable CSRF protection for API endpoints
+and to enforce per-request SQL query budgets
 """
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
 from django.utils.deprecation import MiddlewareMixin
 
+logger = logging.getLogger(__name__)
+
 
 class DisableCSRFForAPIMiddleware(MiddlewareMixin):
     """Disable CSRF for API endpoints that use token authentication"""
-    
+
     def process_request(self, request):
         """Mark API requests as CSRF exempt"""
         if request.path.startswith('/api/'):
             setattr(request, '_dont_enforce_csrf_checks', True)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a request runs more queries than its view's budget allows"""
+
+
+# Collapses the placeholder lists of IN (...) and bulk VALUES so their size does not change the shape
+_PLACEHOLDER_LIST = re.compile(r'%s(?:\s*,\s*%s)+')
+_VALUES_LIST = re.compile(r'(\(%s(?:, %s)*\))(?:\s*,\s*\(%s(?:, %s)*\))+')
+
+
+def query_shape(sql):
+    """Normalise SQL so queries that differ only in parameter count share a shape"""
+    sql = _VALUES_LIST.sub(r'\1', sql)
+    return _PLACEHOLDER_LIST.sub('%s...', sql)
+
+
+def query_budget(budget):
+    """
+    Set the query budget of a view: a function, a class (e.g. a ViewSet)
+    or a ViewSet action, which takes precedence over its class
+
+    Usage:
+        @query_budget(6)
+        class CartViewSet(...):
+
+            @query_budget(16)
+            @action(detail=False, methods=['post'])
+            def add_item(self, request):
+    """
+    def decorator(view):
+        view.query_budget = budget
+        return view
+    return decorator
+
+
+class QueryCounter:
+    """
+    Counts the queries run on every database connection inside a `with` block
+    and groups them by shape; repeated shapes are the usual N+1 signature.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        return False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[query_shape(sql)] += 1
+
+    def duplicates(self, threshold=2):
+        """Shapes run at least `threshold` times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def duplicate_count(self, threshold=2):
+        """Executions beyond the first of every shape that repeats `threshold` times or more"""
+        return sum(count - 1 for _, count in self.duplicates(threshold))
+
+
+class QueryBudgetMiddleware:
+    """
+    Count the SQL queries of every request and flag requests that exceed
+    their view's budget or repeat one query shape many times (N+1).
+
+    Settings:
+        QUERY_BUDGET_DEFAULT: Budget for views without `query_budget` (default 50)
+        QUERY_BUDGET_DUPLICATE_THRESHOLD: Repeats of one shape reported as N+1 (default 5)
+        QUERY_BUDGET_ACTION: 'log' (default) or 'raise' QueryBudgetExceeded
+        QUERY_BUDGET_HEADERS: Add X-Query-* response headers (default: DEBUG)
+
+    A view sets its own budget with the `query_budget` decorator or a
+    `query_budget` class attribute; a ViewSet action decorated with
+    `query_budget` overrides its class.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+
+        budget = getattr(request, '_query_budget', None)
+        if budget is None:
+            budget = getattr(settings, 'QUERY_BUDGET_DEFAULT', 50)
+        threshold = getattr(settings, 'QUERY_BUDGET_DUPLICATE_THRESHOLD', 5)
+        duplicates = counter.duplicates(threshold)
+
+        if getattr(settings, 'QUERY_BUDGET_HEADERS', settings.DEBUG):
+            response['X-Query-Count'] = str(counter.count)
+            response['X-Query-Budget'] = str(budget)
+            response['X-Query-Duplicates'] = str(counter.duplicate_count(threshold))
+            response['X-Query-Time-Ms'] = f'{counter.duration * 1000:.1f}'
+
+        if counter.count > budget or duplicates:
+            self._report(request, counter, budget, duplicates)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # DRF's as_view() keeps the class on the returned function
+        view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        # ViewSets map the HTTP method to an action whose own budget wins over the class one
+        action = getattr(view_func, 'actions', {}).get(request.method.lower())
+        candidates = (view_func, getattr(view_class, action, None) if action else None, view_class)
+        request._query_budget = next(
+            (budget for budget in (getattr(c, 'query_budget', None) for c in candidates) if budget is not None),
+            None
+        )
+        request._query_view = getattr(view_class, '__name__', None) or getattr(view_func, '__name__', 'view')
+        return None
+
+    def _report(self, request, counter, budget, duplicates):
+        view = getattr(request, '_query_view', request.path)
+        message = f"{request.method} {request.path} ({view}) ran {counter.count} queries (budget {budget})"
+        if duplicates:
+            shape, count = duplicates[0]
+            message += f"; possible N+1: {count}x {shape[:200]}"
+
+        if getattr(settings, 'QUERY_BUDGET_ACTION', 'log') == 'raise' and counter.count > budget:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -201,6 +201,19 @@ class NotificationService:
                 data=data
             )
         
+        elif event.event_type == EventTypes.BOOKING_BATCH_CREATED:
+            count = data.get('booking_count', 0)
+            NotificationService.create_notification(
+                user_id=user_id,
+                notification_type='booking_created',
+                title='Booking Created',
+                message=(
+                    'Your booking has been created successfully.' if count == 1
+                    else f'Your {count} bookings have been created successfully.'
+                ),
+                data=data
+            )
+        
         elif event.event_type == EventTypes.BOOKING_CONFIRMED:
             NotificationService.create_notification(
                 user_id=user_id,
@@ -335,6 +348,15 @@ class NotificationService:
                 message='Your reservation has been cancelled.',
                 data=data
             )
+        
+        elif event.event_type == EventTypes.WAITLIST_SLOT_OFFERED:
+            NotificationService.create_notification(
+                user_id=user_id,
+                notification_type='waitlist_slot_offered',
+                title='A Spot Opened Up',
+                message=f'"{data.get("space_name")}" is now available for the time you waited for. It is held in your cart for {data.get("expires_in_minutes")} minutes.',
+                data=data
+            )
     
     @staticmethod
     def handle_bank_events(event: Event):
@@ -451,6 +473,7 @@ class NotificationService:
         
         # Subscribe to booking events
         EventBus.subscribe(EventTypes.BOOKING_CREATED, cls.handle_booking_events)
+        EventBus.subscribe(EventTypes.BOOKING_BATCH_CREATED, cls.handle_booking_events)
         EventBus.subscribe(EventTypes.BOOKING_CONFIRMED, cls.handle_booking_events)
         EventBus.subscribe(EventTypes.BOOKING_CANCELLED, cls.handle_booking_events)
         
@@ -460,6 +483,7 @@ class NotificationService:
         EventBus.subscribe(EventTypes.RESERVATION_EXPIRING, cls.handle_reservation_events)
         EventBus.subscribe(EventTypes.RESERVATION_EXPIRED, cls.handle_reservation_events)
         EventBus.subscribe(EventTypes.RESERVATION_CANCELLED, cls.handle_reservation_events)
+        EventBus.subscribe(EventTypes.WAITLIST_SLOT_OFFERED, cls.handle_reservation_events)
         
         # Subscribe to payment events
         EventBus.subscribe(EventTypes.ORDER_CREATED, cls.handle_payment_events)
@@ -2,25 +2,169 @@
 Pagination utilities for consistent API responses
 """
 
+import base64
+import hashlib
+import json
+from functools import partial
+from math import ceil
+
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from collections import OrderedDict
 
+from core.cache import CacheService
+
+
+def estimated_count(queryset, threshold):
+    """
+    Planner row estimate for a queryset (PostgreSQL), exact COUNT(*) below threshold
+    or on other databases
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        if estimate >= threshold:
+            return estimate
+    return queryset.count()
+
+
+def cached_count(queryset, timeout):
+    """Exact COUNT(*) cached per query signature (same SQL and parameters)"""
+    sql, params = queryset.order_by().query.sql_with_params()
+    signature = hashlib.md5(repr((queryset.db, sql, params)).encode('utf-8')).hexdigest()
+    key = f'pagination:count:{queryset.model._meta.label_lower}:{signature}'
+    count = CacheService.get(key)
+    if count is None:
+        count = queryset.count()
+        CacheService.set(key, count, timeout)
+    return count
+
+
+class ProbePage(Page):
+    """Page whose has_next comes from probing one row past it"""
+
+    def __init__(self, object_list, number, paginator, more):
+        super().__init__(object_list, number, paginator)
+        self.more = more
+
+    def has_next(self):
+        return self.more
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
+class ProbePaginator(Paginator):
+    """
+    Paginator that fetches per_page + 1 rows instead of validating against a count
+
+    The count, when any, comes from count_func and may be approximate; it never
+    truncates a page or hides the next one. num_pages is never less than the
+    pages known to exist.
+    """
+
+    def __init__(self, object_list, per_page, count_func=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_func = count_func
+        self.pages_seen = 1
+
+    @property
+    def count(self):
+        if self.count_func is None:
+            return None
+        if not hasattr(self, '_count'):
+            self._count = self.count_func()
+        return self._count
+
+    @property
+    def num_pages(self):
+        if self.count is None:
+            return self.pages_seen
+        return max(ceil(max(1, self.count - self.orphans) / self.per_page), self.pages_seen)
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        more = len(rows) > self.per_page
+        self.pages_seen = max(self.pages_seen, number + more)
+        return ProbePage(rows[:self.per_page], number, self, more)
+
 
 class StandardResultsSetPagination(PageNumberPagination):
     """
     Standard pagination for most list endpoints
     Default: 20 items per page
+
+    Count strategies (opt-in per viewset with `pagination_count_strategy`):
+        exact: COUNT(*) on every request (default)
+        estimate: PostgreSQL planner estimate once it reaches
+            `pagination_estimate_threshold` rows, exact below
+        cached: exact count cached per filter signature for
+            `pagination_count_timeout` seconds
+        none: no count; count and total_pages are null
+    Every strategy but exact pages by probing one extra row, so next links
+    stay correct whatever the count says.
     """
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
+    count_strategy = 'exact'
+    estimate_threshold = 10000
+    count_timeout = CacheService.TIMEOUT_SHORT
+    COUNT_STRATEGIES = ('exact', 'estimate', 'cached', 'none')
+    
+    def get_count_strategy(self, view):
+        strategy = getattr(view, 'pagination_count_strategy', None) or self.count_strategy
+        if strategy not in self.COUNT_STRATEGIES:
+            raise ValueError(f"Unknown pagination count strategy: {strategy}")
+        return strategy
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        strategy = self.get_count_strategy(view)
+        if strategy == 'estimate':
+            threshold = getattr(view, 'pagination_estimate_threshold', self.estimate_threshold)
+            count_func = partial(estimated_count, queryset, threshold)
+        elif strategy == 'cached':
+            timeout = getattr(view, 'pagination_count_timeout', self.count_timeout)
+            count_func = partial(cached_count, queryset, timeout)
+        else:
+            count_func = None
+        if strategy != 'exact':
+            self.django_paginator_class = partial(ProbePaginator, count_func=count_func)
+        return super().paginate_queryset(queryset, request, view)
     
     def get_paginated_response(self, data):
+        count = self.page.paginator.count
         return Response(OrderedDict([
             ('success', True),
-            ('count', self.page.paginator.count),
-            ('total_pages', self.page.paginator.num_pages),
+            ('count', count),
+            ('total_pages', self.page.paginator.num_pages if count is not None else None),
             ('current_page', self.page.number),
             ('page_size', self.get_page_size(self.request)),
             ('next', self.get_next_link()),
@@ -71,3 +215,121 @@ class SmallResultsSetPagination(PageNumberPagination):
             ('previous', self.get_previous_link()),
             ('results', data)
         ]))
+
+
+class CursorResultsSetPagination(StandardResultsSetPagination):
+    """
+    Keyset pagination for append-only feeds (transactions, notifications, check-ins)
+
+    Pages are positioned by (ordering field, id) of the last row seen instead
+    of an OFFSET, and no COUNT(*) is run, so deep pages of long histories
+    cost the same as the first one. The ordering field is the queryset's
+    first ordering (default: -created_at); id breaks ties.
+
+    The envelope keeps the StandardResultsSetPagination keys; count,
+    total_pages and current_page are null and next/previous carry a cursor.
+    Requests with ?page= and no cursor are still paginated by page number.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    ordering = '-created_at'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.page_query_param) and not request.query_params.get(self.cursor_query_param):
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.page = None
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        ordering = self.get_ordering(queryset)
+        descending = ordering.startswith('-')
+        self.field_name = ordering.lstrip('-')
+        self.model = queryset.model
+        prefix = '-' if descending else ''
+
+        position = self.decode_cursor(request)
+        backwards = bool(position and position['previous'])
+        if position:
+            # Rows strictly after the cursor in the direction of travel
+            after = 'gt' if descending == backwards else 'lt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field_name}__{after}': position['value']}) |
+                Q(**{self.field_name: position['value'], f'pk__{after}': position['pk']})
+            )
+        if backwards:
+            prefix = '' if descending else '-'
+        queryset = queryset.order_by(f'{prefix}{self.field_name}', f'{prefix}pk')
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if backwards:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.results = results
+        return results
+
+    def get_ordering(self, queryset):
+        """First ordering of the queryset when it is a plain field, else the default"""
+        orderings = list(queryset.query.order_by or queryset.model._meta.ordering or [])
+        ordering = orderings[0] if orderings else self.ordering
+        if not isinstance(ordering, str) or '__' in ordering or ordering.lstrip('-') in ('?', 'pk', 'id'):
+            return self.ordering
+        return ordering
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            return {
+                'value': self.model._meta.get_field(self.field_name).to_python(data['v']),
+                'pk': self.model._meta.pk.to_python(data['pk']),
+                'previous': bool(data.get('p')),
+            }
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance, previous=False):
+        value = getattr(instance, self.field_name)
+        data = {'v': value.isoformat() if hasattr(value, 'isoformat') else value, 'pk': str(instance.pk)}
+        if previous:
+            data['p'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii')
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if self.page is not None:
+            return super().get_next_link()
+        if not self.has_next or not self.results:
+            return None
+        return self.encode_cursor(self.results[-1])
+
+    def get_previous_link(self):
+        if self.page is not None:
+            return super().get_previous_link()
+        if not self.has_previous or not self.results:
+            return None
+        return self.encode_cursor(self.results[0], previous=True)
+
+    def get_paginated_response(self, data):
+        if self.page is not None:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('success', True),
+            ('count', None),
+            ('total_pages', None),
+            ('current_page', None),
+            ('page_size', self.page_size),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
@@ -11,6 +11,8 @@ from django.core.cache import cache
 from django.conf import settings
 import threading
 
+from core.instrumentation import tracks_io
+
 logger = logging.getLogger(__name__)
 
 
@@ -77,6 +79,7 @@ class EventBus:
         return cls._redis_client
     
     @classmethod
+    @tracks_io('event')
     def publish(cls, event: Event):
         """
         Publish an event to the event bus (both Redis and local)
@@ -210,6 +213,7 @@ class EventTypes:
     
     # Booking events
     BOOKING_CREATED = "booking.created"
+    BOOKING_BATCH_CREATED = "booking.batch_created"
     BOOKING_CONFIRMED = "booking.confirmed"
     BOOKING_CANCELLED = "booking.cancelled"
     BOOKING_COMPLETED = "booking.completed"
@@ -219,10 +223,14 @@ class EventTypes:
     # Reservation events
     RESERVATION_CREATED = "reservation.created"
     RESERVATION_CONFIRMED = "reservation.confirmed"
+    RESERVATION_BATCH_CONFIRMED = "reservation.batch_confirmed"
     RESERVATION_CANCELLED = "reservation.cancelled"
     RESERVATION_EXPIRED = "reservation.expired"
     RESERVATION_EXPIRING = "reservation.expiring"
     
+    # Waitlist events
+    WAITLIST_SLOT_OFFERED = "waitlist.slot_offered"
+    
     # Bank/Wallet events
     WALLET_CREATED = "wallet.created"
     WALLET_CREDITED = "wallet.credited"
@@ -0,0 +1,45 @@
+"""
+Shared test fixtures: the cache settings every suite runs under and the
+user, workspace, branch and space rows most test modules start from.
+"""
+from django.utils.text import slugify
+
+from user.models import User
+from workspace.models import Workspace, Branch, Space
+
+
+# Tests do not need Redis; the booking and payment paths only rely on add/get/set/delete
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def create_user(email, full_name=None, **fields):
+    """An active user"""
+    fields.setdefault('is_active', True)
+    return User.objects.create(email=email, full_name=full_name or email, **fields)
+
+
+def create_workspace(admin, name='Test Workspace', **fields):
+    """A workspace; its (unique) email is derived from the name"""
+    fields.setdefault('email', f"{slugify(name)}@example.com")
+    fields.setdefault('city', 'City')
+    fields.setdefault('country', 'CO')
+    return Workspace.objects.create(name=name, admin=admin, **fields)
+
+
+def create_branch(workspace, name='Branch', **fields):
+    """A branch of `workspace`"""
+    fields.setdefault('email', 'b@example.com')
+    fields.setdefault('address', 'Addr')
+    fields.setdefault('city', 'City')
+    fields.setdefault('country', 'CO')
+    return Branch.objects.create(workspace=workspace, name=name, **fields)
+
+
+def create_space(branch, name='Space', **fields):
+    """A bookable meeting room of `branch` unless overridden"""
+    fields.setdefault('space_type', 'meeting_room')
+    fields.setdefault('capacity', 2)
+    fields.setdefault('price_per_hour', 10)
+    fields.setdefault('daily_rate', 50)
+    fields.setdefault('monthly_rate', 1000)
+    return Space.objects.create(branch=branch, name=name, **fields)
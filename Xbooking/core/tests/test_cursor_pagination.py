@@ -0,0 +1,90 @@
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlparse
+
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+
+from core.pagination import CursorResultsSetPagination
+from notifications.models import Notification
+from user.models import User
+
+
+class TestCursorResultsSetPagination(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create(full_name="Reader", email="reader@example.com", is_active=True)
+        Notification.objects.bulk_create([
+            Notification(user=self.user, notification_type='order_created', channel='in_app', title=f"N{i:02d}", message='m')
+            for i in range(11)
+        ])
+        # Spread timestamps but leave runs of identical created_at to exercise the id tie-breaker
+        now = timezone.now()
+        for i, pk in enumerate(Notification.objects.order_by('title').values_list('pk', flat=True)):
+            Notification.objects.filter(pk=pk).update(created_at=now - timedelta(minutes=i // 3))
+
+    def paginate(self, queryset, url='/notifications/', **params):
+        request = Request(self.factory.get(url, params))
+        paginator = CursorResultsSetPagination()
+        page = paginator.paginate_queryset(queryset, request)
+        return paginator, paginator.get_paginated_response([item.pk for item in page]).data
+
+    def follow(self, queryset, link):
+        parsed = urlparse(link)
+        return self.paginate(queryset, parsed.path, **dict(parse_qsl(parsed.query)))
+
+    def test_walks_every_row_once_in_keyset_order_without_counting(self):
+        queryset = Notification.objects.filter(user=self.user).order_by('-created_at')
+        expected = list(queryset.order_by('-created_at', '-pk').values_list('pk', flat=True))
+
+        seen, pages = [], []
+        with CaptureQueriesContext(connection) as queries:
+            _, data = self.paginate(queryset, page_size=4)
+            while True:
+                pages.append(data)
+                seen.extend(data['results'])
+                if not data['next']:
+                    break
+                _, data = self.follow(queryset, data['next'])
+
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(queries), len(pages))
+        self.assertFalse(any('COUNT(' in query['sql'].upper() for query in queries.captured_queries))
+        self.assertEqual(
+            list(pages[0]),
+            ['success', 'count', 'total_pages', 'current_page', 'page_size', 'next', 'previous', 'results']
+        )
+        self.assertIsNone(pages[0]['previous'])
+        self.assertIsNone(pages[0]['count'])
+
+        # previous links walk back over the same pages
+        _, back = self.follow(queryset, pages[-1]['previous'])
+        self.assertEqual(back['results'], pages[-2]['results'])
+        _, back = self.follow(queryset, back['previous'])
+        self.assertEqual(back['results'], pages[-3]['results'])
+        self.assertIsNotNone(back['next'])
+
+    def test_follows_the_queryset_ordering(self):
+        queryset = Notification.objects.filter(user=self.user).order_by('title')
+        _, data = self.paginate(queryset, page_size=5)
+        _, data = self.follow(queryset, data['next'])
+
+        self.assertEqual(
+            data['results'],
+            list(queryset.values_list('pk', flat=True)[5:10])
+        )
+
+    def test_page_number_requests_keep_the_page_envelope(self):
+        queryset = Notification.objects.filter(user=self.user).order_by('-created_at')
+        _, data = self.paginate(queryset, page=2, page_size=4)
+
+        self.assertEqual((data['count'], data['total_pages'], data['current_page']), (11, 3, 2))
+        self.assertIn('page=3', data['next'])
+
+    def test_invalid_cursor_is_not_found(self):
+        queryset = Notification.objects.filter(user=self.user)
+        with self.assertRaises(NotFound):
+            self.paginate(queryset, cursor='not-a-cursor')
@@ -0,0 +1,103 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from celery.signals import worker_process_init
+from django.test import SimpleTestCase, override_settings
+
+from core.http import CircuitOpenError, get_client, reset_clients
+from core.instrumentation import registry
+from payment.gateways import PaystackGateway
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers with the queued (status, body) replies, then 200s; records connections"""
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        self.server.calls.append((self.command, self.path, self.client_address))
+        status, body = self.server.replies.pop(0) if self.server.replies else (200, {})
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    HTTP_CLIENT_BACKOFF=0, HTTP_CLIENT_RETRIES=2, HTTP_CLIENT_BREAKER_THRESHOLD=3
+)
+class TestHttpClient(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.calls, self.server.replies = [], []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        base_url = f'http://127.0.0.1:{self.server.server_port}'
+        overrides = override_settings(HTTP_CLIENT_BASE_URLS={'paystack': base_url, 'stub': base_url})
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        reset_clients()
+        self.addCleanup(reset_clients)
+        registry.reset()
+
+    def test_gateway_calls_reuse_one_keep_alive_connection(self):
+        self.server.replies = [
+            (200, {'status': True, 'data': {
+                'status': 'success', 'amount': 5000, 'reference': f'REF-{i}', 'customer': {'email': 'a@example.com'}
+            }})
+            for i in range(3)
+        ]
+        gateway = PaystackGateway()
+        results = [gateway.verify_transaction(f'REF-{i}') for i in range(3)]
+
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertEqual([path for _, path, _ in self.server.calls], [f'/transaction/verify/REF-{i}' for i in range(3)])
+        self.assertEqual(len({address for _, _, address in self.server.calls}), 1)
+        self.assertIn('xbooking_http_request_seconds_count{provider="paystack"} 3', registry.render_prometheus())
+
+    def test_idempotent_calls_retry_but_posts_do_not_resend_after_gateway_errors(self):
+        http = get_client('stub')
+        self.server.replies = [(503, {}), (502, {}), (200, {'ok': True})]
+        self.assertEqual(http.get('https://api.example.com/ping').json(), {'ok': True})
+        self.assertEqual(registry.counter('http_retries', 'stub'), 2)
+
+        # 502 may mean the provider acted on it: a payment POST is not sent twice
+        self.server.calls.clear()
+        self.server.replies = [(502, {})]
+        self.assertEqual(http.post('https://api.example.com/transfer', json={}).status_code, 502)
+        self.assertEqual(len(self.server.calls), 1)
+
+    def test_circuit_opens_after_repeated_failures(self):
+        http = get_client('stub')
+        self.server.replies = [(500, {})] * 3
+        for _ in range(3):
+            self.assertEqual(http.post('https://api.example.com/charge', json={}).status_code, 500)
+
+        with self.assertRaises(CircuitOpenError):
+            http.get('https://api.example.com/ping')
+        self.assertEqual(len(self.server.calls), 3)
+        self.assertEqual(registry.counter('http_short_circuits', 'stub'), 1)
+
+        # After the reset timeout one trial call goes through and closes the circuit
+        http.breaker.opened_at -= http.breaker.reset_timeout
+        self.assertEqual(http.get('https://api.example.com/ping').status_code, 200)
+        self.assertEqual(http.breaker.state, 'closed')
+
+    def test_prefork_children_start_with_fresh_clients(self):
+        parent = get_client('stub')
+        worker_process_init.send(sender=None)
+
+        self.assertIsNot(get_client('stub'), parent)
@@ -0,0 +1,64 @@
+from django.test import TestCase, override_settings
+
+from core.cache import CacheService
+from core.instrumentation import registry, span, timed, track_io
+from core.tests.factories import LOCMEM_CACHES
+from user.models import User
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestSpans(TestCase):
+    def setUp(self):
+        registry.reset()
+
+    def test_span_counts_queries_and_io_including_nested_stages(self):
+        with span('outer') as outer:
+            User.objects.count()
+            with span('inner') as inner:
+                User.objects.exists()
+                CacheService.set('instrumentation:test', 1)
+            with track_io('event'):
+                pass
+
+        self.assertEqual(inner.queries, 1)
+        self.assertEqual(outer.queries, 2)
+        self.assertGreater(inner.redis, 0)
+        self.assertEqual(outer.redis, inner.redis)
+        self.assertGreater(outer.event, 0)
+        self.assertGreaterEqual(outer.duration, inner.duration)
+
+        # Queries outside a span are not counted
+        User.objects.count()
+        self.assertEqual(outer.queries, 2)
+
+    def test_decorator_feeds_prometheus_histograms(self):
+        @timed('test.stage')
+        def stage():
+            return User.objects.count()
+
+        stage()
+        stage()
+
+        text = registry.render_prometheus()
+        self.assertIn('# TYPE xbooking_stage_duration_seconds histogram', text)
+        self.assertIn('xbooking_stage_duration_seconds_count{stage="test.stage"} 2', text)
+        self.assertIn('xbooking_stage_queries_bucket{stage="test.stage",le="1"} 2', text)
+        self.assertIn('xbooking_stage_queries_sum{stage="test.stage"} 2.000000', text)
+
+    @override_settings(INSTRUMENTATION_ENABLED=False)
+    def test_disabled_spans_record_nothing(self):
+        with span('off') as current:
+            User.objects.count()
+        self.assertIsNone(current)
+        self.assertEqual(registry.render_prometheus(), '')
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint_requires_token(self):
+        with span('scraped'):
+            pass
+
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+
+        response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('stage="scraped"', response.content.decode())
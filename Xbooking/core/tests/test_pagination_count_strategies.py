@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+
+from core.pagination import ProbePaginator, StandardResultsSetPagination, estimated_count
+from core.tests.factories import LOCMEM_CACHES, create_user
+from notifications.models import Notification
+
+
+def count_queries(queries):
+    return sum('COUNT(' in query['sql'].upper() for query in queries.captured_queries)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestPaginationCountStrategies(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = create_user("reader@example.com", full_name="Reader")
+        Notification.objects.bulk_create([
+            Notification(
+                user=self.user, notification_type='order_created', channel='email' if i % 2 else 'in_app',
+                title=f"N{i:02d}", message='m'
+            )
+            for i in range(11)
+        ])
+        self.queryset = Notification.objects.filter(user=self.user).order_by('title')
+
+    def paginate(self, strategy=None, queryset=None, **params):
+        view = SimpleNamespace(pagination_count_strategy=strategy)
+        request = Request(self.factory.get('/notifications/', params))
+        paginator = StandardResultsSetPagination()
+        with CaptureQueriesContext(connection) as queries:
+            page = paginator.paginate_queryset(self.queryset if queryset is None else queryset, request, view)
+            data = paginator.get_paginated_response([item.title for item in page]).data
+        return data, queries
+
+    def test_exact_is_the_default(self):
+        data, queries = self.paginate(page_size=4)
+
+        self.assertEqual((data['count'], data['total_pages'], data['current_page']), (11, 3, 1))
+        self.assertEqual(count_queries(queries), 1)
+
+    def test_none_probes_for_the_next_page_without_counting(self):
+        first, queries = self.paginate('none', page_size=4)
+        last, _ = self.paginate('none', page=3, page_size=4)
+
+        self.assertEqual(count_queries(queries), 0)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual((first['count'], first['total_pages']), (None, None))
+        self.assertEqual(first['results'], ['N00', 'N01', 'N02', 'N03'])
+        self.assertIn('page=2', first['next'])
+        self.assertEqual(last['results'], ['N08', 'N09', 'N10'])
+        self.assertIsNone(last['next'])
+        self.assertIsNotNone(last['previous'])
+        with self.assertRaises(NotFound):
+            self.paginate('none', page=4, page_size=4)
+
+    def test_cached_counts_once_per_filter_signature(self):
+        _, first = self.paginate('cached', page_size=4)
+        data, second = self.paginate('cached', page=2, page_size=4)
+        _, other_filter = self.paginate('cached', queryset=self.queryset.filter(channel='email'), page_size=4)
+
+        self.assertEqual((count_queries(first), count_queries(second), count_queries(other_filter)), (1, 0, 1))
+        self.assertEqual((data['count'], data['total_pages']), (11, 3))
+
+    def test_estimate_is_exact_below_the_threshold(self):
+        data, _ = self.paginate('estimate', page_size=4)
+        self.assertEqual(data['count'], 11)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Planner estimates require PostgreSQL')
+    def test_estimate_uses_the_planner_above_the_threshold(self):
+        with CaptureQueriesContext(connection) as queries:
+            estimated_count(self.queryset, threshold=0)
+        self.assertTrue(queries.captured_queries[0]['sql'].startswith('EXPLAIN'))
+        self.assertEqual(count_queries(queries), 0)
+
+    def test_an_underestimated_count_never_truncates_pages(self):
+        paginator = ProbePaginator(self.queryset, 4, count_func=lambda: 3)
+        page = paginator.page(2)
+
+        self.assertEqual([item.title for item in page], ['N04', 'N05', 'N06', 'N07'])
+        self.assertTrue(page.has_next())
+        self.assertEqual(paginator.num_pages, 3)
+
+    def test_unknown_strategy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.paginate('sometimes', page_size=4)
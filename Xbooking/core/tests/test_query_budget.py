@@ -0,0 +1,195 @@
+from contextlib import contextmanager
+from datetime import date, time, timedelta
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from booking.models import Booking, Cart
+from booking.views.v1.booking import BookingViewSet
+from booking.views.v1.cart import CartViewSet
+from booking.views.v1.quote import QuoteView
+from core.middleware import QueryBudgetExceeded, QueryBudgetMiddleware, QueryCounter, query_budget, query_shape
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+from user.models import User
+from workspace.models import SpaceCalendar, SpaceCalendarSlot
+
+
+# The budgets the views declare must hold however many rows they return
+ENDPOINT_BUDGETS = {
+    'bookings': BookingViewSet.query_budget,
+    'cart': CartViewSet.query_budget,
+    'add_item': CartViewSet.add_item.query_budget,
+    'quote': QuoteView.query_budget,
+}
+
+
+class QueryBudgetAssertions:
+    @contextmanager
+    def assertQueryBudget(self, max_queries, duplicates=0):
+        with QueryCounter() as counter:
+            yield counter
+        repeated = counter.duplicates()
+        self.assertLessEqual(counter.count, max_queries, f"Over budget, repeated shapes: {repeated}")
+        self.assertLessEqual(counter.duplicate_count(), duplicates, f"Duplicate-shaped queries: {repeated}")
+
+
+class TestQueryBudgetMiddleware(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def run_view(self, view, queries):
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            for i in range(queries):
+                User.objects.filter(pk=i).exists()
+            return HttpResponse()
+
+        middleware = QueryBudgetMiddleware(get_response)
+        return middleware(self.factory.get('/api/v1/things/'))
+
+    def test_query_shape_ignores_parameter_count(self):
+        self.assertEqual(
+            query_shape('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            query_shape('SELECT * FROM t WHERE id IN (%s, %s)')
+        )
+        self.assertEqual(
+            query_shape('INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)'),
+            query_shape('INSERT INTO t (a, b) VALUES (%s, %s)')
+        )
+
+    @override_settings(QUERY_BUDGET_HEADERS=True, QUERY_BUDGET_DUPLICATE_THRESHOLD=3)
+    def test_headers_and_n_plus_one_warning(self):
+        @query_budget(10)
+        def view(request):
+            return HttpResponse()
+
+        with self.assertLogs('core.middleware', 'WARNING') as logs:
+            response = self.run_view(view, queries=4)
+
+        self.assertEqual(response['X-Query-Count'], '4')
+        self.assertEqual(response['X-Query-Budget'], '10')
+        self.assertEqual(response['X-Query-Duplicates'], '3')
+        self.assertIn('possible N+1: 4x', logs.output[0])
+
+    @override_settings(QUERY_BUDGET_HEADERS=False, QUERY_BUDGET_ACTION='raise', QUERY_BUDGET_DEFAULT=2)
+    def test_raise_mode_and_no_headers_outside_debug(self):
+        def view(request):
+            return HttpResponse()
+
+        response = self.run_view(view, queries=2)
+        self.assertNotIn('X-Query-Count', response)
+
+        with self.assertRaises(QueryBudgetExceeded):
+            self.run_view(view, queries=3)
+
+    @override_settings(QUERY_BUDGET_ACTION='raise')
+    def test_zero_budget_is_not_replaced_by_the_default(self):
+        @query_budget(0)
+        def view(request):
+            return HttpResponse()
+
+        self.run_view(view, queries=0)
+        with self.assertRaises(QueryBudgetExceeded):
+            self.run_view(view, queries=1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RESERVATION_HOLDS_ENABLED=False)
+class TestEndpointQueryBudgets(QueryBudgetAssertions, TestCase):
+    def setUp(self):
+        self.user = create_user("budget@example.com", full_name="Budget")
+        Cart.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.workspace = create_workspace(self.user, name="Budget Workspace")
+        self.branch = create_branch(self.workspace)
+        self.space = create_space(self.branch, name="Room", capacity=4)
+        calendar = SpaceCalendar.objects.create(space=self.space)
+        self.booking_date = date.today() + timedelta(days=3)
+        SpaceCalendarSlot.objects.bulk_create([
+            SpaceCalendarSlot(
+                calendar=calendar,
+                date=self.booking_date,
+                start_time=time(hour, 0),
+                end_time=time(hour + 1, 0),
+                booking_type='hourly',
+            )
+            for hour in range(9, 17)
+        ])
+
+    def create_bookings(self, count):
+        check_in = timezone.now() + timedelta(days=1)
+        Booking.objects.bulk_create([
+            Booking(
+                workspace=self.workspace,
+                space=self.space,
+                user=self.user,
+                booking_type='hourly',
+                booking_date=check_in.date(),
+                start_time=time(9, 0),
+                end_time=time(10, 0),
+                check_in=check_in,
+                check_out=check_in + timedelta(hours=1),
+                number_of_guests=1,
+                base_price=10,
+                discount_amount=0,
+                tax_amount=0,
+                total_price=10,
+                status='confirmed'
+            )
+            for _ in range(count)
+        ])
+
+    def add_item(self, start, end):
+        return self.client.post('/api/v1/booking/cart/add_item/', {
+            'space_id': str(self.space.id),
+            'booking_date': self.booking_date.isoformat(),
+            'start_time': start,
+            'end_time': end,
+            'booking_type': 'hourly',
+        }, format='json')
+
+    def test_booking_list_is_within_budget_for_any_page_size(self):
+        self.create_bookings(1)
+        with self.assertQueryBudget(ENDPOINT_BUDGETS['bookings']) as one:
+            self.assertEqual(self.client.get('/api/v1/booking/bookings/').status_code, 200)
+
+        self.create_bookings(9)
+        cache.clear()
+        with self.assertQueryBudget(ENDPOINT_BUDGETS['bookings']) as ten:
+            self.assertEqual(self.client.get('/api/v1/booking/bookings/').status_code, 200)
+
+        self.assertEqual(one.count, ten.count)
+
+    def test_cart_endpoints_are_within_budget(self):
+        with self.assertQueryBudget(ENDPOINT_BUDGETS['add_item']):
+            self.assertEqual(self.add_item('10:00', '12:00').status_code, 201)
+        with self.assertQueryBudget(ENDPOINT_BUDGETS['add_item']):
+            self.assertEqual(self.add_item('13:00', '16:00').status_code, 201)
+
+        with self.assertQueryBudget(ENDPOINT_BUDGETS['cart']):
+            response = self.client.get('/api/v1/booking/cart/')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUERY_BUDGET_HEADERS=True)
+    def test_actions_use_their_own_budget_over_the_viewset_one(self):
+        self.assertEqual(self.client.get('/api/v1/booking/cart/')['X-Query-Budget'], '6')
+        self.assertEqual(self.add_item('10:00', '12:00')['X-Query-Budget'], '16')
+
+    def test_quote_is_within_budget(self):
+        items = [
+            {
+                'space_id': str(self.space.id),
+                'booking_date': self.booking_date.isoformat(),
+                'start_time': f'{hour}:00',
+                'end_time': f'{hour + 1}:00',
+                'booking_type': 'hourly',
+            }
+            for hour in range(9, 15)
+        ]
+        with self.assertQueryBudget(ENDPOINT_BUDGETS['quote']):
+            response = self.client.post('/api/v1/booking/quote/', {'items': items}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
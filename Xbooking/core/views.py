@@ -4,6 +4,9 @@ Base view classes with built-in caching and best practices
 
 from rest_framework import viewsets, generics
 from rest_framework.response import Response
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
 from core.cache import CacheService
 from core.responses import SuccessResponse, ErrorResponse
 from core.pagination import StandardResultsSetPagination
@@ -122,3 +125,22 @@ class BaseAPIView(generics.GenericAPIView):
         """Handle exceptions consistently"""
         logger.error(f"Exception in {self.__class__.__name__}: {str(exc)}")
         return super().handle_exception(exc)
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint for the hot-path span histograms
+    
+    Requires `Authorization: Bearer <METRICS_TOKEN>`; without a configured
+    token the endpoint is only served in DEBUG. Histograms are per process.
+    """
+    from core.instrumentation import render_prometheus
+    
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+    
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -126,7 +126,7 @@ class Notification(models.Model):
         verbose_name_plural = 'Notifications'
         db_table = 'notifications'
         indexes = [
-            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['user', '-created_at', '-id']),
             models.Index(fields=['is_read', 'user']),
             models.Index(fields=['notification_type']),
         ]
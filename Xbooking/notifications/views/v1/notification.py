@@ -12,7 +12,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
 from core.views import CachedModelViewSet
-from core.pagination import StandardResultsSetPagination
+from core.pagination import CursorResultsSetPagination
 from core.throttling import UserRateThrottle, UserBurstThrottle
 from notifications.models import Notification
 from notifications.serializers.v1 import (
@@ -38,7 +38,7 @@ class NotificationViewSet(CachedModelViewSet):
     
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = CursorResultsSetPagination
     cache_timeout = 60  # 1 minute cache for notifications
     
     def get_queryset(self):
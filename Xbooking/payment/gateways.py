@@ -4,17 +4,50 @@ Payment Gateway Integration Module
 import requests
 from django.conf import settings
 from decimal import Decimal
+from functools import wraps
 import logging
+from core.cache import CacheService
+from core.http import get_client
 
 logger = logging.getLogger(__name__)
 
+# Statuses a transaction never leaves; only these are cached
+SETTLED_STATUSES = ('success', 'successful', 'failed', 'reversed')
+
+
+def cached_verification(provider):
+    """
+    Cache settled verify_transaction results by reference for a short time, so
+    the callback view and wallet verification share one gateway call. Errors
+    and in-flight statuses are never cached; the webhook handlers and the
+    reconciler pass use_cache=False so they always see the gateway's answer.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, reference, use_cache=True):
+            key = f"payment:verify:{provider}:{reference}"
+            if use_cache:
+                cached = CacheService.get(key)
+                if cached is not None:
+                    return dict(cached)
+            
+            result = func(self, reference)
+            if result.get('success') and result.get('status') in SETTLED_STATUSES:
+                CacheService.set(key, result, timeout=getattr(settings, 'PAYMENT_VERIFY_CACHE_SECONDS', 60))
+            return result
+        return wrapper
+    return decorator
+
 
 class PaystackGateway:
     """Paystack payment gateway integration"""
     
+    provider = 'paystack'
+    
     def __init__(self):
         self.secret_key = settings.PAYSTACK_SECRET_KEY
         self.base_url = "https://api.paystack.co"
+        self.http = get_client('paystack')
         self.headers = {
             "Authorization": f"Bearer {self.secret_key}",
             "Content-Type": "application/json"
@@ -44,7 +77,7 @@ class PaystackGateway:
             if redirect_url:
                 data["callback_url"] = redirect_url
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/transaction/initialize",
                 json=data,
                 headers=self.headers,
@@ -79,6 +112,7 @@ class PaystackGateway:
                 'error': str(e)
             }
     
+    @cached_verification('paystack')
     def verify_transaction(self, reference):
         """
         Verify a transaction on Paystack
@@ -90,7 +124,7 @@ class PaystackGateway:
             dict: Response containing transaction details and status
         """
         try:
-            response = requests.get(
+            response = self.http.get(
                 f"{self.base_url}/transaction/verify/{reference}",
                 headers=self.headers,
                 timeout=30
@@ -149,7 +183,7 @@ class PaystackGateway:
                 "name": name
             }
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/transferrecipient",
                 json=data,
                 headers=self.headers,
@@ -197,7 +231,7 @@ class PaystackGateway:
                 "recipient": recipient_code
             }
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/transfer",
                 json=data,
                 headers=self.headers,
@@ -224,14 +258,118 @@ class PaystackGateway:
                 'success': False,
                 'error': str(e)
             }
+    
+    def initiate_bulk_transfer(self, transfers, source='balance'):
+        """
+        Queue up to 100 transfers in one request
+        
+        Args:
+            transfers (list): Dicts with amount (Naira), reference, reason and recipient (code)
+            source (str): 'balance' for account balance
+            
+        Returns:
+            dict: Response with one entry per queued transfer (reference, transfer_code, status)
+        """
+        try:
+            data = {
+                "currency": "NGN",
+                "source": source,
+                "transfers": [
+                    {
+                        "amount": int(Decimal(str(transfer['amount'])) * 100),  # Convert to kobo
+                        "reference": transfer['reference'],
+                        "reason": transfer['reason'],
+                        "recipient": transfer['recipient']
+                    }
+                    for transfer in transfers
+                ]
+            }
+            
+            response = self.http.post(
+                f"{self.base_url}/transfer/bulk",
+                json=data,
+                headers=self.headers,
+                timeout=60
+            )
+            
+            if response.status_code == 200:
+                response_data = response.json()
+                if response_data.get('status'):
+                    return {
+                        'success': True,
+                        'transfers': [
+                            {
+                                'reference': item['reference'],
+                                'transfer_code': item.get('transfer_code'),
+                                'status': item.get('status')
+                            }
+                            for item in response_data['data']
+                        ]
+                    }
+            
+            return {
+                'success': False,
+                'error': response.json().get('message', 'Failed to initiate bulk transfer'),
+                'status_code': response.status_code
+            }
+        except Exception as e:
+            logger.error(f"Paystack bulk transfer error: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def verify_transfer(self, reference):
+        """
+        Verify a transfer by its reference
+        
+        Args:
+            reference (str): Transfer reference
+            
+        Returns:
+            dict: Response containing transfer status (success, failed, reversed, pending...)
+        """
+        try:
+            response = self.http.get(
+                f"{self.base_url}/transfer/verify/{reference}",
+                headers=self.headers,
+                timeout=30
+            )
+            
+            if response.status_code == 200:
+                response_data = response.json()
+                if response_data.get('status'):
+                    data = response_data['data']
+                    return {
+                        'success': True,
+                        'status': data['status'],
+                        'reference': data['reference'],
+                        'transfer_code': data.get('transfer_code'),
+                        'amount': Decimal(str(data['amount'])) / 100  # Convert from kobo
+                    }
+            
+            return {
+                'success': False,
+                'error': response.json().get('message', 'Failed to verify transfer'),
+                'status_code': response.status_code
+            }
+        except Exception as e:
+            logger.error(f"Paystack transfer verification error: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
 
 
 class FlutterwaveGateway:
     """Flutterwave payment gateway integration"""
     
+    provider = 'flutterwave'
+    
     def __init__(self):
         self.secret_key = settings.FLUTTERWAVE_SECRET_KEY
         self.base_url = "https://api.flutterwave.com/v3"
+        self.http = get_client('flutterwave')
         self.headers = {
             "Authorization": f"Bearer {self.secret_key}",
             "Content-Type": "application/json"
@@ -269,7 +407,7 @@ class FlutterwaveGateway:
             if redirect_url:
                 data["redirect_url"] = redirect_url
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/payments",
                 json=data,
                 headers=self.headers,
@@ -304,6 +442,7 @@ class FlutterwaveGateway:
                 'error': str(e)
             }
     
+    @cached_verification('flutterwave')
     def verify_transaction(self, reference):
         """
         Verify a transaction on Flutterwave
@@ -317,7 +456,7 @@ class FlutterwaveGateway:
         tx_ref = reference
         
         try:
-            response = requests.get(
+            response = self.http.get(
                 f"{self.base_url}/transactions/verify_by_reference?tx_ref={tx_ref}",
                 headers=self.headers,
                 timeout=30
@@ -398,7 +537,7 @@ class FlutterwaveGateway:
                 "beneficiary_name": beneficiary_name
             }
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/transfers",
                 json=data,
                 headers=self.headers,
@@ -425,3 +564,54 @@ class FlutterwaveGateway:
                 'success': False,
                 'error': str(e)
             }
+
+
+class StubTransferGateway:
+    """
+    Local stand-in for PaystackGateway's payout API (tests and development)
+    
+    Accepts every transfer and settles it with `settle_as` on verification,
+    unless its reference is listed in `fail` (failed) or `reject` (refused
+    when queued). Records every call, so callers can assert on them.
+    """
+    
+    provider = 'paystack'
+    
+    def __init__(self, settle_as='success', fail=(), reject=()):
+        self.settle_as = settle_as
+        self.fail = set(fail)
+        self.reject = set(reject)
+        self.recipients = []
+        self.batches = []
+        self.verified = []
+        self.queued = {}
+    
+    def create_transfer_recipient(self, type_account, account_number, bank_code, name):
+        self.recipients.append(account_number)
+        return {'success': True, 'recipient_code': f"RCP_{bank_code}_{account_number}"}
+    
+    def initiate_bulk_transfer(self, transfers, source='balance'):
+        self.batches.append([transfer['reference'] for transfer in transfers])
+        results = []
+        for transfer in transfers:
+            status = 'failed' if transfer['reference'] in self.reject else 'pending'
+            if status == 'pending':
+                self.queued[transfer['reference']] = Decimal(str(transfer['amount']))
+            results.append({
+                'reference': transfer['reference'],
+                'transfer_code': f"TRF_{transfer['reference']}",
+                'status': status
+            })
+        return {'success': True, 'transfers': results}
+    
+    def verify_transfer(self, reference):
+        self.verified.append(reference)
+        if reference not in self.queued:
+            return {'success': False, 'error': 'Transfer not found', 'status_code': 404}
+        return {
+            'success': True,
+            'status': 'failed' if reference in self.fail else self.settle_as,
+            'reference': reference,
+            'transfer_code': f"TRF_{reference}",
+            'amount': self.queued[reference]
+        }
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0003_webhook_ingestion'),
+        ('workspace', '0004_slot_occupancy'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', 'created_at'], name='payment_pay_status_19fbf4_idx'),
+        ),
+    ]
@@ -134,6 +134,7 @@ class Payment(models.Model):
             models.Index(fields=['user', 'status']),
             models.Index(fields=['order']),
             models.Index(fields=['gateway_transaction_id']),
+            models.Index(fields=['status', 'created_at']),
         ]
     
     def __str__(self):
@@ -145,6 +146,7 @@ class PaymentWebhook(models.Model):
     
     WEBHOOK_STATUS_CHOICES = [
         ('pending', 'Pending'),
+        ('processing', 'Processing'),
         ('processed', 'Processed'),
         ('failed', 'Failed'),
     ]
@@ -152,6 +154,9 @@ class PaymentWebhook(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     payment_method = models.CharField(max_length=50)  # paystack, flutterwave, etc
     gateway_event_id = models.CharField(max_length=255, unique=True)
+    event_type = models.CharField(max_length=100, blank=True, default='')
+    # Payment/deposit reference; webhooks for one reference are processed one at a time
+    reference = models.CharField(max_length=255, blank=True, default='')
     
     # Webhook data
     payload = models.JSONField()  # Raw webhook payload from payment gateway
@@ -160,6 +165,7 @@ class PaymentWebhook(models.Model):
     status = models.CharField(max_length=20, choices=WEBHOOK_STATUS_CHOICES, default='pending')
     processed_at = models.DateTimeField(blank=True, null=True)
     error_message = models.TextField(blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
     
     # Timestamps
     received_at = models.DateTimeField(auto_now_add=True)
@@ -170,6 +176,8 @@ class PaymentWebhook(models.Model):
         indexes = [
             models.Index(fields=['payment_method', 'status']),
             models.Index(fields=['gateway_event_id']),
+            models.Index(fields=['status', 'received_at']),
+            models.Index(fields=['reference']),
         ]
     
     def __str__(self):
@@ -7,6 +7,7 @@ from django.utils import timezone
 from django.db import transaction
 from core.services import EventBus, Event, EventTypes
 from core.cache import CacheService
+from core.instrumentation import timed
 from payment.models import Order, Payment, Refund
 from booking.models import Booking
 
@@ -151,34 +152,8 @@ class PaymentService:
             order.payment_reference = payment.gateway_transaction_id
             order.save()
             
-            # Update booking statuses and confirm reservations
-            from booking.models import CartItem
-            from booking.services import BookingService
-            
-            for booking in order.bookings.all():
-                booking.status = 'confirmed'
-                booking.save()
-                
-                # Find and confirm associated reservation
-                cart_item = CartItem.objects.filter(
-                    reservation__space=booking.space,
-                    reservation__start=booking.check_in,
-                    reservation__end=booking.check_out,
-                    reservation__user=booking.user,
-                    reservation__status='active'
-                ).first()
-                
-                if cart_item and cart_item.reservation:
-                    try:
-                        BookingService.confirm_reservation(cart_item.reservation)
-                    except ValueError:
-                        pass
-                
-                # Credit workspace wallet with booking earnings
-                try:
-                    BankService.process_booking_payment(booking, payment)
-                except Exception as e:
-                    logger.error(f"Failed to credit workspace wallet for booking {booking.id}: {str(e)}")
+            # Confirm bookings and reservations, hold workspace earnings
+            bookings = PaymentService.confirm_order_bookings(order, payment)
             
             # Publish payment completed event
             EventBus.publish(Event(
@@ -196,7 +171,7 @@ class PaymentService:
                     'currency': payment.currency,
                     'payment_method': 'wallet',
                     'gateway_reference': payment.gateway_transaction_id,
-                    'booking_ids': [str(b.id) for b in order.bookings.all()],
+                    'booking_ids': [str(b.id) for b in bookings],
                     'wallet_balance': str(wallet.balance),
                     'timestamp': timezone.now().isoformat()
                 },
@@ -212,35 +187,20 @@ class PaymentService:
             
             # Trigger background tasks for QR codes and notifications
             try:
-                from qr_code.tasks import (
-                    generate_order_receipt,
-                    send_payment_confirmation_email,
-                    generate_booking_qr_codes_for_order
-                )
-                from booking.tasks import generate_guest_qr_codes_for_booking
                 from qr_code.models import BookingQRCode
+                from payment.services.post_payment import PostPaymentWorkflow
                 
                 # Check if booking QR codes already exist (prevent duplicates from callback + webhook)
-                booking_qrs_exist = BookingQRCode.objects.filter(booking__in=order.bookings.all()).exists()
-                
-                # Send payment confirmation email
-                send_payment_confirmation_email.delay(str(order.id))
-                
-                # Generate order receipt (replaces order QR code)
-                generate_order_receipt.delay(str(order.id))
-                logger.info(f"Triggered order receipt generation for {order.id}")
-                
-                # Generate QR code per booking (only if doesn't exist)
-                if not booking_qrs_exist:
-                    generate_booking_qr_codes_for_order.delay(str(order.id))
-                    logger.info(f"Triggered booking QR generation for {order.id}")
-                else:
+                booking_qrs_exist = BookingQRCode.objects.filter(booking__in=bookings).exists()
+                if booking_qrs_exist:
                     logger.info(f"Booking QRs already exist for {order.id}, skipping generation")
                 
-                # Generate guest QR codes for each booking
-                for booking in order.bookings.all():
-                    generate_guest_qr_codes_for_booking.delay(str(booking.id))
-                
+                # Emails, receipt and QR codes run as one workflow once the payment commits
+                PostPaymentWorkflow.schedule(
+                    str(order.id),
+                    [str(b.id) for b in bookings],
+                    booking_qr_codes=not booking_qrs_exist
+                )
                 logger.info(f"Background tasks triggered for wallet payment order {order.id}")
             except Exception as e:
                 logger.error(f"Failed to trigger background tasks for order {order.id}: {str(e)}")
@@ -357,6 +317,48 @@ class PaymentService:
     
     @staticmethod
     @transaction.atomic
+    def confirm_order_bookings(order, payment):
+        """
+        Confirm a paid order's bookings with a fixed number of statements
+
+        One UPDATE confirms the bookings, their cart reservations are confirmed
+        together and the workspace earnings are held with one bulk insert, so
+        completing a payment does not grow with the number of bookings. Their
+        caches are invalidated in one batch after commit.
+
+        Returns:
+            list: The order's Booking instances
+        """
+        from booking.services import BookingService
+        from bank.services import BankService
+
+        bookings = list(order.bookings.select_related('workspace', 'space'))
+        if not bookings:
+            return bookings
+
+        Booking.objects.filter(id__in=[booking.id for booking in bookings]).update(
+            status='confirmed',
+            updated_at=timezone.now()
+        )
+        for booking in bookings:
+            booking.status = 'confirmed'
+        # Batched, and only once readers can see the confirmed rows
+        booking_ids = [booking.id for booking in bookings]
+        transaction.on_commit(lambda: Booking.invalidate_caches(booking_ids, order.user_id))
+
+        BookingService.confirm_reservations_for_bookings(bookings)
+
+        # Credit workspace wallets with booking earnings
+        try:
+            BankService.hold_booking_payments(bookings, payment)
+        except Exception as e:
+            logger.error(f"Failed to hold workspace earnings for order {order.id}: {str(e)}")
+
+        return bookings
+    
+    @staticmethod
+    @timed('payment.complete_payment')
+    @transaction.atomic
     def complete_payment(payment, gateway_response=None):
         """Mark payment as completed and publish event, only trigger emails/tasks if not already completed"""
         from decimal import Decimal
@@ -382,35 +384,8 @@ class PaymentService:
         order.payment_reference = payment.gateway_transaction_id
         order.save()
 
-        # Update booking statuses and confirm reservations
-        from booking.models import CartItem
-        from booking.services import BookingService
-
-        for booking in order.bookings.all():
-            booking.status = 'confirmed'
-            booking.save()
-
-            # Find and confirm associated reservation
-            cart_item = CartItem.objects.filter(
-                reservation__space=booking.space,
-                reservation__start=booking.check_in,
-                reservation__end=booking.check_out,
-                reservation__user=booking.user,
-                reservation__status='active'
-            ).first()
-
-            if cart_item and cart_item.reservation:
-                try:
-                    BookingService.confirm_reservation(cart_item.reservation)
-                except ValueError:
-                    pass
-
-            # Credit workspace wallet with booking earnings
-            try:
-                from bank.services import BankService
-                BankService.process_booking_payment(booking, payment)
-            except Exception as e:
-                logger.error(f"Failed to credit workspace wallet for booking {booking.id}: {str(e)}")
+        # Confirm bookings and reservations, hold workspace earnings
+        bookings = PaymentService.confirm_order_bookings(order, payment)
 
         # Publish payment completed event
         EventBus.publish(Event(
@@ -428,7 +403,7 @@ class PaymentService:
                 'currency': payment.currency,
                 'payment_method': payment.payment_method,
                 'gateway_reference': payment.gateway_transaction_id,
-                'booking_ids': [str(b.id) for b in order.bookings.all()],
+                'booking_ids': [str(b.id) for b in bookings],
                 'timestamp': timezone.now().isoformat()
             },
             source_module='payment'
@@ -443,37 +418,16 @@ class PaymentService:
         # Only trigger background tasks if not already completed
         if not already_completed:
             try:
-                from qr_code.tasks import (
-                    generate_order_receipt,
-                    send_payment_confirmation_email,
-                    generate_booking_qr_codes_for_order
-                )
-                from booking.tasks import generate_guest_qr_codes_for_booking
                 from qr_code.models import BookingQRCode
-                from notifications.tasks import send_notification
+                from payment.services.post_payment import PostPaymentWorkflow
 
                 # Check if booking QR codes already exist (prevent duplicates from callback + webhook)
-                booking_qrs_exist = BookingQRCode.objects.filter(booking__in=order.bookings.all()).exists()
-
-                # Send payment confirmation email
-                send_payment_confirmation_email.delay(str(order.id))
-
-                # Generate order receipt (replaces deprecated OrderQRCode)
-                generate_order_receipt.delay(str(order.id))
-                logger.info(f"Triggered order receipt generation for {order.id}")
-
-                # Generate QR code per booking (only if doesn't exist)
-                if not booking_qrs_exist:
-                    generate_booking_qr_codes_for_order.delay(str(order.id))
-                    logger.info(f"Triggered booking QR generation for {order.id}")
-                else:
+                booking_qrs_exist = BookingQRCode.objects.filter(booking__in=bookings).exists()
+                if booking_qrs_exist:
                     logger.info(f"Booking QRs already exist for {order.id}, skipping generation")
 
-                # Generate guest QR codes for each booking
-                for booking in order.bookings.all():
-                    generate_guest_qr_codes_for_booking.delay(str(booking.id))
-
                 # Send in-app notification for payment completion (prevent duplicates)
+                notification_id = None
                 try:
                     from notifications.models import Notification
                     # Check if notification already exists for this order
@@ -497,13 +451,20 @@ class PaymentService:
                                 'payment_method': payment.payment_method
                             }
                         )
-                        send_notification.delay(str(notification.id))
+                        notification_id = str(notification.id)
                         logger.info(f"Created payment completion notification for order {order.id}")
                     else:
                         logger.info(f"Payment completion notification already exists for order {order.id}, skipping")
                 except Exception as notif_error:
                     logger.error(f"Failed to create payment notification: {str(notif_error)}")
 
+                # Emails, receipt, QR codes and the notification run as one workflow once the payment commits
+                PostPaymentWorkflow.schedule(
+                    str(order.id),
+                    [str(b.id) for b in bookings],
+                    booking_qr_codes=not booking_qrs_exist,
+                    notification_id=notification_id
+                )
                 logger.info(f"Background tasks triggered for order {order.id}")
             except Exception as e:
                 logger.error(f"Failed to trigger background tasks for order {order.id}: {str(e)}")
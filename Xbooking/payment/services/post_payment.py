@@ -0,0 +1,133 @@
+"""
+Post-payment Workflow
+Everything that follows a completed payment, dispatched as one Celery chord.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache import CacheService
+from core.instrumentation import registry
+
+logger = logging.getLogger(__name__)
+
+
+class PostPaymentWorkflow:
+    """
+    Post-payment side effects as one chord of a few coarse tasks.
+
+    Header (run in parallel):
+        confirmation: payment confirmation email
+        receipt: order receipt email
+        booking_qr: booking QR codes, then the QR codes email (a chain)
+        guest_qr: every guest QR code of the order, emails sent as one group
+        notification: the in-app payment notification, when one was created
+
+    The chord callback (finish_post_payment_workflow) records the outcome of
+    each step, so an order's progress can be read with status(order_id)
+    instead of being spread over a tree of tasks that each enqueue the next.
+    The whole canvas is published in one dispatch after the payment commits.
+    """
+
+    STATUS_TIMEOUT = CacheService.TIMEOUT_VERY_LONG
+
+    @staticmethod
+    def status_key(order_id) -> str:
+        return f'payment:post_payment:{order_id}'
+
+    @classmethod
+    def status(cls, order_id) -> Optional[Dict]:
+        """Progress of an order's workflow: state is running, completed or partial"""
+        return CacheService.get(cls.status_key(order_id))
+
+    @staticmethod
+    def steps(order_id: str, booking_ids: List[str], booking_qr_codes: bool = True,
+              notification_id: Optional[str] = None) -> Dict:
+        """Signatures of the chord header, by step name"""
+        from qr_code.tasks import (
+            send_payment_confirmation_email,
+            send_order_receipt_email,
+            generate_booking_qr_codes_for_order,
+            send_booking_qr_codes_email
+        )
+        from booking.tasks import generate_guest_qr_codes_for_bookings
+        from notifications.tasks import send_notification
+
+        steps = {
+            'confirmation': send_payment_confirmation_email.si(order_id),
+            'receipt': send_order_receipt_email.si(order_id),
+        }
+        if booking_qr_codes:
+            steps['booking_qr'] = (
+                generate_booking_qr_codes_for_order.si(order_id, send_email=False) |
+                send_booking_qr_codes_email.si(order_id)
+            )
+        if booking_ids:
+            steps['guest_qr'] = generate_guest_qr_codes_for_bookings.si(booking_ids)
+        if notification_id:
+            steps['notification'] = send_notification.si(notification_id)
+        return steps
+
+    @staticmethod
+    def build(order_id: str, steps: Dict):
+        """Chord of the given steps whose callback records their outcome"""
+        from celery import chord, group
+        from payment.tasks import finish_post_payment_workflow
+
+        return chord(group(list(steps.values())), finish_post_payment_workflow.s(order_id, list(steps)))
+
+    @classmethod
+    def start(cls, order_id: str, booking_ids: List[str], booking_qr_codes: bool = True,
+              notification_id: Optional[str] = None):
+        """Publish the workflow for a paid order and mark it running"""
+        steps = cls.steps(order_id, booking_ids, booking_qr_codes, notification_id)
+        CacheService.set(cls.status_key(order_id), {
+            'state': 'running',
+            'steps': {name: 'pending' for name in steps},
+            'started_at': timezone.now().isoformat(),
+        }, cls.STATUS_TIMEOUT)
+
+        result = cls.build(order_id, steps).apply_async()
+        logger.info(f"Post-payment workflow {result.id} started for order {order_id} with steps {list(steps)}")
+        return result
+
+    @classmethod
+    def schedule(cls, order_id: str, booking_ids: List[str], booking_qr_codes: bool = True,
+                 notification_id: Optional[str] = None) -> None:
+        """Start the workflow once the surrounding transaction commits"""
+        def start():
+            try:
+                cls.start(order_id, booking_ids, booking_qr_codes, notification_id)
+            except Exception as e:
+                logger.error(f"Failed to start post-payment workflow for order {order_id}: {str(e)}")
+
+        transaction.on_commit(start)
+
+    @classmethod
+    def finish(cls, order_id: str, names: List[str], results: List) -> Dict:
+        """Record the outcome of every step (chord callback)"""
+        steps = {
+            name: 'succeeded' if isinstance(result, dict) and result.get('success') else 'failed'
+            for name, result in zip(names, results)
+        }
+        status = cls.status(order_id) or {}
+        status.update({
+            'state': 'completed' if all(outcome == 'succeeded' for outcome in steps.values()) else 'partial',
+            'steps': steps,
+            'finished_at': timezone.now().isoformat(),
+        })
+        if status.get('started_at'):
+            elapsed = (timezone.now() - datetime.fromisoformat(status['started_at'])).total_seconds()
+            status['duration'] = elapsed
+            registry.observe('duration', 'payment.post_payment_workflow', elapsed)
+        CacheService.set(cls.status_key(order_id), status, cls.STATUS_TIMEOUT)
+
+        failed = [name for name, outcome in steps.items() if outcome == 'failed']
+        if failed:
+            logger.warning(f"Post-payment workflow for order {order_id} finished with failed steps: {failed}")
+        else:
+            logger.info(f"Post-payment workflow for order {order_id} completed")
+        return status
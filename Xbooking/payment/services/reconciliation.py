@@ -0,0 +1,153 @@
+"""
+Reconciliation Service
+Settle gateway payments and deposits whose webhook or callback never arrived.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, List, NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+GATEWAYS = ('paystack', 'flutterwave')
+SUCCESS_STATUSES = ('success', 'successful')
+# Paystack's "abandoned" is left alone: the customer can still return and pay
+FAILED_STATUSES = ('failed', 'reversed')
+
+
+class Check(NamedTuple):
+    kind: str  # 'payment' or 'deposit'
+    id: object
+    provider: str
+    reference: str
+
+
+class ReconciliationService:
+    """
+    Periodic safety net for gateway payments.
+
+    Lists pending Payment and Deposit rows older than a few minutes, verifies
+    them with the gateway through a bounded thread pool (HTTP only, no ORM in
+    the workers), then settles each row in its own transaction after re-locking
+    it, so a webhook that lands meanwhile is never applied twice.
+    """
+
+    @staticmethod
+    def pending_checks(older_than: timedelta, max_age: timedelta, limit: int) -> List[Check]:
+        from payment.models import Payment
+        from bank.models import Deposit
+
+        now = timezone.now()
+        window = {'created_at__lt': now - older_than, 'created_at__gte': now - max_age}
+
+        payments = Payment.objects.filter(
+            status='pending',
+            payment_method__in=GATEWAYS,
+            gateway_transaction_id__isnull=False,
+            **window
+        ).order_by('created_at').values_list('id', 'payment_method', 'gateway_transaction_id')[:limit]
+
+        deposits = Deposit.objects.filter(
+            status='pending',
+            payment_method__in=GATEWAYS,
+            **window
+        ).order_by('created_at').values_list('id', 'payment_method', 'reference', 'gateway_reference')[:limit]
+
+        checks = [Check('payment', pk, provider, reference) for pk, provider, reference in payments]
+        for pk, provider, reference, gateway_reference in deposits:
+            # Same reference choice as BankService.verify_and_complete_deposit
+            if provider == 'flutterwave' and gateway_reference:
+                reference = gateway_reference
+            checks.append(Check('deposit', pk, provider, reference))
+        return checks
+
+    @staticmethod
+    def verify_all(checks: List[Check]) -> List[Dict]:
+        """Verify every check with its gateway, at most PAYMENT_RECONCILE_CONCURRENCY at a time"""
+        from payment.gateways import PaystackGateway, FlutterwaveGateway
+
+        if not checks:
+            return []
+
+        gateways = {'paystack': PaystackGateway(), 'flutterwave': FlutterwaveGateway()}
+        workers = min(len(checks), getattr(settings, 'PAYMENT_RECONCILE_CONCURRENCY', 8))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda check: gateways[check.provider].verify_transaction(check.reference, use_cache=False), checks))
+
+    @classmethod
+    def reconcile(cls, older_than_minutes: int = None, max_age_hours: int = 48, limit: int = 200) -> Dict[str, int]:
+        """Verify and settle one batch of stale pending payments and deposits"""
+        if older_than_minutes is None:
+            older_than_minutes = getattr(settings, 'PAYMENT_RECONCILE_AFTER_MINUTES', 15)
+
+        checks = cls.pending_checks(timedelta(minutes=older_than_minutes), timedelta(hours=max_age_hours), limit)
+        results = cls.verify_all(checks)
+
+        counts = {'checked': len(checks), 'completed': 0, 'failed': 0, 'unchanged': 0}
+        for check, verification in zip(checks, results):
+            try:
+                settle = cls.settle_payment if check.kind == 'payment' else cls.settle_deposit
+                outcome = settle(check.id, verification)
+            except Exception as e:
+                logger.error(f"Reconciling {check.kind} {check.reference} failed: {str(e)}")
+                outcome = 'unchanged'
+            counts[outcome] += 1
+
+        if checks:
+            logger.info(f"Reconciliation: {counts}")
+        return counts
+
+    @staticmethod
+    @transaction.atomic
+    def settle_payment(payment_id, verification: Dict) -> str:
+        from payment.models import Payment
+        from payment.services import PaymentService
+
+        payment = Payment.objects.select_for_update(of=('self',)).select_related(
+            'order', 'user'
+        ).filter(id=payment_id, status='pending').first()
+        if payment is None or not verification.get('success'):
+            return 'unchanged'
+
+        status = verification.get('status')
+        if status in SUCCESS_STATUSES:
+            if verification.get('amount') != payment.amount:
+                PaymentService.fail_payment(payment, 'Amount mismatch')
+                return 'failed'
+            PaymentService.complete_payment(payment, gateway_response=verification)
+            return 'completed'
+        if status in FAILED_STATUSES:
+            PaymentService.fail_payment(payment, f"Payment status: {status}")
+            return 'failed'
+        return 'unchanged'
+
+    @staticmethod
+    @transaction.atomic
+    def settle_deposit(deposit_id, verification: Dict) -> str:
+        from bank.models import Deposit
+        from bank.services import BankService
+
+        deposit = Deposit.objects.select_for_update(of=('self',)).select_related(
+            'wallet', 'wallet__user'
+        ).filter(id=deposit_id, status='pending').first()
+        if deposit is None or not verification.get('success'):
+            return 'unchanged'
+
+        status = verification.get('status')
+        amount = verification.get('amount')
+        if status in SUCCESS_STATUSES and amount is not None and Decimal(str(amount)) >= deposit.amount:
+            BankService.complete_deposit(deposit, gateway_response=verification)
+            return 'completed'
+        if status in SUCCESS_STATUSES or status in FAILED_STATUSES:
+            deposit.status = 'failed'
+            deposit.failed_at = timezone.now()
+            deposit.failure_reason = 'Amount mismatch' if status in SUCCESS_STATUSES else f"Payment status: {status}"
+            deposit.save(update_fields=['status', 'failed_at', 'failure_reason', 'updated_at'])
+            return 'failed'
+        return 'unchanged'
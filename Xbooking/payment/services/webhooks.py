@@ -0,0 +1,271 @@
+"""
+Webhook Ingestion Service
+Acknowledge gateway webhooks immediately and process them from a Celery queue.
+"""
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.cache import CacheService
+from core.services import EventBus, Event
+
+logger = logging.getLogger(__name__)
+
+
+# A drain task is queued at most once per window, so bursts are handled in one batch
+DRAIN_DEBOUNCE_SECONDS = 1
+# Rows left in `processing` this long are assumed orphaned by a dead worker and retried
+PROCESSING_TIMEOUT = timedelta(minutes=10)
+# How long one worker may keep a reference to itself
+REFERENCE_LOCK_SECONDS = 5 * 60
+# Gateways stop redelivering well within a day; older duplicates still hit the unique index
+SEEN_EVENT_SECONDS = 60 * 60 * 24
+
+
+def get_handler(provider: str):
+    from payment.webhooks.v1.handlers import PaystackWebhookHandler, FlutterwaveWebhookHandler
+
+    handlers = {
+        'paystack': PaystackWebhookHandler,
+        'flutterwave': FlutterwaveWebhookHandler,
+    }
+    return handlers[provider]()
+
+
+class WebhookIngestionService:
+    """
+    Two-phase webhook handling.
+
+    `ingest` runs in the request: it stores the raw payload as a pending
+    PaymentWebhook and schedules a drain, so the gateway gets its 200 without
+    waiting for verification or order completion. Redeliveries are dropped by
+    their deterministic event key (cache pre-check of processed events, then
+    the unique index); redeliveries of failed events are processed again.
+
+    `process_pending` runs in Celery: it claims a batch of pending webhooks,
+    verifies every distinct transaction in the batch once (concurrently), and
+    hands each webhook to its gateway handler. Webhooks of one reference are
+    processed in arrival order by a single worker at a time.
+    """
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return getattr(settings, 'PAYMENT_WEBHOOK_ASYNC', False)
+
+    @staticmethod
+    def event_key(provider: str, event_type: str, payload: Dict) -> str:
+        """
+        Deterministic identity of a gateway event, identical on every redelivery:
+        the gateway's transaction id, else the payment reference, else a hash of
+        the payload itself.
+        """
+        data = payload.get('data') or {}
+        identity = data.get('id') or data.get('reference') or data.get('tx_ref') or data.get('txRef')
+        if not identity:
+            canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+            identity = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+        return f"{provider}:{event_type}:{identity}"[:255]
+
+    @staticmethod
+    def _seen_key(gateway_event_id: str) -> str:
+        return f'payment:webhooks:seen:{gateway_event_id}'
+
+    @classmethod
+    def is_duplicate(cls, gateway_event_id: str) -> bool:
+        """Cheap pre-check against events processed recently"""
+        return CacheService.get(cls._seen_key(gateway_event_id)) is not None
+
+    @classmethod
+    def mark_seen(cls, gateway_event_id: str) -> None:
+        """Remember a successfully processed event, once the outcome is committed"""
+        seen_key = cls._seen_key(gateway_event_id)
+        transaction.on_commit(lambda: CacheService.set(seen_key, 1, timeout=SEEN_EVENT_SECONDS))
+
+    @classmethod
+    def record(cls, provider: str, event_type: str, gateway_event_id: str, reference: Optional[str], payload: Dict):
+        """
+        Store a webhook unless its event is already stored and not failed.
+
+        Uses INSERT ... ON CONFLICT DO NOTHING on the unique gateway_event_id, so
+        concurrent redeliveries neither raise IntegrityError nor both get stored.
+        A redelivery of an event whose processing failed puts the stored row
+        back to pending (exactly one concurrent redelivery wins), so gateway
+        retries recover from transient verification or lookup failures.
+
+        Returns:
+            (webhook, created): webhook is None for duplicates
+        """
+        from payment.models import PaymentWebhook
+
+        webhook = PaymentWebhook(
+            payment_method=provider,
+            gateway_event_id=gateway_event_id,
+            event_type=event_type,
+            reference=reference or '',
+            payload=payload,
+            status='pending'
+        )
+        PaymentWebhook.objects.bulk_create([webhook], ignore_conflicts=True)
+        stored_id = PaymentWebhook.objects.filter(gateway_event_id=gateway_event_id).values_list('id', flat=True).first()
+        if stored_id == webhook.id:
+            return webhook, True
+
+        retried = PaymentWebhook.objects.filter(id=stored_id, status='failed').update(
+            status='pending',
+            payload=payload,
+            error_message=None,
+            processed_at=None
+        )
+        if retried:
+            logger.info(f"Retrying failed {provider} webhook {gateway_event_id}")
+            return PaymentWebhook.objects.get(id=stored_id), True
+
+        logger.info(f"Duplicate {provider} webhook {gateway_event_id} ignored")
+        return None, False
+
+    @classmethod
+    def ingest(cls, provider: str, event_type: str, gateway_event_id: str, reference: Optional[str], payload: Dict):
+        """Store a verified webhook for background processing; returns None for duplicates"""
+        webhook, created = cls.record(provider, event_type, gateway_event_id, reference, payload)
+        if created:
+            transaction.on_commit(cls.schedule_drain)
+        return webhook
+
+    @staticmethod
+    def schedule_drain() -> None:
+        """Queue one drain task per debounce window; the beat sweep covers any misses"""
+        if not CacheService.add('payment:webhooks:drain', 1, timeout=DRAIN_DEBOUNCE_SECONDS):
+            return
+        try:
+            from payment.tasks import process_payment_webhooks
+            process_payment_webhooks.apply_async(countdown=DRAIN_DEBOUNCE_SECONDS)
+        except Exception as e:
+            logger.error(f"Could not queue webhook processing: {str(e)}")
+
+    @staticmethod
+    def claim_batch(batch_size: int) -> List:
+        """Move up to `batch_size` of the oldest pending webhooks to `processing`"""
+        from payment.models import PaymentWebhook
+
+        now = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                PaymentWebhook.objects.filter(
+                    Q(status='pending') |
+                    # processed_at holds the claim time while a row is processing
+                    Q(status='processing', processed_at__lt=now - PROCESSING_TIMEOUT)
+                ).order_by('received_at').select_for_update(skip_locked=True).values_list('id', flat=True)[:batch_size]
+            )
+            PaymentWebhook.objects.filter(id__in=ids).update(
+                status='processing',
+                processed_at=now,
+                attempts=F('attempts') + 1
+            )
+        return list(PaymentWebhook.objects.filter(id__in=ids).order_by('received_at'))
+
+    @classmethod
+    def process_pending(cls, batch_size: int = 50) -> Dict[str, int]:
+        """Process one batch of pending webhooks"""
+        from payment.models import PaymentWebhook
+
+        webhooks = cls.claim_batch(batch_size)
+        if not webhooks:
+            return {'processed': 0, 'failed': 0, 'deferred': 0}
+
+        # Serialize per reference: another worker may already be handling one of them
+        by_reference = {}
+        for webhook in webhooks:
+            by_reference.setdefault((webhook.payment_method, webhook.reference or str(webhook.id)), []).append(webhook)
+
+        locked, deferred = [], []
+        for (provider, reference), group in by_reference.items():
+            lock_key = f'payment:webhooks:lock:{provider}:{reference}'
+            if CacheService.add(lock_key, 1, timeout=REFERENCE_LOCK_SECONDS):
+                locked.append((lock_key, group))
+            else:
+                deferred.extend(webhook.id for webhook in group)
+
+        if deferred:
+            PaymentWebhook.objects.filter(id__in=deferred).update(status='pending', processed_at=None)
+            transaction.on_commit(cls.schedule_drain)
+
+        counts = {'processed': 0, 'failed': 0, 'deferred': len(deferred)}
+        try:
+            verified = cls.verify_batch([webhook for _, group in locked for webhook in group])
+            for _, group in locked:
+                for webhook in group:
+                    ok = cls.process_one(webhook, verified)
+                    counts['processed' if ok else 'failed'] += 1
+        finally:
+            for lock_key, _ in locked:
+                CacheService.delete(lock_key)
+
+        logger.info(f"Webhook batch: {counts}")
+        return counts
+
+    @staticmethod
+    def verify_batch(webhooks) -> Dict:
+        """
+        Verify every distinct transaction of a batch once, a few at a time.
+        Returns {(provider, key): verify_result}.
+        """
+        keys = {}
+        for webhook in webhooks:
+            handler = get_handler(webhook.payment_method)
+            key = handler.verification_key(webhook.event_type, webhook.payload)
+            if key:
+                keys.setdefault((webhook.payment_method, key), handler)
+
+        if not keys:
+            return {}
+
+        workers = min(len(keys), getattr(settings, 'PAYMENT_WEBHOOK_VERIFY_CONCURRENCY', 4))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                (provider, key): pool.submit(handler.verify, key)
+                for (provider, key), handler in keys.items()
+            }
+        return {key: future.result() for key, future in futures.items()}
+
+    @staticmethod
+    def process_one(webhook, verified: Dict) -> bool:
+        """Run the gateway handler for one claimed webhook and record the outcome"""
+        handler = get_handler(webhook.payment_method)
+        key = handler.verification_key(webhook.event_type, webhook.payload)
+
+        try:
+            result = handler.process_webhook(
+                webhook.event_type,
+                webhook.payload,
+                verify_result=verified.get((webhook.payment_method, key))
+            )
+        except Exception as e:
+            logger.error(f"Webhook {webhook.id} processing error: {str(e)}")
+            result = {'success': False, 'error': str(e)}
+
+        webhook.status = 'processed' if result.get('success') else 'failed'
+        webhook.error_message = None if result.get('success') else result.get('error')
+        webhook.processed_at = timezone.now()
+        webhook.save(update_fields=['status', 'error_message', 'processed_at'])
+        if result.get('success'):
+            WebhookIngestionService.mark_seen(webhook.gateway_event_id)
+
+        EventBus.publish(Event(
+            event_type='WEBHOOK_RECEIVED',
+            data={
+                'provider': webhook.payment_method,
+                'event_type': webhook.event_type,
+                'success': result.get('success'),
+                'webhook_id': str(webhook.id)
+            },
+            source_module='payment'
+        ))
+        return bool(result.get('success'))
@@ -0,0 +1,52 @@
+"""
+Celery tasks for payment webhook processing, reconciliation and post-payment work
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='payment.tasks.process_payment_webhooks')
+def process_payment_webhooks(batch_size=50, max_batches=20):
+    """
+    Process webhooks stored by the ingestion endpoints.
+    Queued (debounced) by every ingested webhook and swept every minute by beat,
+    which also retries rows orphaned by a crashed worker.
+    """
+    from payment.services.webhooks import WebhookIngestionService
+    
+    totals = {'processed': 0, 'failed': 0, 'deferred': 0}
+    for _ in range(max_batches):
+        counts = WebhookIngestionService.process_pending(batch_size=batch_size)
+        for key, value in counts.items():
+            totals[key] += value
+        
+        # Deferred references are being handled by another worker; retry them later
+        if counts['deferred'] or sum(counts.values()) < batch_size:
+            break
+    
+    return totals
+
+
+@shared_task(name='payment.tasks.reconcile_pending_payments')
+def reconcile_pending_payments(older_than_minutes=None, limit=200):
+    """
+    Verify gateway payments and deposits still pending after
+    PAYMENT_RECONCILE_AFTER_MINUTES and settle them, instead of waiting for
+    the user to hit a verify endpoint. Runs every 5 minutes.
+    """
+    from payment.services.reconciliation import ReconciliationService
+    
+    return ReconciliationService.reconcile(older_than_minutes=older_than_minutes, limit=limit)
+
+
+@shared_task(name='payment.tasks.finish_post_payment_workflow')
+def finish_post_payment_workflow(results, order_id, steps):
+    """
+    Chord callback of the post-payment workflow: records which steps
+    succeeded so the order's side effects can be followed in one place.
+    """
+    from payment.services.post_payment import PostPaymentWorkflow
+    
+    return PostPaymentWorkflow.finish(order_id, steps, results)
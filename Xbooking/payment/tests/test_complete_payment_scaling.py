@@ -0,0 +1,167 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from bank.models import Transaction, WorkspaceWallet
+from booking.models import Booking, Cart, CartItem, Reservation
+from core.cache import CacheService
+from core.services import EventBus
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+from payment.models import Order, Payment
+from payment.services import PaymentService
+from payment.services.post_payment import PostPaymentWorkflow
+from workspace.models import SpaceCalendar, SpaceCalendarSlot
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RESERVATION_HOLDS_ENABLED=False)
+class TestCompletePaymentScaling(TestCase):
+    """Completing a payment must run a fixed number of statements regardless of order size"""
+
+    def setUp(self):
+        self.user = create_user("payer@example.com", full_name="Payer")
+        self.cart = Cart.objects.create(user=self.user)
+        self.workspace = create_workspace(self.user, name="Pay Workspace")
+        self.branch = create_branch(self.workspace)
+        self.space = create_space(self.branch)
+        self.calendar = SpaceCalendar.objects.create(space=self.space)
+        WorkspaceWallet.objects.create(workspace=self.workspace)
+        self.next_day = date.today() + timedelta(days=1)
+
+    def _order(self, count):
+        """A pending payment for `count` bookings, each backed by an active cart reservation"""
+        days = [self.next_day + timedelta(days=i) for i in range(count)]
+        self.next_day += timedelta(days=count)
+        windows = [
+            (
+                timezone.make_aware(datetime.combine(day, time(9, 0))),
+                timezone.make_aware(datetime.combine(day, time(11, 0)))
+            )
+            for day in days
+        ]
+
+        reservations = Reservation.objects.bulk_create([
+            Reservation(
+                space=self.space,
+                user=self.user,
+                start=start,
+                end=end,
+                expires_at=timezone.now() + timedelta(minutes=15)
+            )
+            for start, end in windows
+        ])
+        SpaceCalendarSlot.objects.bulk_create([
+            SpaceCalendarSlot(
+                calendar=self.calendar,
+                date=day,
+                start_time=time(9, 0),
+                end_time=time(11, 0),
+                booking_type='hourly',
+                status='reserved',
+                reservation=reservation
+            )
+            for day, reservation in zip(days, reservations)
+        ])
+        CartItem.objects.bulk_create([
+            CartItem(
+                cart=self.cart,
+                space=self.space,
+                booking_date=day,
+                start_time=time(9, 0),
+                end_time=time(11, 0),
+                check_in=start,
+                check_out=end,
+                booking_type='hourly',
+                price=Decimal('20.00'),
+                reservation=reservation
+            )
+            for day, (start, end), reservation in zip(days, windows, reservations)
+        ])
+        bookings = Booking.objects.bulk_create([
+            Booking(
+                workspace=self.workspace,
+                space=self.space,
+                user=self.user,
+                booking_type='hourly',
+                booking_date=day,
+                start_time=time(9, 0),
+                end_time=time(11, 0),
+                check_in=start,
+                check_out=end,
+                base_price=Decimal('20.00'),
+                total_price=Decimal('20.00')
+            )
+            for day, (start, end) in zip(days, windows)
+        ])
+
+        total = Decimal('20.00') * count
+        order = Order.objects.create(
+            workspace=self.workspace, user=self.user, subtotal=total, total_amount=total, payment_method='paystack'
+        )
+        order.bookings.set(bookings)
+        return Payment.objects.create(
+            order=order, workspace=self.workspace, user=self.user, amount=total,
+            payment_method='paystack', gateway_transaction_id=f'PAY-{count}'
+        )
+
+    def _complete(self, payment):
+        with patch.object(EventBus, 'publish') as publish, \
+                patch('celery.app.task.Task.apply_async') as apply_async:
+            with CaptureQueriesContext(connection) as queries:
+                PaymentService.complete_payment(payment, {'status': 'success'})
+        return len(queries), publish.call_count, apply_async.call_count
+
+    def test_statements_events_and_tasks_do_not_grow_with_bookings(self):
+        single = self._complete(self._order(1))
+        batch = self._complete(self._order(20))
+
+        self.assertEqual(single, batch)
+
+    def test_orders_of_1_to_40_bookings_complete_in_the_same_statements(self):
+        statements = {}
+        # Up to 40: SQLite's variable limit splits larger bulk inserts into two statements
+        for count in (1, 10, 25, 40):
+            payment = self._order(count)
+            statements[count], _, _ = self._complete(payment)
+
+            bookings = payment.order.bookings.all()
+            self.assertFalse(bookings.exclude(status='confirmed').exists())
+            self.assertEqual(
+                Transaction.objects.filter(booking__in=bookings, category='booking_payment', status='pending').count(),
+                count
+            )
+            self.assertFalse(Reservation.objects.filter(start__in=bookings.values('check_in'), status='active').exists())
+            self.assertFalse(
+                SpaceCalendarSlot.objects.filter(reservation__start__in=bookings.values('check_in'), status='reserved').exists()
+            )
+
+        self.assertEqual(set(statements.values()), {statements[1]})
+
+    def test_booking_caches_are_invalidated_in_one_batch_after_commit(self):
+        for count in (1, 20):
+            payment = self._order(count)
+            with patch.object(CacheService, 'delete_many') as delete_many, \
+                    patch.object(CacheService, 'delete') as delete, \
+                    patch.object(PostPaymentWorkflow, 'start'):
+                with self.captureOnCommitCallbacks() as callbacks:
+                    self._complete(payment)
+                self.assertFalse(delete_many.called)
+                for callback in callbacks:
+                    callback()
+
+            booking_keys = {Booking.get_cache_key(booking.id) for booking in payment.order.bookings.all()}
+            delete_many.assert_called_once()
+            self.assertEqual(set(delete_many.call_args.args[0]), booking_keys)
+            self.assertFalse([call for call in delete.call_args_list if call.args[0] in booking_keys])
+
+    def test_repeated_completion_does_not_hold_earnings_twice(self):
+        payment = self._order(3)
+        self._complete(payment)
+        payment.refresh_from_db()
+        self._complete(payment)
+
+        self.assertEqual(Transaction.objects.filter(order=payment.order, category='booking_payment').count(), 3)
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from booking.models import Booking, Guest
+from booking.tasks import generate_guest_qr_codes_for_bookings
+from core.services import EventBus
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+from payment.models import Order, Payment
+from payment.services import PaymentService
+from payment.services.post_payment import PostPaymentWorkflow
+from qr_code import tasks as qr_tasks
+from notifications import tasks as notification_tasks
+from Xbooking.celery import app
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestPostPaymentWorkflow(TestCase):
+    def setUp(self):
+        cache.clear()
+        publish = patch.object(EventBus, 'publish')
+        publish.start()
+        self.addCleanup(publish.stop)
+
+        self.user = create_user("payer@example.com", full_name="Payer")
+        self.workspace = create_workspace(self.user, name="Pay Workspace")
+        branch = create_branch(self.workspace)
+        self.space = create_space(branch)
+        check_in = timezone.now() + timedelta(days=1)
+        self.booking = Booking.objects.create(
+            workspace=self.workspace,
+            space=self.space,
+            user=self.user,
+            booking_type='hourly',
+            booking_date=check_in.date(),
+            start_time=check_in.time(),
+            end_time=(check_in + timedelta(hours=2)).time(),
+            check_in=check_in,
+            check_out=check_in + timedelta(hours=2),
+            base_price=Decimal('20.00'),
+            total_price=Decimal('20.00')
+        )
+        self.order = Order.objects.create(
+            workspace=self.workspace, user=self.user, subtotal='20.00', total_amount='20.00', payment_method='paystack'
+        )
+        self.order.bookings.set([self.booking])
+
+    def eager(self):
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, 'task_always_eager', False)
+
+    def test_side_effects_are_one_chord_of_coarse_steps(self):
+        steps = PostPaymentWorkflow.steps(str(self.order.id), [str(self.booking.id)], notification_id='n-1')
+        workflow = PostPaymentWorkflow.build(str(self.order.id), steps)
+
+        self.assertEqual(list(steps), ['confirmation', 'receipt', 'booking_qr', 'guest_qr', 'notification'])
+        self.assertEqual(len(workflow.tasks), 5)
+        self.assertEqual(workflow.body.task, 'payment.tasks.finish_post_payment_workflow')
+        self.assertEqual(
+            [task.task for task in steps['booking_qr'].tasks],
+            ['qr_code.tasks.generate_booking_qr_codes_for_order', 'qr_code.tasks.send_booking_qr_codes_email']
+        )
+        self.assertEqual(steps['booking_qr'].tasks[0].kwargs, {'send_email': False})
+
+        without_qr = PostPaymentWorkflow.steps(str(self.order.id), [], booking_qr_codes=False)
+        self.assertEqual(list(without_qr), ['confirmation', 'receipt'])
+
+    def test_callback_records_the_outcome_of_every_step(self):
+        self.eager()
+        ok = {'success': True}
+        with patch.object(qr_tasks.send_payment_confirmation_email, 'run', return_value=ok), \
+                patch.object(qr_tasks.send_order_receipt_email, 'run', return_value={'success': False, 'error': 'x'}), \
+                patch.object(qr_tasks.generate_booking_qr_codes_for_order, 'run', return_value=ok) as generate, \
+                patch.object(qr_tasks.send_booking_qr_codes_email, 'run', return_value=ok) as email, \
+                patch.object(generate_guest_qr_codes_for_bookings, 'run', return_value=ok), \
+                patch.object(notification_tasks.send_notification, 'run', return_value=ok):
+            PostPaymentWorkflow.start(str(self.order.id), [str(self.booking.id)], notification_id='n-1')
+
+        generate.assert_called_once_with(str(self.order.id), send_email=False)
+        email.assert_called_once_with(str(self.order.id))
+
+        status = PostPaymentWorkflow.status(str(self.order.id))
+        self.assertEqual(status['state'], 'partial')
+        self.assertEqual(status['steps'], {
+            'confirmation': 'succeeded',
+            'receipt': 'failed',
+            'booking_qr': 'succeeded',
+            'guest_qr': 'succeeded',
+            'notification': 'succeeded',
+        })
+        self.assertIn('duration', status)
+
+    def test_guest_qr_emails_are_published_as_one_group(self):
+        for i in range(3):
+            Guest.objects.create(booking=self.booking, first_name=f"Guest{i}", last_name="G", email=f"g{i}@example.com")
+
+        upload = {'success': True, 'file_url': 'https://cdn.example.com/qr.png'}
+        with patch('Xbooking.cloudinary_storage.upload_qr_image_to_cloudinary', return_value=upload), \
+                patch('celery.canvas.group.apply_async') as apply_async, \
+                patch('celery.app.task.Task.apply_async') as task_apply_async:
+            result = generate_guest_qr_codes_for_bookings([str(self.booking.id)])
+
+        self.assertEqual(result, {'success': True, 'guests_count': 3, 'failed_count': 0})
+        apply_async.assert_called_once()
+        task_apply_async.assert_not_called()
+
+    def test_completed_payment_starts_one_workflow_after_commit(self):
+        payment = Payment.objects.create(
+            order=self.order, workspace=self.workspace, user=self.user, amount='20.00',
+            payment_method='paystack', gateway_transaction_id='PAY-1'
+        )
+        with patch.object(PostPaymentWorkflow, 'start') as start:
+            with self.captureOnCommitCallbacks(execute=True):
+                PaymentService.complete_payment(payment, {'status': 'success'})
+            start.assert_called_once()
+            order_id, booking_ids, booking_qr_codes, notification_id = start.call_args.args
+            self.assertEqual((order_id, booking_ids, booking_qr_codes), (str(self.order.id), [str(self.booking.id)], True))
+            self.assertIsNotNone(notification_id)
+
+            # A second completion (callback after webhook) does not start another one
+            with self.captureOnCommitCallbacks(execute=True):
+                PaymentService.complete_payment(payment, {'status': 'success'})
+            start.assert_called_once()
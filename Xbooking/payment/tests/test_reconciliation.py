@@ -0,0 +1,122 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from bank.models import Deposit, Wallet
+from core.http import HttpClient
+from core.services import EventBus
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace
+from payment.gateways import PaystackGateway
+from payment.models import Order, Payment
+from payment.services import PaymentService
+from payment.services.reconciliation import ReconciliationService
+
+
+def paystack_reply(status='success', amount=500000):
+    response = MagicMock(status_code=200)
+    response.json.return_value = {'status': True, 'data': {
+        'status': status, 'amount': amount, 'reference': 'REF', 'customer': {'email': 'a@example.com'}
+    }}
+    return response
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestVerificationCache(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_settled_results_are_shared_and_in_flight_or_errors_are_not_cached(self):
+        gateway = PaystackGateway()
+        with patch.object(HttpClient, 'get', return_value=paystack_reply()) as get:
+            first = gateway.verify_transaction('REF')
+            second = PaystackGateway().verify_transaction('REF')
+            self.assertEqual(get.call_count, 1)
+            self.assertEqual(first, second)
+            self.assertEqual(second['amount'], Decimal('5000'))
+
+            gateway.verify_transaction('REF', use_cache=False)
+            self.assertEqual(get.call_count, 2)
+
+        with patch.object(HttpClient, 'get', return_value=paystack_reply(status='ongoing')) as get:
+            gateway.verify_transaction('IN-FLIGHT')
+            gateway.verify_transaction('IN-FLIGHT')
+            self.assertEqual(get.call_count, 2)
+
+        error = MagicMock(status_code=500)
+        error.json.return_value = {'message': 'down'}
+        with patch.object(HttpClient, 'get', return_value=error) as get:
+            gateway.verify_transaction('OTHER')
+            gateway.verify_transaction('OTHER')
+            self.assertEqual(get.call_count, 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestReconciliation(TestCase):
+    def setUp(self):
+        cache.clear()
+        publish = patch.object(EventBus, 'publish')
+        publish.start()
+        self.addCleanup(publish.stop)
+
+        self.user = create_user("payer@example.com", full_name="Payer")
+        self.workspace = create_workspace(self.user, name="Pay Workspace")
+        self.wallet, _ = Wallet.objects.get_or_create(user=self.user)
+
+    def payment(self, reference, minutes_old=30, amount='5000.00'):
+        order = Order.objects.create(
+            workspace=self.workspace, user=self.user, subtotal=amount, total_amount=amount, payment_method='paystack'
+        )
+        payment = Payment.objects.create(
+            order=order, workspace=self.workspace, user=self.user, amount=amount,
+            payment_method='paystack', gateway_transaction_id=reference
+        )
+        Payment.objects.filter(id=payment.id).update(created_at=timezone.now() - timedelta(minutes=minutes_old))
+        return payment
+
+    def test_stale_pending_rows_are_verified_concurrently_and_settled(self):
+        paid = self.payment('PAY-OK')
+        declined = self.payment('PAY-DECLINED')
+        in_flight = self.payment('PAY-ONGOING')
+        self.payment('PAY-FRESH', minutes_old=1)
+        deposit = Deposit.objects.create(
+            wallet=self.wallet, amount=Decimal('1000.00'), payment_method='paystack', reference='DEP-1'
+        )
+        Deposit.objects.filter(id=deposit.id).update(created_at=timezone.now() - timedelta(hours=1))
+
+        outcomes = {
+            'PAY-OK': {'success': True, 'status': 'success', 'amount': Decimal('5000')},
+            'PAY-DECLINED': {'success': True, 'status': 'failed', 'amount': Decimal('5000')},
+            'PAY-ONGOING': {'success': True, 'status': 'ongoing', 'amount': Decimal('5000')},
+            'DEP-1': {'success': True, 'status': 'success', 'amount': Decimal('1000')},
+        }
+        with patch.object(PaystackGateway, 'verify_transaction', side_effect=lambda reference, use_cache=True: outcomes[reference]) as verify, \
+                patch.object(PaymentService, 'complete_payment') as complete, \
+                patch.object(PaymentService, 'fail_payment') as fail:
+            counts = ReconciliationService.reconcile(older_than_minutes=15)
+
+        self.assertEqual(counts, {'checked': 4, 'completed': 2, 'failed': 1, 'unchanged': 1})
+        self.assertEqual(sorted(call.args[0] for call in verify.call_args_list), ['DEP-1', 'PAY-DECLINED', 'PAY-OK', 'PAY-ONGOING'])
+        self.assertEqual({call.kwargs['use_cache'] for call in verify.call_args_list}, {False})
+        self.assertEqual(complete.call_args.args[0].id, paid.id)
+        self.assertEqual(fail.call_args.args[0].id, declined.id)
+        in_flight.refresh_from_db()
+        self.assertEqual(in_flight.status, 'pending')
+
+        deposit.refresh_from_db()
+        self.wallet.refresh_from_db()
+        self.assertEqual(deposit.status, 'completed')
+        self.assertEqual(self.wallet.balance, Decimal('1000.00'))
+
+    def test_rows_settled_meanwhile_are_left_alone(self):
+        payment = self.payment('PAY-OK')
+        Payment.objects.filter(id=payment.id).update(status='success')
+
+        with patch.object(PaymentService, 'complete_payment') as complete:
+            outcome = ReconciliationService.settle_payment(payment.id, {'success': True, 'status': 'success'})
+
+        self.assertEqual(outcome, 'unchanged')
+        complete.assert_not_called()
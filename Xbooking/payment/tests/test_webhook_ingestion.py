@@ -0,0 +1,207 @@
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.cache import CacheService
+from core.services import EventBus
+from core.tests.factories import LOCMEM_CACHES
+from payment.models import PaymentWebhook
+from payment.services.webhooks import WebhookIngestionService
+from payment.webhooks.v1.handlers import PaystackWebhookHandler
+
+
+SECRET = 'sk_test_webhooks'
+
+
+@override_settings(CACHES=LOCMEM_CACHES, PAYMENT_WEBHOOK_ASYNC=True, PAYSTACK_SECRET_KEY=SECRET)
+class TestWebhookIngestion(TestCase):
+    url = '/api/v1/payment/webhooks/paystack/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        publish = patch.object(EventBus, 'publish')
+        self.publish = publish.start()
+        self.addCleanup(publish.stop)
+
+    def post(self, payload, secret=SECRET):
+        body = json.dumps(payload).encode('utf-8')
+        signature = hmac.new(secret.encode('utf-8'), body, hashlib.sha512).hexdigest()
+        return self.client.generic(
+            'POST', self.url, body, content_type='application/json', HTTP_X_PAYSTACK_SIGNATURE=signature
+        )
+
+    def store(self, reference, event_type='charge.success', gateway_event_id=None, **fields):
+        return PaymentWebhook.objects.create(
+            payment_method='paystack',
+            gateway_event_id=gateway_event_id or f'{event_type}:{reference}',
+            event_type=event_type,
+            reference=reference,
+            payload={'event': event_type, 'data': {'reference': reference}},
+            **fields
+        )
+
+    def test_endpoint_stores_payload_and_schedules_processing(self):
+        payload = {'event': 'charge.success', 'data': {'reference': 'PAY-1'}}
+        with patch('payment.tasks.process_payment_webhooks.apply_async') as apply_async, \
+                patch.object(PaystackWebhookHandler, 'process_webhook') as process:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.post(payload)
+
+        self.assertEqual(response.status_code, 200)
+        process.assert_not_called()
+        apply_async.assert_called_once()
+
+        webhook = PaymentWebhook.objects.get()
+        self.assertEqual((webhook.status, webhook.event_type, webhook.reference), ('pending', 'charge.success', 'PAY-1'))
+
+    def test_invalid_signature_is_rejected_without_storing(self):
+        response = self.post({'event': 'charge.success', 'data': {'reference': 'PAY-1'}}, secret='wrong')
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(PaymentWebhook.objects.exists())
+
+    def test_unsigned_request_is_rejected_without_storing(self):
+        body = json.dumps({'event': 'charge.success', 'data': {'reference': 'PAY-1'}})
+        response = self.client.generic('POST', self.url, body, content_type='application/json')
+
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(PaymentWebhook.objects.exists())
+
+    def test_redelivery_of_a_failed_webhook_is_queued_again(self):
+        failed = self.store('PAY-1', gateway_event_id='paystack:charge.success:PAY-1', status='failed', error_message='x')
+
+        with patch('payment.tasks.process_payment_webhooks.apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.post({'event': 'charge.success', 'data': {'reference': 'PAY-1'}})
+
+        self.assertEqual(response.json()['message'], 'Webhook received')
+        apply_async.assert_called_once()
+        failed.refresh_from_db()
+        self.assertEqual((failed.status, failed.error_message), ('pending', None))
+        self.assertEqual(PaymentWebhook.objects.count(), 1)
+
+    def test_batch_verifies_each_reference_once_and_keeps_arrival_order(self):
+        self.store('PAY-1', 'charge.failed')
+        self.store('PAY-1')
+        self.store('PAY-2')
+        seen = []
+
+        def process(handler, event, payload, verify_result=None):
+            seen.append((payload['data']['reference'], event, verify_result))
+            return {'success': True}
+
+        with patch.object(PaystackWebhookHandler, 'verify', side_effect=lambda key: {'success': True, 'key': key}) as verify, \
+                patch.object(PaystackWebhookHandler, 'process_webhook', autospec=True, side_effect=process):
+            counts = WebhookIngestionService.process_pending()
+
+        self.assertEqual(counts, {'processed': 3, 'failed': 0, 'deferred': 0})
+        self.assertEqual(sorted(call.args[0] for call in verify.call_args_list), ['PAY-1', 'PAY-2'])
+        self.assertEqual(seen, [
+            ('PAY-1', 'charge.failed', None),
+            ('PAY-1', 'charge.success', {'success': True, 'key': 'PAY-1'}),
+            ('PAY-2', 'charge.success', {'success': True, 'key': 'PAY-2'}),
+        ])
+        self.assertFalse(PaymentWebhook.objects.exclude(status='processed').exists())
+        self.assertEqual(self.publish.call_count, 3)
+
+    def test_reference_held_by_another_worker_is_deferred(self):
+        busy = self.store('PAY-1')
+        free = self.store('PAY-2')
+        CacheService.add('payment:webhooks:lock:paystack:PAY-1', 1)
+
+        with patch.object(PaystackWebhookHandler, 'verify', return_value={'success': True}), \
+                patch.object(PaystackWebhookHandler, 'process_webhook', return_value={'success': False, 'error': 'x'}), \
+                patch.object(WebhookIngestionService, 'schedule_drain'):
+            counts = WebhookIngestionService.process_pending()
+
+        self.assertEqual(counts, {'processed': 0, 'failed': 1, 'deferred': 1})
+        busy.refresh_from_db()
+        free.refresh_from_db()
+        self.assertEqual(busy.status, 'pending')
+        self.assertEqual((free.status, free.error_message), ('failed', 'x'))
+
+    def test_orphaned_processing_rows_are_retried(self):
+        stale = self.store('PAY-1', status='processing', processed_at=timezone.now() - timedelta(hours=1))
+        self.store('PAY-2', status='processing', processed_at=timezone.now())
+
+        claimed = WebhookIngestionService.claim_batch(10)
+
+        self.assertEqual([webhook.id for webhook in claimed], [stale.id])
+        self.assertEqual(claimed[0].attempts, 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, PAYSTACK_SECRET_KEY=SECRET)
+class TestWebhookDedupe(TestCase):
+    url = '/api/v1/payment/webhooks/paystack/'
+    payload = {'event': 'charge.success', 'data': {'id': 302961, 'reference': 'PAY-1'}}
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        publish = patch.object(EventBus, 'publish')
+        publish.start()
+        self.addCleanup(publish.stop)
+
+    def post(self, payload):
+        body = json.dumps(payload).encode('utf-8')
+        signature = hmac.new(SECRET.encode('utf-8'), body, hashlib.sha512).hexdigest()
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.generic(
+                'POST', self.url, body, content_type='application/json', HTTP_X_PAYSTACK_SIGNATURE=signature
+            )
+
+    def test_event_key_is_deterministic(self):
+        key = WebhookIngestionService.event_key('paystack', 'charge.success', self.payload)
+        self.assertEqual(key, 'paystack:charge.success:302961')
+        self.assertNotEqual(key, WebhookIngestionService.event_key('paystack', 'charge.failed', self.payload))
+
+        bare = {'event': 'transfer.success', 'data': {'amount': 100}}
+        self.assertEqual(
+            WebhookIngestionService.event_key('paystack', 'transfer.success', bare),
+            WebhookIngestionService.event_key('paystack', 'transfer.success', json.loads(json.dumps(bare)))
+        )
+
+    def test_redelivery_is_processed_once(self):
+        with patch.object(PaystackWebhookHandler, 'process_webhook', return_value={'success': True}) as process:
+            self.assertEqual(self.post(self.payload).status_code, 200)
+
+            # Pre-check hit: one cache lookup, no insert
+            with self.assertNumQueries(0):
+                response = self.post(self.payload)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['message'], 'Duplicate webhook ignored')
+
+            # Cache lost: the conflicting insert is ignored instead of raising
+            CacheService.delete("payment:webhooks:seen:paystack:charge.success:302961")
+            self.assertEqual(self.post(self.payload).status_code, 200)
+
+        process.assert_called_once()
+        self.assertEqual(PaymentWebhook.objects.count(), 1)
+
+    def test_retry_after_a_failed_attempt_is_processed(self):
+        outcomes = [{'success': False, 'error': 'Payment not found'}, {'success': True}]
+        with patch.object(PaystackWebhookHandler, 'process_webhook', side_effect=outcomes) as process:
+            self.assertEqual(self.post(self.payload).status_code, 400)
+            self.assertEqual(self.post(self.payload).status_code, 200)
+            self.assertEqual(self.post(self.payload).json()['message'], 'Duplicate webhook ignored')
+
+        self.assertEqual(process.call_count, 2)
+        self.assertEqual(PaymentWebhook.objects.get().status, 'processed')
+
+    @override_settings(PAYMENT_WEBHOOK_ASYNC=True)
+    def test_async_redelivery_is_stored_once(self):
+        with patch('payment.tasks.process_payment_webhooks.apply_async') as apply_async:
+            for _ in range(3):
+                self.assertEqual(self.post(self.payload).status_code, 200)
+            CacheService.delete("payment:webhooks:seen:paystack:charge.success:302961")
+            self.assertEqual(self.post(self.payload).status_code, 200)
+
+        self.assertEqual(PaymentWebhook.objects.count(), 1)
+        apply_async.assert_called_once()
@@ -2,8 +2,8 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework import status
-import requests
 from django.conf import settings
+from core.http import get_client
 PAYSTACK_BANKS_URL = "https://api.paystack.co/bank?country=nigeria"
 PAYSTACK_RESOLVE_URL = "https://api.paystack.co/bank/resolve"
 PAYSTACK_SECRET_KEY = settings.PAYSTACK_SECRET_KEY  # Ensure this is set in your Django settings
@@ -13,7 +13,7 @@ class BankListAPIView(APIView):
 
     def get(self, request):
         headers = {"Authorization": f"Bearer {PAYSTACK_SECRET_KEY}"}
-        response = requests.get(PAYSTACK_BANKS_URL, headers=headers)
+        response = get_client('paystack').get(PAYSTACK_BANKS_URL, headers=headers)
         if response.status_code == 200:
             banks = response.json().get("data", [])
             return Response([
@@ -32,7 +32,7 @@ class BankResolveAPIView(APIView):
             return Response({"error": "Missing account_number or bank_code"}, status=status.HTTP_400_BAD_REQUEST)
         headers = {"Authorization": f"Bearer {PAYSTACK_SECRET_KEY}"}
         params = {"account_number": account_number, "bank_code": bank_code}
-        response = requests.get(PAYSTACK_RESOLVE_URL, headers=headers, params=params)
+        response = get_client('paystack').get(PAYSTACK_RESOLVE_URL, headers=headers, params=params)
         if response.status_code == 200:
             data = response.json().get("data", {})
             return Response({"account_name": data.get("account_name", "")})
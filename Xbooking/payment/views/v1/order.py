@@ -9,6 +9,7 @@ from django.db.models import Q, Prefetch
 from core.pagination import StandardResultsSetPagination
 from core.responses import SuccessResponse, ErrorResponse
 from core.views import CachedModelViewSet
+from core.middleware import query_budget
 from payment.models import Order
 from payment.serializers.v1 import (
     OrderSerializer,
@@ -22,6 +23,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+@query_budget(6)
 class OrderViewSet(CachedModelViewSet):
     """ViewSet for order management"""
     serializer_class = OrderSerializer
@@ -40,7 +42,7 @@ class OrderViewSet(CachedModelViewSet):
         ).select_related(
             'workspace', 'user'
         ).prefetch_related(
-            Prefetch('bookings', queryset=Booking.objects.select_related('space'))
+            Prefetch('bookings', queryset=Booking.objects.select_related('space', 'workspace'))
         ).distinct()
     
     def get_serializer_class(self):
@@ -49,6 +51,7 @@ class OrderViewSet(CachedModelViewSet):
             return OrderListSerializer
         return OrderSerializer
     
+    @query_budget(30)
     def create(self, request, *args, **kwargs):
         """Create a new order from bookings"""
         serializer = CreateOrderSerializer(data=request.data)
@@ -10,6 +10,7 @@ from django.shortcuts import get_object_or_404
 from core.pagination import StandardResultsSetPagination
 from core.responses import SuccessResponse, ErrorResponse
 from core.views import CachedModelViewSet
+from core.middleware import query_budget
 from payment.models import Payment, Order
 from payment.serializers.v1 import (
     PaymentSerializer,
@@ -25,6 +26,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+@query_budget(6)
 class PaymentViewSet(CachedModelViewSet):
     """ViewSet for payment management"""
     serializer_class = PaymentSerializer
@@ -74,6 +76,7 @@ class PaymentViewSet(CachedModelViewSet):
         serializer = self.get_serializer(payment)
         return SuccessResponse(data=serializer.data)
     
+    @query_budget(50)
     @action(detail=False, methods=['post'])
     def initiate(self, request):
         """Initiate a payment for an order"""
@@ -166,6 +169,7 @@ class PaymentViewSet(CachedModelViewSet):
                 status_code=500
             )
     
+    @query_budget(50)
     @action(detail=False, methods=['post'])
     def pay_with_wallet(self, request):
         """Pay for an order using wallet balance"""
@@ -218,6 +222,7 @@ class PaymentViewSet(CachedModelViewSet):
                 status_code=500
             )
     
+    @query_budget(50)
     @action(detail=False, methods=['post', 'get'])
     def callback(self, request):
         """Handle payment callback from gateway"""
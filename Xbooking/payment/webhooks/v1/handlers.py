@@ -63,8 +63,18 @@ class PaystackWebhookHandler:
             logger.error(f"Signature verification error: {str(e)}")
             return False
     
+    def verification_key(self, event, payload):
+        """Reference the gateway has to verify before `event` can be processed, if any"""
+        if event == 'charge.success':
+            return payload.get('data', {}).get('reference')
+        return None
+    
+    def verify(self, key):
+        """Verify a transaction by the key returned from `verification_key`"""
+        return PaystackGateway().verify_transaction(key, use_cache=False)
+    
     @transaction.atomic
-    def handle_charge_success(self, payload):
+    def handle_charge_success(self, payload, verify_result=None):
         """Handle successful charge event from Paystack (payments and deposits)"""
         try:
             reference = payload.get('data', {}).get('reference')
@@ -74,7 +84,7 @@ class PaystackWebhookHandler:
             
             # Check if it's a deposit (reference starts with DEP-)
             if reference.startswith('DEP-'):
-                return self.handle_deposit_success(payload, reference)
+                return self.handle_deposit_success(payload, reference, verify_result)
             
             # Otherwise handle as payment
             # Get payment
@@ -86,9 +96,9 @@ class PaystackWebhookHandler:
                 logger.warning(f"Payment with reference {reference} not found")
                 return {'success': False, 'error': 'Payment not found'}
             
-            # Verify transaction with Paystack
-            gateway = PaystackGateway()
-            verify_result = gateway.verify_transaction(reference)
+            # Verify transaction with Paystack (unless verified in a batch already)
+            if verify_result is None:
+                verify_result = self.verify(reference)
             
             if not verify_result['success']:
                 logger.error(f"Verification failed for reference {reference}")
@@ -119,7 +129,7 @@ class PaystackWebhookHandler:
             return {'success': False, 'error': str(e)}
     
     @transaction.atomic
-    def handle_deposit_success(self, payload, reference):
+    def handle_deposit_success(self, payload, reference, verify_result=None):
         """Handle successful deposit via Paystack"""
         try:
             # Get deposit
@@ -136,9 +146,9 @@ class PaystackWebhookHandler:
                 logger.info(f"Deposit {deposit.id} already completed")
                 return {'success': True, 'message': 'Deposit already completed'}
             
-            # Verify transaction with Paystack
-            gateway = PaystackGateway()
-            verify_result = gateway.verify_transaction(reference)
+            # Verify transaction with Paystack (unless verified in a batch already)
+            if verify_result is None:
+                verify_result = self.verify(reference)
             
             if not verify_result['success']:
                 logger.error(f"Deposit verification failed for reference {reference}")
@@ -219,10 +229,10 @@ class PaystackWebhookHandler:
             logger.error(f"Error handling Paystack charge.failed: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def process_webhook(self, event, payload):
+    def process_webhook(self, event, payload, verify_result=None):
         """Process Paystack webhook events"""
         if event == 'charge.success':
-            return self.handle_charge_success(payload)
+            return self.handle_charge_success(payload, verify_result)
         elif event == 'charge.failed':
             return self.handle_charge_failed(payload)
         else:
@@ -248,8 +258,18 @@ class FlutterwaveWebhookHandler:
             logger.error(f"Signature verification error: {str(e)}")
             return False
     
+    def verification_key(self, event, payload):
+        """Transaction id the gateway has to verify before `event` can be processed, if any"""
+        if event == 'charge.completed':
+            return payload.get('data', {}).get('id')
+        return None
+    
+    def verify(self, key):
+        """Verify a transaction by the key returned from `verification_key`"""
+        return FlutterwaveGateway().verify_transaction(key, use_cache=False)
+    
     @transaction.atomic
-    def handle_charge_completed(self, payload):
+    def handle_charge_completed(self, payload, verify_result=None):
         """Handle charge.completed event from Flutterwave (payments and deposits)"""
         try:
             data = payload.get('data', {})
@@ -260,7 +280,7 @@ class FlutterwaveWebhookHandler:
             
             # Check if it's a deposit (tx_ref starts with DEP-)
             if tx_ref.startswith('DEP-'):
-                return self.handle_deposit_completed(payload, data, tx_ref)
+                return self.handle_deposit_completed(payload, data, tx_ref, verify_result)
             
             # Otherwise handle as payment
             # Get payment
@@ -272,9 +292,9 @@ class FlutterwaveWebhookHandler:
                 logger.warning(f"Payment with tx_ref {tx_ref} not found")
                 return {'success': False, 'error': 'Payment not found'}
             
-            # Verify transaction with Flutterwave
-            gateway = FlutterwaveGateway()
-            verify_result = gateway.verify_transaction(data.get('id'))
+            # Verify transaction with Flutterwave (unless verified in a batch already)
+            if verify_result is None:
+                verify_result = self.verify(data.get('id'))
             
             if not verify_result['success']:
                 logger.error(f"Verification failed for tx_ref {tx_ref}")
@@ -305,7 +325,7 @@ class FlutterwaveWebhookHandler:
             return {'success': False, 'error': str(e)}
     
     @transaction.atomic
-    def handle_deposit_completed(self, payload, data, tx_ref):
+    def handle_deposit_completed(self, payload, data, tx_ref, verify_result=None):
         """Handle successful deposit via Flutterwave"""
         try:
             # Get deposit
@@ -322,9 +342,9 @@ class FlutterwaveWebhookHandler:
                 logger.info(f"Deposit {deposit.id} already completed")
                 return {'success': True, 'message': 'Deposit already completed'}
             
-            # Verify transaction with Flutterwave
-            gateway = FlutterwaveGateway()
-            verify_result = gateway.verify_transaction(data.get('id'))
+            # Verify transaction with Flutterwave (unless verified in a batch already)
+            if verify_result is None:
+                verify_result = self.verify(data.get('id'))
             
             if not verify_result['success']:
                 logger.error(f"Deposit verification failed for reference {tx_ref}")
@@ -359,10 +379,10 @@ class FlutterwaveWebhookHandler:
             logger.error(f"Error handling Flutterwave deposit completed: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def process_webhook(self, event, payload):
+    def process_webhook(self, event, payload, verify_result=None):
         """Process Flutterwave webhook events"""
         if event == 'charge.completed':
-            return self.handle_charge_completed(payload)
+            return self.handle_charge_completed(payload, verify_result)
         else:
             logger.info(f"Unhandled Flutterwave event: {event}")
             return {'success': True, 'message': f'Event {event} ignored'}
@@ -3,20 +3,50 @@ Payment Webhook Views V1
 """
 import json
 import logging
-import time
 from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 
-from payment.models import PaymentWebhook
+from payment.services.webhooks import WebhookIngestionService
 from payment.webhooks.v1.handlers import PaystackWebhookHandler, FlutterwaveWebhookHandler
 from core.services import EventBus, Event
 
 logger = logging.getLogger(__name__)
 
 
+def _accept(provider, handler, signed_body, signature_header, event_type, gateway_event_id, reference, payload):
+    """
+    Checks shared by both gateways before a webhook is processed
+    
+    Returns:
+        (response, webhook_log): a response to send right away (invalid signature,
+        duplicate, or stored for background processing), else the stored webhook
+    """
+    # Checked before anything is stored, so an unsigned or forged request cannot claim an event key
+    if not signature_header or not handler.verify_signature(signed_body, signature_header):
+        logger.error(f"{provider} signature missing or invalid")
+        return Response(
+            {'error': 'Invalid signature'},
+            status=status.HTTP_401_UNAUTHORIZED
+        ), None
+    
+    duplicate = Response({'message': 'Duplicate webhook ignored'}, status=status.HTTP_200_OK)
+    if WebhookIngestionService.is_duplicate(gateway_event_id):
+        return duplicate, None
+    
+    if WebhookIngestionService.is_enabled():
+        if WebhookIngestionService.ingest(provider, event_type, gateway_event_id, reference, payload) is None:
+            return duplicate, None
+        return Response({'message': 'Webhook received'}, status=status.HTTP_200_OK), None
+    
+    webhook_log, created = WebhookIngestionService.record(provider, event_type, gateway_event_id, reference, payload)
+    if not created:
+        return duplicate, None
+    return None, webhook_log
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def paystack_webhook(request):
@@ -42,31 +72,18 @@ def paystack_webhook(request):
         
         # Log webhook
         event_type = payload.get('event', 'unknown')
-        gateway_event_id = payload.get('data', {}).get('reference', f"paystack_{event_type}_{int(time.time())}")
-        
-        webhook_log = PaymentWebhook.objects.create(
-            payment_method='paystack',
-            gateway_event_id=gateway_event_id,
-            payload=payload,
-            status='pending'
-        )
+        gateway_event_id = WebhookIngestionService.event_key('paystack', event_type, payload)
         
         # Initialize handler
         handler = PaystackWebhookHandler()
         
-        # Verify signature
-        if signature_header:
-            if not handler.verify_signature(raw_body, signature_header):
-                webhook_log.status = 'failed'
-                webhook_log.error_message = 'Invalid signature'
-                webhook_log.processed_at = timezone.now()
-                webhook_log.save()
-                
-                logger.error("Paystack signature verification failed")
-                return Response(
-                    {'error': 'Invalid signature'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
+        # Verify signature, drop redeliveries and store the webhook
+        response, webhook_log = _accept(
+            'paystack', handler, raw_body, signature_header,
+            event_type, gateway_event_id, payload.get('data', {}).get('reference'), payload
+        )
+        if response is not None:
+            return response
         
         # Process webhook
         result = handler.process_webhook(event_type, payload)
@@ -76,6 +93,8 @@ def paystack_webhook(request):
         webhook_log.error_message = result.get('error') if not result.get('success') else None
         webhook_log.processed_at = timezone.now()
         webhook_log.save()
+        if result.get('success'):
+            WebhookIngestionService.mark_seen(gateway_event_id)
         
         # Publish webhook received event
         event = Event(
@@ -138,35 +157,24 @@ def flutterwave_webhook(request):
             event_type = 'unknown'
         logger.error(f"[FW Webhook] Event: {event_type}")
         logger.error(f"[FW Webhook] Payload: {payload}")
-        gateway_event_id = payload.get('data', {}).get('tx_ref') or payload.get('data', {}).get('txRef') or f"flutterwave_{event_type}_{int(time.time())}"
-        webhook_log = PaymentWebhook.objects.create(
-            payment_method='flutterwave',
-            gateway_event_id=gateway_event_id,
-            payload=payload,
-            status='pending'
-        )
-        # Initialize handler
-        handler = FlutterwaveWebhookHandler()
-        # Verify signature
-        if signature_header:
-            request_body_str = raw_body.decode('utf-8')
-            if not handler.verify_signature(request_body_str, signature_header):
-                webhook_log.status = 'failed'
-                webhook_log.error_message = 'Invalid signature'
-                webhook_log.processed_at = timezone.now()
-                webhook_log.save()
-                logger.error("Flutterwave signature verification failed")
-                return Response(
-                    {'error': 'Invalid signature'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-        # Process webhook
-        logger.error(f"[FW Webhook] Processing event: {event_type}")
+        gateway_event_id = WebhookIngestionService.event_key('flutterwave', event_type, payload)
         # Patch: treat BANK_TRANSFER_TRANSACTION as charge.completed for deposits/payments
         if event_type == 'BANK_TRANSFER_TRANSACTION':
             event_type_for_handler = 'charge.completed'
         else:
             event_type_for_handler = event_type
+        # Initialize handler
+        handler = FlutterwaveWebhookHandler()
+        # Verify signature, drop redeliveries and store the webhook
+        response, webhook_log = _accept(
+            'flutterwave', handler, raw_body.decode('utf-8'), signature_header,
+            event_type_for_handler, gateway_event_id,
+            payload.get('data', {}).get('tx_ref') or payload.get('data', {}).get('txRef'), payload
+        )
+        if response is not None:
+            return response
+        # Process webhook
+        logger.error(f"[FW Webhook] Processing event: {event_type}")
         result = handler.process_webhook(event_type_for_handler, payload)
         logger.error(f"[FW Webhook] Handler result: {result}")
         # Update webhook log
@@ -174,6 +182,8 @@ def flutterwave_webhook(request):
         webhook_log.error_message = result.get('error') if not result.get('success') else None
         webhook_log.processed_at = timezone.now()
         webhook_log.save()
+        if result.get('success'):
+            WebhookIngestionService.mark_seen(gateway_event_id)
         # Publish webhook received event
         event = Event(
             event_type='WEBHOOK_RECEIVED',
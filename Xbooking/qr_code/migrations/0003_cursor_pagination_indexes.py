@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_seat_claims'),
+        ('qr_code', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='checkin',
+            name='qr_code_che_check_i_d19efc_idx',
+        ),
+        migrations.AddIndex(
+            model_name='checkin',
+            index=models.Index(fields=['-check_in_time', '-id'], name='qr_code_che_check_i_0345dd_idx'),
+        ),
+    ]
@@ -278,7 +278,7 @@ class CheckIn(models.Model):
         indexes = [
             models.Index(fields=['booking', 'status']),
             models.Index(fields=['qr_code']),
-            models.Index(fields=['check_in_time']),
+            models.Index(fields=['-check_in_time', '-id']),
         ]
     
     def save(self, *args, **kwargs):
@@ -370,7 +370,7 @@ def send_upcoming_booking_reminders():
 
 
 @shared_task
-def generate_booking_qr_codes_for_order(order_id):
+def generate_booking_qr_codes_for_order(order_id, send_email=True):
     """
     Generate QR code for each booking in an order and store in Appwrite.
     Each booking gets its own QR code stored in BookingQRCode model.
@@ -378,6 +378,8 @@ def generate_booking_qr_codes_for_order(order_id):
     
     Args:
         order_id (str): UUID of the order
+        send_email (bool): Queue the QR codes email; False when the post-payment
+            workflow chains it after this task
         
     Returns:
         dict: Result with QR code IDs
@@ -467,7 +469,7 @@ def generate_booking_qr_codes_for_order(order_id):
             booking_qr_codes.append(booking_qr)
         
         # Send email with all booking QR codes
-        if booking_qr_codes:
+        if booking_qr_codes and send_email:
             send_booking_qr_codes_email.delay(order_id)
         
         return {
@@ -11,7 +11,7 @@ from datetime import datetime, time
 
 from core.views import CachedModelViewSet
 from core.responses import SuccessResponse, ErrorResponse
-from core.pagination import StandardResultsSetPagination
+from core.pagination import CursorResultsSetPagination
 from qr_code.models import BookingQRCode, CheckIn
 from qr_code.serializers.v1 import (
     AdminVerifyQRCodeSerializer,
@@ -30,7 +30,7 @@ class AdminQRCodeViewSet(CachedModelViewSet):
     """Admin ViewSet for QR code verification and check-in management"""
     serializer_class = BookingQRCodeSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = CursorResultsSetPagination
     cache_timeout = 120  # 2 minutes cache for admin views
     http_method_names = ['get', 'post']
     
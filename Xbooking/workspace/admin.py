@@ -1,6 +1,7 @@
 from django.contrib import admin
 from workspace.models import Workspace, Branch, WorkspaceUser, Space
 from workspace.models import SpaceCalendar, SpaceCalendarSlot
+from workspace.services import AvailabilityService
 from django.utils.html import format_html
 
 
@@ -176,3 +177,29 @@ class SpaceCalendarSlotAdmin(admin.ModelAdmin):
     list_filter = ['status', 'booking_type', 'date']
     search_fields = ['calendar__space__name', 'booking__id']
     readonly_fields = ['id', 'created_at', 'updated_at']
+
+    @staticmethod
+    def _slot_dates(queryset):
+        return set(queryset.values_list('calendar__space_id', 'date'))
+
+    @staticmethod
+    def _invalidate(slot_dates):
+        """Drop the cached month summaries covering the edited slots"""
+        for space_id, slot_date in slot_dates:
+            AvailabilityService.invalidate_range(space_id, slot_date)
+
+    def save_model(self, request, obj, form, change):
+        # An edit may move the slot to another day, so both dates are stale
+        slot_dates = self._slot_dates(SpaceCalendarSlot.objects.filter(pk=obj.pk)) if change else set()
+        super().save_model(request, obj, form, change)
+        self._invalidate(slot_dates | {(obj.calendar.space_id, obj.date)})
+
+    def delete_model(self, request, obj):
+        slot_dates = {(obj.calendar.space_id, obj.date)}
+        super().delete_model(request, obj)
+        self._invalidate(slot_dates)
+
+    def delete_queryset(self, request, queryset):
+        slot_dates = self._slot_dates(queryset)
+        super().delete_queryset(request, queryset)
+        self._invalidate(slot_dates)
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_reservation_expiry_indexes'),
+        ('workspace', '0002_add_reserved_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spacecalendarslot',
+            name='reservation',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='held_slots', to='booking.reservation'),
+        ),
+        migrations.AddIndex(
+            model_name='spacecalendarslot',
+            index=models.Index(fields=['reservation', 'status'], name='workspace_s_reserva_56d26f_idx'),
+        ),
+    ]
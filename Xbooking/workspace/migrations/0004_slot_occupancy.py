@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workspace', '0003_spacecalendarslot_reservation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spacecalendarslot',
+            name='occupied',
+            field=models.PositiveIntegerField(default=0, help_text='Seats held or booked (shared spaces only)'),
+        ),
+    ]
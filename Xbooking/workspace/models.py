@@ -98,6 +98,8 @@ class Space(UUIDModelMixin, TimestampedModelMixin, CachedModelMixin, models.Mode
         ('desk', 'Dedicated Desk'),
         ('lounge', 'Lounge'),
     )
+    # Types booked by the seat: several users can hold the same interval up to `capacity`
+    SHARED_SPACE_TYPES = ('coworking', 'desk', 'lounge')
 
     branch = models.ForeignKey(Branch, on_delete=models.CASCADE, related_name='spaces')
     name = models.CharField(max_length=255)
@@ -124,6 +126,16 @@ class Space(UUIDModelMixin, TimestampedModelMixin, CachedModelMixin, models.Mode
     def get_cache_key(self):
         """Generate cache key for this space"""
         return f"space:{self.id}"
+    
+    @property
+    def is_shared(self):
+        """Whether the space is booked by the seat instead of exclusively"""
+        return self.space_type in self.SHARED_SPACE_TYPES
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from workspace.services.pricing_service import PricingService
+        PricingService.invalidate(self.id)
 
 
 class SpaceCalendar(UUIDModelMixin, TimestampedModelMixin, models.Model):
@@ -190,6 +202,11 @@ class SpaceCalendar(UUIDModelMixin, TimestampedModelMixin, models.Model):
     
     def __str__(self):
         return f"Calendar for {self.space.name}"
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from workspace.services.pricing_service import PricingService
+        PricingService.invalidate(self.space_id)
 
 
 class SpaceCalendarSlot(UUIDModelMixin, TimestampedModelMixin, models.Model):
@@ -235,6 +252,18 @@ class SpaceCalendarSlot(UUIDModelMixin, TimestampedModelMixin, models.Model):
         related_name='calendar_slots'
     )
     
+    # Reservation currently holding this slot (set while status is reserved/booked)
+    reservation = models.ForeignKey(
+        'booking.Reservation',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='held_slots'
+    )
+    
+    # Seats taken on shared spaces; the slot is marked booked while it is full
+    occupied = models.PositiveIntegerField(default=0, help_text='Seats held or booked (shared spaces only)')
+    
     # Notes
     notes = models.TextField(blank=True, null=True, help_text='Reason for blocking/maintenance')
     
@@ -245,6 +274,7 @@ class SpaceCalendarSlot(UUIDModelMixin, TimestampedModelMixin, models.Model):
         indexes = [
             models.Index(fields=['calendar', 'date', 'status']),
             models.Index(fields=['booking']),
+            models.Index(fields=['reservation', 'status']),
         ]
     
     def __str__(self):
@@ -98,3 +98,12 @@ class AvailableSlotsSerializer(serializers.Serializer):
     start_date = serializers.DateField()
     end_date = serializers.DateField()
     availability = serializers.ListField(child=serializers.DictField())
+
+
+class MonthAvailabilitySerializer(serializers.Serializer):
+    """Serializer for aggregated month availability response"""
+    space = serializers.UUIDField()
+    space_name = serializers.CharField()
+    month = serializers.CharField()
+    booking_type = serializers.CharField(allow_null=True)
+    days = serializers.ListField(child=serializers.DictField())
@@ -2,5 +2,7 @@
 Workspace Services
 """
 from .workspace_service import WorkspaceService, BranchService, SpaceService
+from .availability_service import AvailabilityService
+from .pricing_service import PricingService
 
-__all__ = ['WorkspaceService', 'BranchService', 'SpaceService']
+__all__ = ['WorkspaceService', 'BranchService', 'SpaceService', 'AvailabilityService', 'PricingService']
@@ -0,0 +1,115 @@
+"""
+Availability Service Layer
+Aggregated, cached views over space calendar slots.
+"""
+import calendar as pycalendar
+from datetime import date
+from typing import Dict, Any, Optional
+
+from django.db.models import Count, Min, Max, Q
+
+from core.cache import CacheService
+
+
+class AvailabilityService:
+    """
+    Service for aggregated slot availability (calendar heatmaps).
+
+    Month summaries are computed with a single GROUP BY over
+    SpaceCalendarSlot and cached per space + month. Any write that
+    changes slot status must call `invalidate_range` for the affected dates.
+    """
+
+    MONTH_SUMMARY_TIMEOUT = CacheService.TIMEOUT_SHORT
+
+    @staticmethod
+    def month_cache_key(space_id, year: int, month: int, booking_type: Optional[str] = None) -> str:
+        """Cache key for a space's month summary"""
+        return f"availability:space:{space_id}:month:{year:04d}-{month:02d}:{booking_type or 'all'}"
+
+    @staticmethod
+    def get_month_summary(space, year: int, month: int, booking_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get per-day slot counts for a space in a given month.
+
+        Args:
+            space: Space instance
+            year: Calendar year
+            month: Calendar month (1-12)
+            booking_type: Optional slot booking type filter (hourly/daily/monthly)
+
+        Returns:
+            Dictionary with one entry per day that has slots
+        """
+        cache_key = AvailabilityService.month_cache_key(space.id, year, month, booking_type)
+        cached_summary = CacheService.get(cache_key)
+
+        if cached_summary is not None:
+            return cached_summary
+
+        from workspace.models import SpaceCalendarSlot
+
+        first_day = date(year, month, 1)
+        last_day = date(year, month, pycalendar.monthrange(year, month)[1])
+
+        slots = SpaceCalendarSlot.objects.filter(
+            calendar__space=space,
+            date__gte=first_day,
+            date__lte=last_day
+        )
+        if booking_type:
+            slots = slots.filter(booking_type=booking_type)
+
+        free = Q(status='available')
+        rows = slots.values('date').annotate(
+            free=Count('id', filter=free),
+            reserved=Count('id', filter=Q(status='reserved')),
+            booked=Count('id', filter=Q(status='booked')),
+            unavailable=Count('id', filter=Q(status__in=['blocked', 'maintenance'])),
+            first_free=Min('start_time', filter=free),
+            last_free=Max('end_time', filter=free),
+        ).order_by('date')
+
+        days = [
+            {
+                'date': row['date'].isoformat(),
+                'free': row['free'],
+                'reserved': row['reserved'],
+                'booked': row['booked'],
+                'unavailable': row['unavailable'],
+                'first_free': row['first_free'].strftime('%H:%M') if row['first_free'] else None,
+                'last_free': row['last_free'].strftime('%H:%M') if row['last_free'] else None,
+            }
+            for row in rows
+        ]
+
+        summary = {
+            'space': str(space.id),
+            'space_name': space.name,
+            'month': f"{year:04d}-{month:02d}",
+            'booking_type': booking_type,
+            'days': days,
+        }
+
+        CacheService.set(cache_key, summary, timeout=AvailabilityService.MONTH_SUMMARY_TIMEOUT)
+
+        return summary
+
+    @staticmethod
+    def invalidate_range(space_id, start_date: date, end_date: Optional[date] = None) -> None:
+        """
+        Invalidate cached month summaries for a space across a date range.
+
+        Args:
+            space_id: Space ID whose slots changed
+            start_date: First affected date
+            end_date: Last affected date (defaults to start_date)
+        """
+        end_date = end_date or start_date
+        year, month = start_date.year, start_date.month
+
+        while (year, month) <= (end_date.year, end_date.month):
+            CacheService.delete_pattern(f"availability:space:{space_id}:month:{year:04d}-{month:02d}:*")
+            month += 1
+            if month > 12:
+                year, month = year + 1, 1
@@ -0,0 +1,195 @@
+"""
+Pricing Service Layer
+Quotes prices for many (space, range, booking type) combinations at once.
+"""
+import math
+import threading
+import time
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Any, Iterable, List
+
+from core.cache import CacheService
+
+
+MONEY = Decimal('0.01')
+BOOKING_TYPES = ('hourly', 'daily', 'monthly')
+
+
+class PricingService:
+    """
+    Service for pricing bookings.
+
+    Each space has a rate table (one rate per booking type plus which
+    types are enabled) built from its SpaceCalendar prices, falling back
+    to the Space rates when the calendar price is not set. Tables are
+    kept in a per-process dictionary for `LOCAL_TIMEOUT` seconds and in
+    the shared cache for longer, so quoting a cart or a page of search
+    results costs at most one query for the spaces not seen recently.
+
+    Amounts are rounded once, at the end, to two decimal places with
+    ROUND_HALF_UP.
+    """
+
+    CACHE_TIMEOUT = CacheService.TIMEOUT_MEDIUM
+    LOCAL_TIMEOUT = 60
+
+    _local_tables: Dict[str, tuple] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def rate_table_cache_key(space_id) -> str:
+        """Cache key for a space's rate table"""
+        return f"pricing:space:{space_id}:rates"
+
+    @classmethod
+    def invalidate(cls, space_id) -> None:
+        """Drop a space's rate table after its rates or calendar changed"""
+        with cls._lock:
+            cls._local_tables.pop(str(space_id), None)
+        CacheService.delete(cls.rate_table_cache_key(space_id))
+
+    @staticmethod
+    def _build_rate_table(row) -> Dict[str, Any]:
+        def pick(calendar_price, space_rate):
+            if calendar_price:
+                return calendar_price
+            return space_rate
+
+        return {
+            'rates': {
+                'hourly': pick(row['calendar__hourly_price'], row['price_per_hour']),
+                'daily': pick(row['calendar__daily_price'], row['daily_rate']),
+                'monthly': pick(row['calendar__monthly_price'], row['monthly_rate']),
+            },
+            'enabled': {
+                # Spaces without a calendar accept every booking type
+                'hourly': row['calendar__hourly_enabled'] is not False,
+                'daily': row['calendar__daily_enabled'] is not False,
+                'monthly': row['calendar__monthly_enabled'] is not False,
+            },
+        }
+
+    @classmethod
+    def get_rate_tables(cls, space_ids: Iterable) -> Dict[str, Dict[str, Any]]:
+        """
+        Get rate tables for several spaces.
+
+        Args:
+            space_ids: Space IDs
+
+        Returns:
+            Dictionary of space ID (str) to rate table; unknown spaces are omitted
+        """
+        now = time.monotonic()
+        tables = {}
+        missing = []
+
+        with cls._lock:
+            for space_id in {str(space_id) for space_id in space_ids}:
+                entry = cls._local_tables.get(space_id)
+                if entry and entry[0] > now:
+                    tables[space_id] = entry[1]
+                else:
+                    missing.append(space_id)
+
+        still_missing = []
+        for space_id in missing:
+            table = CacheService.get(cls.rate_table_cache_key(space_id))
+            if table is None:
+                still_missing.append(space_id)
+            else:
+                tables[space_id] = table
+
+        if still_missing:
+            from workspace.models import Space
+
+            rows = Space.objects.filter(id__in=still_missing).values(
+                'id', 'price_per_hour', 'daily_rate', 'monthly_rate',
+                'calendar__hourly_price', 'calendar__daily_price', 'calendar__monthly_price',
+                'calendar__hourly_enabled', 'calendar__daily_enabled', 'calendar__monthly_enabled',
+            )
+            for row in rows:
+                space_id = str(row['id'])
+                table = cls._build_rate_table(row)
+                tables[space_id] = table
+                CacheService.set(cls.rate_table_cache_key(space_id), table, cls.CACHE_TIMEOUT)
+
+        with cls._lock:
+            for space_id in missing:
+                if space_id in tables:
+                    cls._local_tables[space_id] = (now + cls.LOCAL_TIMEOUT, tables[space_id])
+
+        return tables
+
+    @staticmethod
+    def _units(booking_type: str, start, end) -> Decimal:
+        """Billable units for a range: hours, or whole days/months (at least one)"""
+        seconds = Decimal(int((end - start).total_seconds()))
+        if booking_type == 'hourly':
+            return seconds / Decimal(3600)
+        if booking_type == 'daily':
+            return Decimal(max(1, math.ceil(seconds / Decimal(86400))))
+        return Decimal(max(1, math.ceil(seconds / Decimal(86400 * 30))))
+
+    @classmethod
+    def quote_many(cls, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Price many booking candidates in one call.
+
+        Args:
+            requests: Dictionaries with `space_id`, `start`, `end` (datetimes)
+                and `booking_type`
+
+        Returns:
+            One quote per request, in order. Priced quotes carry `unit_price`,
+            `units` and `amount`; the others carry an `error` message.
+        """
+        tables = cls.get_rate_tables(request['space_id'] for request in requests)
+        quotes = []
+
+        for request in requests:
+            booking_type = request['booking_type']
+            quote = {
+                'space_id': str(request['space_id']),
+                'booking_type': booking_type,
+                'start': request['start'],
+                'end': request['end'],
+            }
+            table = tables.get(str(request['space_id']))
+            rate = table['rates'].get(booking_type) if table else None
+
+            if table is None:
+                quote['error'] = 'Space not found'
+            elif booking_type not in BOOKING_TYPES or not table['enabled'][booking_type]:
+                quote['error'] = f'{booking_type} booking is not available for this space'
+            elif rate is None:
+                quote['error'] = f'No {booking_type} rate is set for this space'
+            elif request['end'] <= request['start']:
+                quote['error'] = 'End time must be after start time'
+            else:
+                units = cls._units(booking_type, request['start'], request['end'])
+                quote['unit_price'] = Decimal(rate)
+                quote['units'] = units.quantize(MONEY, rounding=ROUND_HALF_UP)
+                quote['amount'] = (Decimal(rate) * units).quantize(MONEY, rounding=ROUND_HALF_UP)
+
+            quotes.append(quote)
+
+        return quotes
+
+    @classmethod
+    def quote(cls, space_id, start, end, booking_type: str) -> Decimal:
+        """
+        Price a single booking.
+
+        Raises:
+            ValueError: If the space cannot be booked with this type or has no rate
+        """
+        quote = cls.quote_many([{
+            'space_id': space_id,
+            'start': start,
+            'end': end,
+            'booking_type': booking_type,
+        }])[0]
+        if 'error' in quote:
+            raise ValueError(quote['error'])
+        return quote['amount']
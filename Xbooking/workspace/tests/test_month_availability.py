@@ -0,0 +1,99 @@
+from datetime import date, time
+from unittest.mock import call, patch
+
+from django.contrib.admin.sites import site
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.cache import CacheService
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+from workspace.models import SpaceCalendar, SpaceCalendarSlot
+from workspace.services import AvailabilityService
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestMonthAvailabilitySummary(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user("calendar@example.com", full_name="Calendar Admin")
+        self.workspace = create_workspace(self.user, name="Calendar Workspace")
+        self.branch = create_branch(self.workspace)
+        self.space = create_space(self.branch)
+        self.calendar = SpaceCalendar.objects.create(space=self.space)
+
+        day = date(2030, 5, 14)
+        statuses = ['available', 'reserved', 'booked', 'available', 'blocked']
+        for hour, slot_status in zip(range(9, 14), statuses):
+            SpaceCalendarSlot.objects.create(
+                calendar=self.calendar,
+                date=day,
+                start_time=time(hour, 0),
+                end_time=time(hour + 1, 0),
+                booking_type='hourly',
+                status=slot_status
+            )
+        SpaceCalendarSlot.objects.create(
+            calendar=self.calendar,
+            date=date(2030, 6, 1),
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+            booking_type='hourly',
+        )
+
+    def test_month_summary_aggregates_per_day(self):
+        url = '/api/v1/workspace/public/slots/month-summary/'
+        response = self.client.get(url, {'space': str(self.space.id), 'month': '2030-05'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        payload = response.json()
+        self.assertEqual(payload['month'], '2030-05')
+        self.assertEqual(len(payload['days']), 1)
+
+        day = payload['days'][0]
+        self.assertEqual(day['date'], '2030-05-14')
+        self.assertEqual(day['free'], 2)
+        self.assertEqual(day['reserved'], 1)
+        self.assertEqual(day['booked'], 1)
+        self.assertEqual(day['unavailable'], 1)
+        self.assertEqual(day['first_free'], '09:00')
+        self.assertEqual(day['last_free'], '13:00')
+
+    def test_month_summary_rejects_bad_month(self):
+        url = '/api/v1/workspace/public/slots/month-summary/'
+        response = self.client.get(url, {'space': str(self.space.id), 'month': 'May'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_month_summary_rejects_malformed_space_id(self):
+        url = '/api/v1/workspace/public/slots/month-summary/'
+        response = self.client.get(url, {'space': 'not-a-uuid', 'month': '2030-05'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalidate_range_drops_every_month_in_range(self):
+        # LocMemCache has no delete_pattern, so assert the patterns it is given
+        with patch.object(CacheService, 'delete_pattern') as delete_pattern:
+            AvailabilityService.invalidate_range(self.space.id, date(2030, 5, 14), date(2030, 6, 1))
+
+        self.assertEqual(delete_pattern.call_args_list, [
+            call(f'availability:space:{self.space.id}:month:2030-05:*'),
+            call(f'availability:space:{self.space.id}:month:2030-06:*'),
+        ])
+
+    def test_admin_slot_edits_invalidate_old_and_new_months(self):
+        model_admin = site._registry[SpaceCalendarSlot]
+        request = RequestFactory().post('/admin/')
+        slot = SpaceCalendarSlot.objects.get(date=date(2030, 6, 1))
+        slot.date = date(2030, 7, 2)
+
+        with patch.object(AvailabilityService, 'invalidate_range') as invalidate_range:
+            model_admin.save_model(request, slot, None, True)
+            model_admin.delete_queryset(request, SpaceCalendarSlot.objects.filter(date=date(2030, 5, 14)))
+
+        self.assertEqual(
+            sorted(invalidate_range.call_args_list, key=lambda c: c.args[1]),
+            [
+                call(self.space.id, date(2030, 5, 14)),
+                call(self.space.id, date(2030, 6, 1)),
+                call(self.space.id, date(2030, 7, 2)),
+            ]
+        )
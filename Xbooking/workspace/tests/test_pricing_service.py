@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.tests.factories import LOCMEM_CACHES, create_user, create_workspace, create_branch, create_space
+from workspace.models import SpaceCalendar
+from workspace.services import PricingService
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestPricingService(TestCase):
+    def setUp(self):
+        PricingService._local_tables.clear()
+        self.user = create_user("pricing@example.com", full_name="Pricing Admin")
+        self.workspace = create_workspace(self.user, name="Pricing Workspace")
+        self.branch = create_branch(self.workspace)
+        self.plain_space = create_space(
+            self.branch,
+            name="Plain",
+            price_per_hour=Decimal('12.50'),
+            daily_rate=Decimal('80.00'),
+            monthly_rate=None
+        )
+        self.calendar_space = create_space(
+            self.branch,
+            name="Calendar Priced",
+            space_type="office",
+            capacity=4,
+            price_per_hour=Decimal('10.00'),
+            daily_rate=Decimal('50.00'),
+            monthly_rate=Decimal('900.00')
+        )
+        self.calendar = SpaceCalendar.objects.create(
+            space=self.calendar_space,
+            hourly_price=Decimal('15.00'),
+            daily_enabled=False
+        )
+        self.start = timezone.make_aware(datetime(2030, 3, 4, 9, 0))
+
+    def _request(self, space, booking_type, duration):
+        return {
+            'space_id': space.id,
+            'start': self.start,
+            'end': self.start + duration,
+            'booking_type': booking_type,
+        }
+
+    def test_quote_many_uses_one_query_then_cached_tables(self):
+        requests = [
+            self._request(self.plain_space, 'hourly', timedelta(minutes=20)),
+            self._request(self.plain_space, 'daily', timedelta(hours=8)),
+            self._request(self.calendar_space, 'hourly', timedelta(hours=2)),
+            self._request(self.calendar_space, 'monthly', timedelta(days=30)),
+        ]
+
+        with self.assertNumQueries(1):
+            quotes = PricingService.quote_many(requests)
+        with self.assertNumQueries(0):
+            self.assertEqual(PricingService.quote_many(requests), quotes)
+
+        # 12.50 * 1/3 h rounds half-up to the cent
+        self.assertEqual(quotes[0]['amount'], Decimal('4.17'))
+        self.assertEqual(quotes[1]['amount'], Decimal('80.00'))
+        # Calendar price wins over the space rate; unset calendar prices fall back
+        self.assertEqual(quotes[2]['amount'], Decimal('30.00'))
+        self.assertEqual(quotes[3]['amount'], Decimal('900.00'))
+
+    def test_unpriceable_requests_report_errors(self):
+        quotes = PricingService.quote_many([
+            self._request(self.plain_space, 'monthly', timedelta(days=30)),
+            self._request(self.calendar_space, 'daily', timedelta(hours=8)),
+        ])
+        self.assertIn('rate', quotes[0]['error'])
+        self.assertIn('not available', quotes[1]['error'])
+
+        with self.assertRaises(ValueError):
+            PricingService.quote(self.plain_space.id, self.start, self.start + timedelta(days=30), 'monthly')
+
+    def test_rate_change_invalidates_table(self):
+        request = self._request(self.calendar_space, 'hourly', timedelta(hours=1))
+        self.assertEqual(PricingService.quote_many([request])[0]['amount'], Decimal('15.00'))
+
+        self.calendar.hourly_price = Decimal('20.00')
+        self.calendar.save()
+
+        self.assertEqual(PricingService.quote_many([request])[0]['amount'], Decimal('20.00'))
@@ -7,6 +7,7 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from django.utils import timezone
 from datetime import datetime, date, time, timedelta
+import uuid
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 
 from core.views import CachedModelViewSet
@@ -16,8 +17,10 @@ from workspace.serializers.v1.calendar import (
     SpaceCalendarSerializer,
     SpaceCalendarSlotSerializer,
     CheckAvailabilitySerializer,
-    AvailableSlotsSerializer
+    AvailableSlotsSerializer,
+    MonthAvailabilitySerializer
 )
+from workspace.services import AvailabilityService
 
 
 @extend_schema_view(
@@ -290,7 +293,7 @@ class PublicSpaceSlotViewSet(CachedModelViewSet):
             date__gte=start_date,
             date__lte=end_date,
             status='available'
-        ).select_related('calendar')
+        ).select_related('calendar', 'calendar__space')
         
         # Filter by booking type if provided
         if booking_type and booking_type in ['hourly', 'daily', 'monthly']:
@@ -324,3 +327,71 @@ class PublicSpaceSlotViewSet(CachedModelViewSet):
             "end_date": end_date.isoformat(),
             "availability": list(grouped_slots.values())
         })
+    
+    @extend_schema(
+        description="Get aggregated per-day availability counts for a space in a month",
+        parameters=[
+            OpenApiParameter(name='space', description='Space ID', required=True, type=str),
+            OpenApiParameter(name='month', description='Month (YYYY-MM), defaults to current month', required=False, type=str),
+            OpenApiParameter(name='booking_type', description='Booking type (hourly/daily/monthly)', required=False, type=str),
+        ],
+        responses={200: MonthAvailabilitySerializer}
+    )
+    @action(detail=False, methods=['get'], url_path='month-summary')
+    def month_summary(self, request):
+        """
+        Get a month heatmap of slot availability for a space
+        
+        Query params:
+        - space: space_uuid (required)
+        - month: YYYY-MM (optional, defaults to current month)
+        - booking_type: hourly|daily|monthly (optional)
+        """
+        space_id = request.query_params.get('space')
+        month_str = request.query_params.get('month')
+        booking_type = request.query_params.get('booking_type')
+        
+        if not space_id:
+            return Response(
+                {"error": "space parameter is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            space_id = uuid.UUID(space_id)
+        except ValueError:
+            return Response(
+                {"error": "Invalid space ID"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if month_str:
+            try:
+                month_start = datetime.strptime(month_str, '%Y-%m').date()
+            except ValueError:
+                return Response(
+                    {"error": "Invalid month format. Use YYYY-MM"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            month_start = timezone.now().date().replace(day=1)
+        
+        if booking_type not in ['hourly', 'daily', 'monthly']:
+            booking_type = None
+        
+        try:
+            space = Space.objects.get(id=space_id, is_available=True)
+        except Space.DoesNotExist:
+            return Response(
+                {"error": "Space not found or not available"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        summary = AvailabilityService.get_month_summary(
+            space,
+            month_start.year,
+            month_start.month,
+            booking_type=booking_type
+        )
+        
+        return Response(summary)